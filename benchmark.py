@@ -0,0 +1,159 @@
+"""
+Reproducible benchmarks for the assistant's hot paths.
+
+Every benchmark uses fixed seeds and reports operations per second (the best
+of several repeats), and the whole run is written as JSON so runs can be
+compared. With --baseline, any benchmark that got slower than the stored
+baseline by more than --threshold is listed in a regression report and the
+command exits with status 1.
+
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --threshold 0.2
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from shuffling_deck import generate_deck, shuffle_all_decks
+from blackjack import (calculate_hand_value, calculate_running_count, convert_to_tuples,
+                       recommend_hilo_action)
+from simulator import basic_strategy, hilo_strategy, simulate
+
+SEED = 2024
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_REPEATS = 3
+
+# name -> zero-argument callable returning (operations, elapsed seconds)
+Benchmark = Callable[[], Tuple[int, float]]
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+def _timed(fn, ops):
+    start = time.perf_counter()
+    fn()
+    return ops, time.perf_counter() - start
+
+def _shoe(num_decks):
+    return [card for _ in range(num_decks) for card in generate_deck()]
+
+def _shuffle_benchmark(num_decks, passes, shoes=40):
+    shoe = _shoe(num_decks)
+
+    def run():
+        for i in range(shoes):
+            shuffle_all_decks(shoe, passes, seed=SEED + i)
+    return lambda: _timed(run, shoes)
+
+for _decks in range(1, 9):
+    for _passes in (1, 3, 5, 7):
+        BENCHMARKS[f"shuffle_all_decks[decks={_decks},passes={_passes}]"] = _shuffle_benchmark(_decks, _passes)
+
+def _random_hands(count, rng):
+    deck = convert_to_tuples(_shoe(6))
+    return [rng.sample(deck, rng.choice((2, 2, 2, 3, 3, 4, 5))) for _ in range(count)]
+
+def _hand_value_benchmark(count=50_000):
+    hands = _random_hands(count, random.Random(SEED))
+
+    def run():
+        for hand in hands:
+            calculate_hand_value(hand)
+    return _timed(run, count)
+
+def _running_count_benchmark(shoes=200):
+    decks = [convert_to_tuples(shuffle_all_decks(_shoe(6), seed=SEED + i)) for i in range(shoes)]
+
+    def run():
+        for deck in decks:
+            calculate_running_count(deck, 0)
+    return _timed(run, shoes * len(decks[0]))
+
+def _recommend_benchmark(count=20_000):
+    rng = random.Random(SEED)
+    # Only live hands are ever asked for a recommendation
+    hands = [hand for hand in _random_hands(2 * count, rng) if calculate_hand_value(hand) <= 21][:count]
+    deck = convert_to_tuples(generate_deck())
+    upcards = [[rng.choice(deck)] for _ in range(count)]
+    counts = [(rng.randint(-12, 12), rng.uniform(0.5, 6)) for _ in range(count)]
+
+    def run():
+        for hand, dealer, (rc, decks) in zip(hands, upcards, counts):
+            recommend_hilo_action(hand, dealer, rc, decks)
+    return _timed(run, len(hands))
+
+def _playout_benchmark(strategy, hands=100_000):
+    def run():
+        simulate(strategy, hands=hands, seed=SEED)
+    return lambda: _timed(run, hands)
+
+BENCHMARKS['calculate_hand_value'] = _hand_value_benchmark
+BENCHMARKS['calculate_running_count'] = _running_count_benchmark
+BENCHMARKS['recommend_hilo_action'] = _recommend_benchmark
+BENCHMARKS['simulate[basic]'] = _playout_benchmark(basic_strategy)
+BENCHMARKS['simulate[hilo]'] = _playout_benchmark(hilo_strategy)
+
+def run_suite(names: Optional[List[str]] = None, repeats: int = DEFAULT_REPEATS) -> dict:
+    """Run the selected benchmarks (all by default) and return the JSON-ready report."""
+    results = {}
+    for name in names or BENCHMARKS:
+        best = 0.0
+        for _ in range(repeats):
+            ops, elapsed = BENCHMARKS[name]()
+            best = max(best, ops / elapsed if elapsed else float('inf'))
+        results[name] = {'ops_per_sec': best}
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': SEED,
+        'repeats': repeats,
+        'results': results,
+    }
+
+def find_regressions(report: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> List[dict]:
+    """Benchmarks whose throughput fell by more than `threshold` (a fraction) against the baseline."""
+    regressions = []
+    for name, result in report['results'].items():
+        before = baseline['results'].get(name)
+        if not before:
+            continue
+        slowdown = 1 - result['ops_per_sec'] / before['ops_per_sec']
+        if slowdown > threshold:
+            regressions.append({'name': name, 'baseline_ops_per_sec': before['ops_per_sec'],
+                                'ops_per_sec': result['ops_per_sec'], 'slowdown': slowdown})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Blackjack Assistant hot paths")
+    parser.add_argument('--output', help="Write the JSON report to this file (default: stdout)")
+    parser.add_argument('--baseline', help="Compare against a previously saved JSON report")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown before a benchmark counts as a regression (0.2 = 20%%)")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--filter', help="Only run benchmarks whose name contains this text")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    report = run_suite(names, args.repeats)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['regressions'] = find_regressions(report, json.load(f), args.threshold)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    for regression in report.get('regressions', []):
+        print(f"REGRESSION {regression['name']}: {regression['ops_per_sec']:.0f} ops/sec vs "
+              f"{regression['baseline_ops_per_sec']:.0f} baseline ({regression['slowdown']:.0%} slower)",
+              file=sys.stderr)
+    return 1 if report.get('regressions') else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""
+Blackjack core: hand evaluation, Hi-Lo counting and strategy recommendations.
+
+Importing the package loads only the core in blackjack.hand. The console
+game (play_blackjack, display_hand) is imported the first time it is used,
+and the headless command line lives in blackjack.cli:
+
+    python -m blackjack advise --player 10 6 --dealer 10 --running-count 4 --decks-remaining 2
+    python -m blackjack play
+"""
+from .hand import (calculate_hand_value, calculate_running_count, convert_to_tuples, hand_state, hilo_values,
+                   recommend_hilo_action, true_count, values)
+
+__all__ = ['calculate_hand_value', 'calculate_running_count', 'convert_to_tuples', 'hand_state', 'hilo_values',
+           'recommend_hilo_action', 'true_count', 'values', 'play_blackjack', 'display_hand']
+
+# Names served lazily from submodules, so `import blackjack` stays cheap
+_LAZY = {'play_blackjack': 'console', 'display_hand': 'console'}
+
+def __getattr__(name):
+    if name in _LAZY:
+        from importlib import import_module
+        return getattr(import_module(f'.{_LAZY[name]}', __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
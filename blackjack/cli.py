@@ -0,0 +1,182 @@
+"""
+Headless command line for batch jobs: no GUI toolkit and no interactive input.
+
+    python -m blackjack advise --player 10 6 --dealer 10 --seen 2 5 K 3 --decks 6
+    python -m blackjack count --decks 6 --cards 2 5 K 3 A
+    python -m blackjack simulate --hands 100000 --strategy hilo_table
+    python -m blackjack serve < requests.jsonl
+    python -m blackjack play
+
+advise, count and simulate print one JSON object. Given no cards on the
+command line, advise and count read the request as a JSON object from stdin
+instead. serve answers one JSON request per line, e.g.
+{"op": "advise", "player": ["10", "6"], "dealer": ["10"], "running_count": 4},
+with one JSON reply per line, so startup is paid once for any number of
+queries. Cards are ranks (2-10, T, J, Q, K, A); suits are ignored.
+
+Only the modules a command needs are imported: advise and count load the
+strategy table and counting registry, while the EV solver, simulator and
+console game are loaded on first use.
+"""
+import argparse
+import json
+import sys
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from .hand import calculate_running_count, hand_state, recommend_hilo_action, true_count, values
+
+def parse_cards(cards: Iterable) -> List[tuple]:
+    """(rank, suit) tuples from ranks such as '10', 'T', 'k' or [rank, suit] pairs."""
+    parsed = []
+    for card in cards:
+        rank = str(card[0] if isinstance(card, (list, tuple)) else card).strip().upper()
+        rank = '10' if rank == 'T' else rank
+        if rank not in values:
+            raise ValueError(f"Unknown card rank: {card!r}")
+        parsed.append((rank, ''))
+    return parsed
+
+def advise(player: Sequence, dealer: Sequence, running_count: Optional[int] = None,
+           decks_remaining: Optional[float] = None, seen: Sequence = (), decks: int = 6, ev: bool = False,
+           can_double: Optional[bool] = None, can_split: Optional[bool] = None,
+           can_surrender: Optional[bool] = None) -> dict:
+    """
+    Recommend an action. The count is either given directly or taken from
+    `seen` (earlier cards of the shoe) plus the player's cards and the upcard;
+    dealer[0] is the upcard. With `ev`, the solver EVs for the composition
+    left after the seen cards are added.
+    """
+    player, dealer, seen = parse_cards(player), parse_cards(dealer), parse_cards(seen)
+    if not player or not dealer:
+        raise ValueError("advise needs the player's cards and the dealer upcard")
+    visible = seen + player + dealer[:1]
+    if running_count is None:
+        running_count = calculate_running_count(visible, 0)
+    if decks_remaining is None:
+        # The hole card is out of the shoe too
+        decks_remaining = (decks * 52 - len(visible) - max(len(dealer), 2) + 1) / 52
+    total, soft = hand_state(player)
+    result = {
+        'action': recommend_hilo_action(player, dealer, running_count, decks_remaining,
+                                        can_double, can_split, can_surrender),
+        'player_value': total, 'soft': soft,
+        'running_count': running_count, 'decks_remaining': decks_remaining,
+        'true_count': true_count(running_count, decks_remaining),
+    }
+    if ev:
+        from ev_solver import composition_after, solve_hand
+        result['evs'] = solve_hand(player, dealer, composition_after(decks, visible))
+    return result
+
+def count(cards: Sequence, decks: int = 6, systems: Sequence[str] = ('hilo',)) -> dict:
+    """Running and true counts for every system, decks left and the remaining composition."""
+    from counting import ShoeTracker
+    tracker = ShoeTracker(decks, tuple(systems))
+    tracker.observe_all(parse_cards(cards))
+    return {
+        'cards_remaining': tracker.cards_remaining,
+        'decks_remaining': tracker.decks_remaining,
+        'running_counts': dict(zip(tracker.systems, tracker.counts)),
+        'true_counts': {name: tracker.true_count(name) for name in tracker.systems},
+        # Cards left of each value: 2-9, ten-valued, ace
+        'composition': list(tracker.remaining),
+    }
+
+def simulate(hands: int = 100_000, strategy: str = 'hilo_table', decks: int = 6, penetration: float = 0.75,
+             seed: int = 0) -> dict:
+    from simulator import STRATEGIES
+    from simulator import simulate as run
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy!r} (expected one of {sorted(STRATEGIES)})")
+    return run(STRATEGIES[strategy], hands, decks, penetration, seed, name=strategy).to_dict()
+
+OPS: Dict[str, Callable[..., dict]] = {'advise': advise, 'count': count, 'simulate': simulate}
+
+def handle(request: dict) -> dict:
+    """Answer one JSON-mode request; failures become {"error": ...} replies rather than exits."""
+    request = dict(request)
+    request_id = request.pop('id', None)
+    op = request.pop('op', None)
+    try:
+        if op not in OPS:
+            raise ValueError(f"Unknown op: {op!r} (expected one of {sorted(OPS)})")
+        reply = OPS[op](**request)
+    except (TypeError, ValueError, KeyError) as e:
+        reply = {'error': str(e)}
+    if request_id is not None:
+        reply['id'] = request_id
+    return reply
+
+def serve(stdin=None, stdout=None) -> None:
+    """Answer JSON requests line by line until stdin closes."""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            reply = handle(json.loads(line))
+        except ValueError as e:
+            reply = {'error': f"Invalid JSON: {e}"}
+        stdout.write(json.dumps(reply) + "\n")
+        stdout.flush()
+
+def _stdin_request() -> dict:
+    return json.loads(sys.stdin.read() or '{}')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m blackjack', description="Headless blackjack assistant")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    advise_parser = commands.add_parser('advise', help="Recommend an action (JSON request on stdin without --player)")
+    advise_parser.add_argument('--player', nargs='+', help="Player's cards")
+    advise_parser.add_argument('--dealer', nargs='+', help="Dealer upcard (and any other dealer cards)")
+    advise_parser.add_argument('--seen', nargs='*', default=[], help="Cards seen earlier in this shoe")
+    advise_parser.add_argument('--running-count', type=int, help="Hi-Lo running count (instead of --seen)")
+    advise_parser.add_argument('--decks-remaining', type=float)
+    advise_parser.add_argument('--decks', type=int, default=6)
+    advise_parser.add_argument('--ev', action='store_true', help="Also solve the EV of every action")
+
+    count_parser = commands.add_parser('count', help="Count the cards seen (JSON request on stdin without --cards)")
+    count_parser.add_argument('--cards', nargs='*')
+    count_parser.add_argument('--decks', type=int, default=6)
+    count_parser.add_argument('--system', nargs='+', default=['hilo'], dest='systems')
+
+    simulate_parser = commands.add_parser('simulate', help="Run a quick simulation")
+    simulate_parser.add_argument('--hands', type=int, default=100_000)
+    simulate_parser.add_argument('--strategy', default='hilo_table')
+    simulate_parser.add_argument('--decks', type=int, default=6)
+    simulate_parser.add_argument('--penetration', type=float, default=0.75)
+    simulate_parser.add_argument('--seed', type=int, default=0)
+
+    commands.add_parser('serve', help="Answer JSON requests on stdin, one per line")
+    commands.add_parser('play', help="Play interactively at the console", add_help=False)
+
+    args, rest = parser.parse_known_args(argv)
+    if args.command == 'play':
+        from .console import main as play
+        play(rest)
+        return
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    if args.command == 'serve':
+        serve()
+        return
+
+    if args.command == 'advise':
+        request = _stdin_request() if args.player is None else {
+            'player': args.player, 'dealer': args.dealer or [], 'seen': args.seen, 'decks': args.decks,
+            'running_count': args.running_count, 'decks_remaining': args.decks_remaining, 'ev': args.ev}
+    elif args.command == 'count':
+        request = _stdin_request() if args.cards is None else {
+            'cards': args.cards, 'decks': args.decks, 'systems': args.systems}
+    else:
+        request = {'hands': args.hands, 'strategy': args.strategy, 'decks': args.decks,
+                   'penetration': args.penetration, 'seed': args.seed}
+    reply = handle(dict(request, op=args.command))
+    print(json.dumps(reply, indent=2))
+    if 'error' in reply:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Interactive console blackjack with Hi-Lo recommendations.
+
+Run with `python -m blackjack play` (or `python -m blackjack.console`).
+"""
+import argparse
+
+from shuffling_deck import ContinuousShoe
+from strategy import ACTION_NAMES, HIT, STAND, use_deviations
+from event_log import DEALER, PLAYER, EventLog
+from counting import ShoeTracker
+from dealer_odds import exact, format_distribution
+
+from .hand import calculate_hand_value, recommend_hilo_action, values
+
+def display_hand(hand, hide_first_card=False):
+    if hide_first_card:
+        print("[hidden]", f"{hand[1][0]} of {hand[1][1]}")
+    else:
+        for card in hand:
+            print(f"{card[0]} of {card[1]}", end=" | ")
+        print()
+
+def play_blackjack(num_decks=3, event_log=None, shoe=None, tracker=None):
+    """
+    Play one hand at the console. Pass the same shoe and tracker to keep
+    dealing from one shoe, and keep counting it, across many hands.
+    """
+    print("Welcome to Blackjack with Hi-Lo card counting!")
+    print("Try to get as close to 21 as possible without going over!")
+    print("You can 'hit' to take another card or 'stand' to keep your current hand.")
+    print("We'll also provide Hi-Lo-based recommendations for hitting or standing.")
+    print("-" * 60)
+
+    if shoe is None:
+        shoe = ContinuousShoe(num_decks)
+    # Running count, fractional decks remaining and rank counts for the True Count
+    if tracker is None:
+        tracker = ShoeTracker(shoe.num_decks)
+
+    def new_shoe():
+        print(f"Shuffling a new {shoe.num_decks}-deck shoe.")
+        tracker.reset()
+        if event_log:
+            event_log.shuffle(shoe.num_decks)
+
+    # Cards are dealt lazily; the shoe is only reshuffled once the cut card is out
+    # (or, should a hand run it dry, by deal() itself)
+    shoe.on_shuffle = new_shoe
+    if shoe.start_hand():
+        new_shoe()
+
+    player_hand = [shoe.deal()]
+    dealer_hand = [shoe.deal()]
+    player_hand.append(shoe.deal())
+    dealer_hand.append(shoe.deal())
+
+    # The first dealer card stays face down, so the second is the upcard for advice and odds
+    hidden, upcard = dealer_hand
+    # Running count updated with the cards on view; the hole card is counted once revealed
+    tracker.observe_all(player_hand + [upcard])
+
+    if event_log:
+        event_log.begin_hand()
+        for card in player_hand:
+            event_log.deal(PLAYER, card)
+        # Logs list the dealer's upcard first, as hand_analyzer expects
+        event_log.deal(DEALER, upcard)
+        event_log.deal(DEALER, hidden)
+
+    print("\nDealer's hand:")
+    display_hand(dealer_hand, hide_first_card=True)
+    # How the dealer finishes from the upcard, drawing from every card not seen yet
+    print("Dealer odds:", format_distribution(exact(values[upcard[0]], tracker.remaining, peek=False)))
+
+    print("\nYour hand (value:", calculate_hand_value(player_hand), "):")
+    display_hand(player_hand)
+
+    # Player's turn
+    while calculate_hand_value(player_hand) < 21:
+        # Provide a recommendation based on the current count
+        recommendation = recommend_hilo_action(player_hand, [upcard], tracker.running_count,
+                                               tracker.decks_remaining,
+                                               can_double=False, can_split=False, can_surrender=False)
+        print("Recommended action (Hi-Lo):", recommendation)
+        
+        move = input("Enter 'hit' or 'stand': ").lower()
+        if event_log and move in ('hit', 'stand'):
+            event_log.decision(HIT if move == 'hit' else STAND, ACTION_NAMES.index(recommendation),
+                               tracker.true_count())
+        if move == 'hit':
+            new_card = shoe.deal()
+            player_hand.append(new_card)
+            tracker.observe(new_card)
+            if event_log:
+                event_log.deal(PLAYER, new_card)
+            print("\nYou drew:", f"{player_hand[-1][0]} of {player_hand[-1][1]}")
+            print("Your hand (value:", calculate_hand_value(player_hand), "):")
+            display_hand(player_hand)
+        elif move == 'stand':
+            break
+        else:
+            print("Invalid input. Please enter 'hit' or 'stand'.")
+
+    player_value = calculate_hand_value(player_hand)
+    # The hole card is turned over (and counted) even when the player busts
+    tracker.observe(hidden)
+    if player_value > 21:
+        print("\nYou busted! Dealer wins.")
+        print("Dealer's hand was:")
+        display_hand(dealer_hand)
+        if event_log:
+            event_log.outcome(-1)
+        return
+
+    print("\nDealer's hand revealed:")
+    display_hand(dealer_hand)
+    while calculate_hand_value(dealer_hand) < 17:
+        new_card = shoe.deal()
+        dealer_hand.append(new_card)
+        tracker.observe(new_card)
+        if event_log:
+            event_log.deal(DEALER, new_card)
+        print("Dealer draws:", f"{dealer_hand[-1][0]} of {dealer_hand[-1][1]}")
+        print("Dealer's hand (value:", calculate_hand_value(dealer_hand), "):")
+        display_hand(dealer_hand)
+
+    dealer_value = calculate_hand_value(dealer_hand)
+
+    print("\nFinal Results:")
+    print("Your value:", player_value)
+    print("Dealer value:", dealer_value)
+    if dealer_value > 21 or player_value > dealer_value:
+        print("You win!")
+        net = 1
+    elif player_value < dealer_value:
+        print("Dealer wins.")
+        net = -1
+    else:
+        print("It's a tie!")
+        net = 0
+    if event_log:
+        event_log.outcome(net)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Blackjack with Hi-Lo recommendations")
+    parser.add_argument('--decks', type=int, default=3)
+    parser.add_argument('--penetration', type=float, default=0.75, help="Fraction of the shoe dealt before reshuffling")
+    parser.add_argument('--log', help="Append dealt cards, decisions and outcomes to this binary event log")
+    parser.add_argument('--deviations', nargs='+', help="Deviation CSVs to use instead of the Illustrious 18, "
+                        "e.g. from deviation_optimizer.py")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Time shuffling, hand evaluation, counting and recommendations; print a summary at exit")
+    parser.add_argument('--metrics-file', help="Also write metric snapshots here (.prom for Prometheus text, else JSON)")
+    parser.add_argument('--metrics-interval', type=float, default=10.0, help="Seconds between snapshots")
+    parser.add_argument('--metrics-port', type=int, help="Also serve Prometheus text at http://127.0.0.1:PORT/metrics")
+    args = parser.parse_args(argv)
+    if args.deviations:
+        use_deviations(args.deviations)
+
+    instrumentation = None
+    if args.metrics or args.metrics_file or args.metrics_port:
+        from instrumentation import Instrumentation
+        instrumentation = Instrumentation().enable()
+        if args.metrics_file:
+            instrumentation.start_snapshots(args.metrics_file, args.metrics_interval)
+        if args.metrics_port:
+            instrumentation.serve(args.metrics_port)
+
+    shoe = ContinuousShoe(args.decks, args.penetration)
+    tracker = ShoeTracker(args.decks)
+    event_log = EventLog(args.log) if args.log else None
+    try:
+        while True:
+            play_blackjack(args.decks, event_log, shoe, tracker)
+            if input("\nPlay another hand? (y/n): ").lower() != 'y':
+                break
+    finally:
+        if event_log:
+            event_log.close()
+        if instrumentation:
+            instrumentation.disable()
+            print()
+            print(instrumentation.summary())
+
+if __name__ == "__main__":
+    main()
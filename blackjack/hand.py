@@ -0,0 +1,73 @@
+"""
+Hand evaluation, Hi-Lo counting and the strategy recommendation.
+
+The non-interactive core of the package: importing it loads no console,
+event-logging or GUI code. The card encoding it counts with (counting ->
+cards) builds on shuffling_deck's card types, so that module comes along.
+"""
+from strategy import ACTION_NAMES, default_strategy
+from counting import RANK_SLOTS, SYSTEMS
+
+values = {
+    '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '10': 10,
+    'J': 10, 'Q': 10, 'K': 10, 'A': 11
+}
+
+# Hi-Lo card counting values, from the counting-system registry
+hilo_values = {rank: SYSTEMS['hilo'].tags[slot] for rank, slot in RANK_SLOTS.items()}
+
+def convert_to_tuples(deck):
+    return [(card.rank, card.suit) for card in deck]
+
+def calculate_hand_value(hand):
+    return hand_state(hand)[0]
+
+def hand_state(hand):
+    """Return (value, soft) where soft means an ace is still counted as 11."""
+    value = 0
+    ace_count = 0
+    for card in hand:
+        value += values[card[0]]
+        if card[0] == 'A':
+            ace_count += 1
+    while value > 21 and ace_count:
+        value -= 10
+        ace_count -= 1
+    return value, ace_count > 0
+
+def calculate_running_count(hand, running_count):
+    """Calculate the running count based on the Hi-Lo system for the given hand."""
+    for card in hand:
+        rank = card[0]
+        if rank in hilo_values:
+            running_count += hilo_values[rank]
+    return running_count
+
+def true_count(running_count, remaining_decks):
+    """Calculate the true count as the running count divided by the number of remaining decks."""
+    if remaining_decks == 0:
+        return running_count
+    return running_count / remaining_decks
+
+def recommend_hilo_action(player_hand, dealer_hand, running_count, remaining_decks,
+                          can_double=None, can_split=None, can_surrender=None):
+    """
+    Recommend Hit, Stand, Double, Split or Surrender from the strategy table
+    at the current Hi-Lo true count.
+
+    Doubling, splitting and surrendering default to being allowed on the
+    first two cards only; pass False for actions the table does not offer.
+    """
+    tc = true_count(running_count, remaining_decks)
+    player_value, soft = hand_state(player_hand)
+    first_two = len(player_hand) == 2
+    pair = 0
+    if first_two and values[player_hand[0][0]] == values[player_hand[1][0]]:
+        pair = values[player_hand[0][0]]
+    action = default_strategy().lookup(
+        player_value, soft, pair, values[dealer_hand[0][0]], tc,
+        first_two if can_double is None else can_double,
+        first_two if can_split is None else can_split,
+        first_two if can_surrender is None else can_surrender,
+    )
+    return ACTION_NAMES[action]
@@ -0,0 +1,101 @@
+"""
+Compact integer cards and an array-backed shoe.
+
+A card is one byte: suit_index * 13 + rank_index, using the suit and rank
+order of generate_deck, so a 52-card deck is range(52). Per-card lookup
+tables give the rank, blackjack value and Hi-Lo tag without any string
+handling, and the (rank, suit) tuples used by the CLI and GUIs are
+precomputed, so converting at the display boundary allocates nothing.
+"""
+from array import array
+from typing import Iterable, List, Sequence, Tuple
+
+from shuffling_deck import RIFFLE, Card, SeedLike, apply_shuffle
+
+SUITS = ('Hearts', 'Diamonds', 'Clubs', 'Spades')
+RANKS = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
+CARDS_PER_DECK = 52
+
+# Indexed by rank index
+RANK_VALUES = (2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11)
+RANK_HILO = (1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, -1)
+
+# Indexed by card byte
+CARD_RANK = bytes(card % 13 for card in range(CARDS_PER_DECK))
+CARD_VALUE = bytes(RANK_VALUES[card % 13] for card in range(CARDS_PER_DECK))
+CARD_HILO = array('b', (RANK_HILO[card % 13] for card in range(CARDS_PER_DECK)))
+CARD_TUPLES = tuple((RANKS[card % 13], SUITS[card // 13]) for card in range(CARDS_PER_DECK))
+
+# bytes.translate table mapping card bytes to values in one C-level pass
+VALUE_TRANSLATION = CARD_VALUE + bytes(256 - CARDS_PER_DECK)
+
+_TUPLE_TO_CARD = {pair: card for card, pair in enumerate(CARD_TUPLES)}
+
+def to_tuple(card: int) -> Tuple[str, str]:
+    """Return the shared (rank, suit) tuple for a card byte."""
+    return CARD_TUPLES[card]
+
+def from_tuple(pair: Tuple[str, str]) -> int:
+    return _TUPLE_TO_CARD[(pair[0], pair[1])]
+
+def from_card(card: Card) -> int:
+    return _TUPLE_TO_CARD[(card.rank, card.suit)]
+
+def to_tuples(cards: Iterable[int]) -> List[Tuple[str, str]]:
+    return [CARD_TUPLES[card] for card in cards]
+
+def encode(cards: Iterable) -> array:
+    """Encode Card objects or (rank, suit) tuples into a byte array."""
+    return array('B', (from_card(c) if isinstance(c, Card) else from_tuple(c) for c in cards))
+
+class Shoe:
+    """
+    A multi-deck shoe stored as one byte per card.
+
+    Cards are dealt by advancing a cursor, so dealing never resizes or copies
+    the buffer, and `cut` marks the penetration at which a reshuffle is due.
+    """
+    __slots__ = ('num_decks', 'penetration', 'cards', 'pos', 'cut')
+
+    def __init__(self, num_decks: int = 6, penetration: float = 0.75):
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.cards = array('B', range(CARDS_PER_DECK)) * num_decks
+        self.pos = 0
+        self.cut = int(len(self.cards) * penetration)
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def shuffle(self, seed: SeedLike = None, mode: str = RIFFLE, passes: int = 5) -> None:
+        """Reshuffle every card (dealt or not) and reset the cursor."""
+        self.cards = array('B', apply_shuffle(self.cards, seed, mode, passes))
+        self.pos = 0
+
+    def deal(self) -> int:
+        card = self.cards[self.pos]
+        self.pos += 1
+        return card
+
+    def deal_tuple(self) -> Tuple[str, str]:
+        return CARD_TUPLES[self.deal()]
+
+    @property
+    def remaining(self) -> int:
+        return len(self.cards) - self.pos
+
+    @property
+    def remaining_decks(self) -> float:
+        return self.remaining / CARDS_PER_DECK
+
+    @property
+    def needs_shuffle(self) -> bool:
+        return self.pos >= self.cut
+
+    def dealt(self) -> Sequence[int]:
+        """A zero-copy view of the cards dealt so far."""
+        return memoryview(self.cards)[:self.pos]
+
+    def values(self) -> bytes:
+        """Blackjack value of every card in shoe order (2-11)."""
+        return self.cards.tobytes().translate(VALUE_TRANSLATION)
@@ -0,0 +1,153 @@
+"""
+Counting-system registry and incremental shoe-state tracking.
+
+Every counting system is a tag vector over the ten value slots (2-9,
+ten-valued, ace). Balanced systems sum to zero over a deck; unbalanced ones
+start from an initial running count; side counts simply count one rank.
+New systems can be added with register_system, and count_engine evaluates
+many registered systems at once.
+
+ShoeTracker observes cards one at a time and keeps, in O(1) per card, the
+running count for several counting systems, the fractional number of decks
+left and how many cards of each rank remain. Ranks are tracked in the ten
+value slots used by ev_solver (2-9, ten-valued, ace), so remaining_ranks
+doubles as a solver composition.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+from cards import CARD_RANK, CARDS_PER_DECK
+
+@dataclass(frozen=True)
+class CountingSystem:
+    name: str
+    # Tag per value slot: 2, 3, 4, 5, 6, 7, 8, 9, ten-valued, ace
+    tags: Tuple[int, ...]
+    description: str = ''
+    # Added to the running count per deck beyond the first (unbalanced systems)
+    irc_per_deck: int = 0
+    side_count: bool = False
+
+    @property
+    def balanced(self) -> bool:
+        return sum(self.tags[:8]) * 4 + self.tags[8] * 16 + self.tags[9] * 4 == 0
+
+    def initial_running_count(self, num_decks: int) -> int:
+        return self.irc_per_deck * (num_decks - 1)
+
+SYSTEMS: Dict[str, CountingSystem] = {}
+
+def register_system(system: CountingSystem) -> CountingSystem:
+    """Add a counting system to the registry, replacing any system with the same name."""
+    if len(system.tags) != 10:
+        raise ValueError(f"{system.name}: expected 10 tags (2-9, ten, ace), got {len(system.tags)}")
+    SYSTEMS[system.name] = system
+    return system
+
+def get_system(name: str) -> CountingSystem:
+    try:
+        return SYSTEMS[name]
+    except KeyError:
+        raise ValueError(f"Unknown counting system: {name!r}") from None
+
+for _system in (
+    CountingSystem('hilo', (1, 1, 1, 1, 1, 0, 0, 0, -1, -1), "Hi-Lo"),
+    CountingSystem('ko', (1, 1, 1, 1, 1, 1, 0, 0, -1, -1), "Knock-Out (unbalanced)", irc_per_deck=-4),
+    CountingSystem('omega2', (1, 1, 2, 2, 2, 1, 0, -1, -2, 0), "Omega II"),
+    CountingSystem('zen', (1, 1, 2, 2, 2, 1, 0, 0, -2, -1), "Zen Count"),
+    CountingSystem('hiopt1', (0, 1, 1, 1, 1, 0, 0, 0, -1, 0), "Hi-Opt I"),
+    CountingSystem('hiopt2', (1, 1, 2, 2, 1, 1, 0, 0, -2, 0), "Hi-Opt II"),
+    CountingSystem('uston_apc', (1, 2, 2, 3, 2, 2, 1, -1, -3, 0), "Uston Advanced Point Count"),
+    CountingSystem('uston_ss', (2, 2, 2, 3, 2, 1, 0, -1, -2, -2), "Uston SS (unbalanced)", irc_per_deck=-4),
+    CountingSystem('revere_rpc', (1, 2, 2, 2, 2, 1, 0, 0, -2, -2), "Revere Point Count"),
+    CountingSystem('ace_five', (0, 0, 0, 1, 0, 0, 0, 0, 0, -1), "Ace-Five"),
+    CountingSystem('aces', (0, 0, 0, 0, 0, 0, 0, 0, 0, 1), "Aces seen (side count)", side_count=True),
+    CountingSystem('tens', (0, 0, 0, 0, 0, 0, 0, 0, 1, 0), "Ten-valued cards seen (side count)", side_count=True),
+):
+    register_system(_system)
+
+DEFAULT_SYSTEMS = ('hilo', 'ko', 'omega2', 'zen')
+
+RANK_SLOTS = {'2': 0, '3': 1, '4': 2, '5': 3, '6': 4, '7': 5, '8': 6, '9': 7,
+              '10': 8, 'J': 8, 'Q': 8, 'K': 8, 'A': 9}
+
+# Value slot for each card byte from cards.py
+CARD_SLOTS = bytes(min(rank, 8) if rank < 12 else 9 for rank in CARD_RANK)
+
+class ShoeSnapshot(NamedTuple):
+    systems: Tuple[str, ...]
+    running_counts: Tuple[int, ...]
+    cards_remaining: int
+    decks_remaining: float
+    remaining_ranks: Tuple[int, ...]
+
+    def running_count(self, system: str = 'hilo') -> int:
+        return self.running_counts[self.systems.index(system)]
+
+    def true_count(self, system: str = 'hilo') -> float:
+        rc = self.running_count(system)
+        return rc / self.decks_remaining if self.decks_remaining else rc
+
+class ShoeTracker:
+    """Running counts, decks remaining and per-rank remaining cards for one shoe."""
+
+    __slots__ = ('num_decks', 'systems', 'counts', 'remaining', 'cards_remaining', '_slot_tags')
+
+    def __init__(self, num_decks: int = 6, systems: Sequence[str] = DEFAULT_SYSTEMS):
+        tracked = [get_system(name) for name in systems]
+        self.num_decks = num_decks
+        self.systems = tuple(systems)
+        # For each value slot, the tag it adds to every tracked system
+        self._slot_tags = tuple(tuple(system.tags[slot] for system in tracked) for slot in range(10))
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a fresh shoe."""
+        self.counts = [SYSTEMS[name].initial_running_count(self.num_decks) for name in self.systems]
+        self.remaining = [4 * self.num_decks] * 8 + [16 * self.num_decks, 4 * self.num_decks]
+        self.cards_remaining = CARDS_PER_DECK * self.num_decks
+
+    def restore(self, remaining: Sequence[int]) -> None:
+        """Set the cards left per value slot; the running counts follow from them."""
+        self.reset()
+        full = list(self.remaining)
+        for slot, left in enumerate(remaining):
+            for _ in range(full[slot] - left):
+                self.observe_slot(slot)
+
+    def observe_slot(self, slot: int) -> None:
+        self.remaining[slot] -= 1
+        self.cards_remaining -= 1
+        counts = self.counts
+        for k, tag in enumerate(self._slot_tags[slot]):
+            counts[k] += tag
+
+    def observe(self, card) -> None:
+        """Observe a (rank, suit) card or a bare rank string."""
+        self.observe_slot(RANK_SLOTS[card if isinstance(card, str) else card[0]])
+
+    def observe_byte(self, card: int) -> None:
+        """Observe a card byte from cards.Shoe."""
+        self.observe_slot(CARD_SLOTS[card])
+
+    def observe_all(self, cards: Iterable) -> None:
+        for card in cards:
+            self.observe(card)
+
+    @property
+    def running_count(self) -> int:
+        """Running count of the first tracked system (Hi-Lo by default)."""
+        return self.counts[0]
+
+    @property
+    def decks_remaining(self) -> float:
+        return self.cards_remaining / CARDS_PER_DECK
+
+    def true_count(self, system: Optional[str] = None) -> float:
+        rc = self.counts[0 if system is None else self.systems.index(system)]
+        decks = self.decks_remaining
+        return rc / decks if decks else rc
+
+    def snapshot(self) -> ShoeSnapshot:
+        return ShoeSnapshot(self.systems, tuple(self.counts), self.cards_remaining,
+                            self.decks_remaining, tuple(self.remaining))
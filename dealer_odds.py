@@ -0,0 +1,127 @@
+"""
+Dealer final-total probabilities by upcard.
+
+From an upcard, the dealer finishes on 17, 18, 19, 20 or 21, or busts.
+infinite_deck() gives the textbook probabilities where every draw is
+independent (each rank 1/13, ten-valued cards 4/13); exact() conditions
+every draw on the cards actually left in the shoe, using ev_solver's
+recursion memoized over composition states. Both take the soft-17 rule and
+whether the dealer has peeked for blackjack.
+
+DealerOdds follows one shoe card by card. Removing a card only updates the
+composition; the exact distribution is solved when an upcard is asked for
+(about half a millisecond) and kept until the next card leaves the shoe, so
+a front end can refresh it after every deal.
+"""
+import argparse
+import json
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+
+from blackjack import values
+from ev_solver import BUST, Composition, add_card, dealer_distribution, full_shoe, remove
+
+OUTCOMES = ('17', '18', '19', '20', '21', 'bust')
+
+# Draw probability per value slot (2-9, ten-valued, ace) from an infinite deck
+INFINITE_DECK = (1 / 13,) * 8 + (4 / 13, 1 / 13)
+
+def _peek_excluded(up: int) -> int:
+    """Value slot the hole card cannot be after a peek shows no blackjack (-1 for none)."""
+    return {11: 8, 10: 9}.get(up, -1)
+
+@lru_cache(maxsize=None)
+def _infinite_draw(total: int, soft: int, hit_soft_17: bool, exclude: int = -1) -> Tuple[float, ...]:
+    pool = 1.0 - (INFINITE_DECK[exclude] if exclude >= 0 else 0.0)
+    acc = [0.0] * 6
+    for i, share in enumerate(INFINITE_DECK):
+        if i == exclude:
+            continue
+        p = share / pool
+        t, s = add_card(total, soft, i + 2)
+        if t > 21:
+            acc[BUST] += p
+        elif t >= 17 and not (hit_soft_17 and s and t == 17):
+            acc[t - 17] += p
+        else:
+            sub = _infinite_draw(t, s, hit_soft_17)
+            for k in range(6):
+                acc[k] += p * sub[k]
+    return tuple(acc)
+
+def infinite_deck(up: int, hit_soft_17: bool = False, peek: bool = True) -> Tuple[float, ...]:
+    """Probabilities of the dealer finishing on 17-21 or busting, drawing from an infinite deck."""
+    return _infinite_draw(up, int(up == 11), hit_soft_17, _peek_excluded(up) if peek else -1)
+
+def exact(up: int, comp: Sequence[int], hit_soft_17: bool = False, peek: bool = True) -> Tuple[float, ...]:
+    """
+    Probabilities of the dealer finishing on 17-21 or busting, drawing from
+    `comp`, which must already exclude the upcard.
+    """
+    return dealer_distribution(up, tuple(comp), hit_soft_17, peek)
+
+def upcard_table(comp: Composition, hit_soft_17: bool = False, peek: bool = True) -> Dict[int, Tuple[float, ...]]:
+    """exact() for every upcard before it is dealt: each upcard is taken out of `comp` first."""
+    return {up: exact(up, remove(comp, [up]), hit_soft_17, peek) for up in range(2, 12) if comp[up - 2]}
+
+def format_distribution(dist: Sequence[float]) -> str:
+    return "  ".join(f"{name} {p:.1%}" for name, p in zip(OUTCOMES, dist))
+
+class DealerOdds:
+    """Exact dealer probabilities for the cards left in one shoe, kept up to date as cards are seen."""
+
+    def __init__(self, num_decks: int = 6, hit_soft_17: bool = False, peek: bool = True):
+        self.num_decks = num_decks
+        self.hit_soft_17 = hit_soft_17
+        self.peek = peek
+        self.reset()
+
+    def reset(self) -> None:
+        """Start a fresh shoe."""
+        self.remaining = list(full_shoe(self.num_decks))
+        self._cache: Dict[int, Tuple[float, ...]] = {}
+
+    def remove(self, value: int) -> None:
+        """Take a card of `value` (2-11) out of the shoe."""
+        if self.remaining[value - 2] <= 0:
+            raise ValueError(f"No card of value {value} left in the shoe")
+        self.remaining[value - 2] -= 1
+        self._cache.clear()
+
+    def observe(self, card) -> None:
+        """Take a (rank, suit) card out of the shoe."""
+        self.remove(values[card[0]])
+
+    @property
+    def composition(self) -> Composition:
+        return tuple(self.remaining)
+
+    def distribution(self, up: int) -> Tuple[float, ...]:
+        """Exact probabilities for upcard `up`, which must already have been observed."""
+        dist = self._cache.get(up)
+        if dist is None:
+            dist = self._cache[up] = exact(up, self.remaining, self.hit_soft_17, self.peek)
+        return dist
+
+    def bust_probability(self, up: int) -> float:
+        return self.distribution(up)[BUST]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dealer final-total probabilities by upcard")
+    parser.add_argument('--decks', type=int, default=6, help="Decks in the shoe; 0 for an infinite deck")
+    parser.add_argument('--seen', nargs='*', default=[], help="Ranks already dealt from the shoe, e.g. 10 K 5 A")
+    parser.add_argument('--h17', action='store_true', help="Dealer hits soft 17")
+    parser.add_argument('--no-peek', action='store_true', help="Dealer does not check for blackjack")
+    args = parser.parse_args(argv)
+
+    peek = not args.no_peek
+    if args.decks:
+        comp = remove(full_shoe(args.decks), [values[rank.upper()] for rank in args.seen])
+        table = upcard_table(comp, args.h17, peek)
+    else:
+        table = {up: infinite_deck(up, args.h17, peek) for up in range(2, 12)}
+    print(json.dumps({('A' if up == 11 else str(up)): dict(zip(OUTCOMES, dist)) for up, dist in table.items()},
+                     indent=2))
+
+if __name__ == "__main__":
+    main()
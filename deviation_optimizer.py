@@ -0,0 +1,282 @@
+"""
+Search count-deviation indices by simulation.
+
+For each chart cell (hand kind, total, dealer upcard) and candidate
+deviation, trials are drawn from random points of shuffled shoes with the
+cell's cards forced into the deal. Every trial plays the round twice on the
+exact same remaining cards, once with the chart action and once with the
+deviation, and records the difference against the floored true count
+(common random numbers: the shared cards cancel most of the variance).
+Later decisions follow the basic chart.
+
+The index is the true count that maximizes the total gain of applying the
+deviation on its side of the threshold. Cells are simulated in batches on
+every core and a cell stops as soon as the confidence intervals of the
+buckets either side of its index exclude zero. The result is written as a
+deviation CSV that strategy.load_deviations (and --deviations on the console game and GUI)
+can load.
+"""
+import argparse
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from cards import CARDS_PER_DECK
+from round_engine import HILO_TAGS, RoundEngine
+from rules import DEFAULT_RULES, Rules
+from runner import derive_seed
+from strategy import (CODES, DEFAULT_DEVIATIONS, DOUBLE, HARD, KINDS, MIN_TC, NONE, PAIR, SOFT, SPLIT,
+                      SURRENDER, TC_BUCKETS, csv_rows, load_strategy, parse_upcard)
+
+DEFAULT_BATCH_TRIALS = 20_000
+DEFAULT_MAX_TRIALS = 2_000_000
+# Two-sided 95% confidence
+DEFAULT_Z = 1.96
+
+class Cell(NamedTuple):
+    kind: str
+    total: int
+    up: int
+    action: str
+    direction: str
+
+    @property
+    def label(self) -> str:
+        up = 'A' if self.up == 11 else self.up
+        return f"{self.kind} {self.total} v {up}: {self.action} {self.direction}"
+
+@dataclass
+class CellResult:
+    cell: Cell
+    index: Optional[int] = None
+    resolved: bool = False
+    trials: int = 0
+    # Per true-count bucket (MIN_TC upward): trials, sum and sum of squares of the gain
+    counts: List[int] = field(default_factory=lambda: [0] * TC_BUCKETS)
+    sums: List[float] = field(default_factory=lambda: [0.0] * TC_BUCKETS)
+    squares: List[float] = field(default_factory=lambda: [0.0] * TC_BUCKETS)
+
+    def add(self, counts, sums, squares) -> None:
+        for b in range(TC_BUCKETS):
+            self.counts[b] += counts[b]
+            self.sums[b] += sums[b]
+            self.squares[b] += squares[b]
+        self.trials += sum(counts)
+
+    def interval(self, bucket: int, z: float) -> Tuple[float, float]:
+        n = self.counts[bucket]
+        if n < 2:
+            return -math.inf, math.inf
+        mean = self.sums[bucket] / n
+        se = math.sqrt(max(self.squares[bucket] / n - mean * mean, 0.0) / (n - 1))
+        return mean - z * se, mean + z * se
+
+    def to_dict(self) -> dict:
+        return {
+            'cell': self.cell.label, 'index': self.index, 'resolved': self.resolved, 'trials': self.trials,
+            'gain_by_true_count': {MIN_TC + b: self.sums[b] / self.counts[b]
+                                   for b in range(TC_BUCKETS) if self.counts[b]},
+        }
+
+def cells_from_csv(path: str = DEFAULT_DEVIATIONS) -> List[Cell]:
+    """The cells and actions of an existing deviation file (insurance rows skipped)."""
+    return [Cell(row['kind'].strip().lower(), int(row['total']), parse_upcard(row['upcard']),
+                 row['action'].strip().upper(), row['direction'].strip())
+            for row in csv_rows(path) if row['kind'].strip().lower() != 'insurance']
+
+class _Forced:
+    """Plays one forced action at the first decision, then follows the base strategy."""
+
+    def __init__(self, base, action):
+        self.base = base
+        self.action = action
+        self.pending = True
+
+    def lookup(self, *args):
+        if self.pending:
+            self.pending = False
+            return self.action
+        return self.base.lookup(*args)
+
+    def take_insurance(self, tc):
+        return False
+
+def _hands(kind: str, total: int) -> List[Tuple[int, int]]:
+    """Two-card hands (card values) that make the cell, avoiding pairs for hard totals where possible."""
+    if kind == 'pair':
+        return [(total, total)]
+    if kind == 'soft':
+        return [(11, total - 11)]
+    hands = [(a, total - a) for a in range(2, 11) if a < total - a <= 10]
+    return hands or [(total // 2, total - total // 2)]
+
+def _compared_actions(base, cell: Cell, rules: Rules):
+    """
+    The chart action and the deviation action to compare at the first decision,
+    and the rules to compare them under. When both codes prefer the same
+    action (R against RS), the fallbacks are compared with that action ruled out.
+    """
+    kind = KINDS[cell.kind]
+    deviation = CODES[cell.action]
+    if kind == PAIR:
+        pair_action = base.cell(PAIR, cell.total, cell.up)[0]
+        if pair_action == SPLIT:
+            chart = (SPLIT, NONE)
+        elif cell.total == 11:
+            chart = base.cell(SOFT, 12, cell.up)
+        else:
+            chart = base.cell(HARD, cell.total * 2, cell.up)
+    else:
+        chart = base.cell(kind, cell.total, cell.up)
+    if chart[0] != deviation[0]:
+        return chart[0], deviation[0], rules
+    if chart[0] == SURRENDER:
+        return chart[1], deviation[1], replace(rules, surrender=False)
+    if chart[0] == DOUBLE:
+        return chart[1], deviation[1], replace(rules, double_totals=())
+    return chart[0], deviation[0], rules
+
+def _take_last(cards: list, value: int) -> bool:
+    """
+    Remove the last card of `value`. Taking the first one instead would skew the
+    cards dealt next (the hole card could then never match it unless it repeats).
+    """
+    for i in range(len(cards) - 1, -1, -1):
+        if cards[i] == value:
+            del cards[i]
+            return True
+    return False
+
+def run_batch(args) -> Tuple[List[int], List[float], List[float]]:
+    """Worker: `trials` paired trials of one cell; returns per-bucket count, sum and sum of squares."""
+    cell, trials, seed, rules = args
+    rng = random.Random(seed)
+    base = load_strategy(deviation_paths=())
+    chart_action, deviation_action, rules = _compared_actions(base, cell, rules)
+    chart_engine = RoundEngine(rules, base)
+    deviation_engine = RoundEngine(rules, base)
+    hands = _hands(cell.kind, cell.total)
+    tags = HILO_TAGS
+    deck = [value for value in range(2, 12) for _ in range(4 * rules.num_decks)]
+    deck += [10] * (12 * rules.num_decks)
+    usable = int(len(deck) * rules.penetration)
+    counts = [0] * TC_BUCKETS
+    sums = [0.0] * TC_BUCKETS
+    squares = [0.0] * TC_BUCKETS
+
+    done = 0
+    while done < trials:
+        rng.shuffle(deck)
+        # A few trials per shoe, at independent random depths
+        for _ in range(min(8, trials - done)):
+            depth = rng.randrange(usable)
+            rest = deck[depth:]
+            p1, p2 = rng.choice(hands)
+            if not (_take_last(rest, p1) and _take_last(rest, p2) and _take_last(rest, cell.up)):
+                continue
+            if len(rest) < rules.max_cards_per_round + 1:
+                continue
+            rc = sum(tags[value] for value in deck[:depth])
+            shoe = bytes([p1, cell.up, p2] + rest)
+            # Same true count the engine sees at the first decision
+            tc = (rc + tags[p1] + tags[p2] + tags[cell.up]) * CARDS_PER_DECK / (len(shoe) - 4)
+            bucket = min(max(math.floor(tc) - MIN_TC, 0), TC_BUCKETS - 1)
+
+            chart_engine.strategy = _Forced(base, chart_action)
+            chart_engine.new_shoe(shoe, rc)
+            deviation_engine.strategy = _Forced(base, deviation_action)
+            deviation_engine.new_shoe(shoe, rc)
+            gain = deviation_engine.play_round() - chart_engine.play_round()
+            counts[bucket] += 1
+            sums[bucket] += gain
+            squares[bucket] += gain * gain
+            done += 1
+    return counts, sums, squares
+
+def best_index(result: CellResult) -> Tuple[Optional[int], float]:
+    """The threshold bucket maximizing the summed gain on the deviation's side, or None if none gains."""
+    best, best_gain = None, 0.0
+    for b in range(TC_BUCKETS + 1):
+        side = range(b, TC_BUCKETS) if result.cell.direction == '>=' else range(0, b)
+        gain = sum(result.sums[k] for k in side)
+        if gain > best_gain:
+            best, best_gain = b, gain
+    return best, best_gain
+
+def _resolved(result: CellResult, bucket: Optional[int], z: float) -> bool:
+    """The buckets either side of the index both have intervals excluding zero, on the right sides."""
+    if bucket is None:
+        return False
+    applied, other = (bucket, bucket - 1) if result.cell.direction == '>=' else (bucket - 1, bucket)
+    checks = []
+    if 0 <= applied < TC_BUCKETS:
+        checks.append(result.interval(applied, z)[0] > 0)
+    if 0 <= other < TC_BUCKETS:
+        checks.append(result.interval(other, z)[1] < 0)
+    return bool(checks) and all(checks)
+
+def optimize(cells: Sequence[Cell], rules: Rules = DEFAULT_RULES, master_seed: int = 0,
+             workers: Optional[int] = None, batch_trials: int = DEFAULT_BATCH_TRIALS,
+             max_trials: int = DEFAULT_MAX_TRIALS, z: float = DEFAULT_Z) -> List[CellResult]:
+    """Run every cell in parallel batches until its index is resolved or max_trials is reached."""
+    workers = workers or os.cpu_count() or 1
+    results = [CellResult(cell) for cell in cells]
+    seeds = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            active = [r for r in results if not r.resolved and r.trials < max_trials]
+            if not active:
+                break
+            # One batch per worker for every unresolved cell; seeds never repeat across waves
+            owners = [r for r in active for _ in range(workers)]
+            tasks = [(r.cell, batch_trials, derive_seed(master_seed, seeds + k), rules) for k, r in enumerate(owners)]
+            seeds += len(tasks)
+            for r, sample in zip(owners, pool.map(run_batch, tasks)):
+                r.add(*sample)
+            for r in active:
+                bucket, _ = best_index(r)
+                r.index = None if bucket is None else bucket + MIN_TC
+                r.resolved = _resolved(r, bucket, z)
+    return results
+
+def write_deviations(results: Sequence[CellResult], path: str, insurance_index: Optional[int] = None) -> None:
+    """
+    Write found indices in the deviation CSV format read by StrategyTable.load_deviations.
+    Insurance is not searched; pass its index through so the file can replace the defaults.
+    """
+    with open(path, 'w', newline='') as f:
+        f.write("# Deviation indices found by deviation_optimizer.py (floored Hi-Lo true count).\n")
+        f.write("kind,total,upcard,index,direction,action\n")
+        if insurance_index is not None:
+            f.write(f"insurance,0,11,{insurance_index},>=,Y\n")
+        for r in results:
+            if r.index is not None:
+                up = 'A' if r.cell.up == 11 else r.cell.up
+                f.write(f"{r.cell.kind},{r.cell.total},{up},{r.index},{r.cell.direction},{r.cell.action}\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find count-deviation indices by paired simulation")
+    parser.add_argument('--cells', default=DEFAULT_DEVIATIONS,
+                        help="Deviation CSV whose cells and actions are searched (default: Illustrious 18)")
+    parser.add_argument('--output', default='deviations.csv', help="Where to write the found indices")
+    parser.add_argument('--decks', type=int, default=6)
+    parser.add_argument('--h17', action='store_true', help="Dealer hits soft 17")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--batch-trials', type=int, default=DEFAULT_BATCH_TRIALS)
+    parser.add_argument('--max-trials', type=int, default=DEFAULT_MAX_TRIALS)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rules = replace(DEFAULT_RULES, num_decks=args.decks, hit_soft_17=args.h17)
+    results = optimize(cells_from_csv(args.cells), rules, args.seed, args.workers,
+                       args.batch_trials, args.max_trials)
+    insurance_index = load_strategy(deviation_paths=(args.cells,)).insurance_index
+    write_deviations(results, args.output, insurance_index)
+    print(json.dumps([r.to_dict() for r in results], indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Composition-dependent expected-value solver.
+
+A composition is a tuple of ten counts: the cards of value 2 through 11
+(ten-valued cards merged, 11 for aces) still in the shoe. Given the cards the
+player holds, the dealer upcard and the remaining composition, solve()
+returns the expected value of standing, hitting (and then playing
+optimally), doubling and surrendering, plus splitting for pairs.
+
+Player draws always use the exact shrinking composition. Dealer final-total
+distributions are computed exactly for the composition at decision time
+(and after the first `exact_depth` player draws), and memoized per
+(upcard, composition) in a bounded LRU cache, so repeated queries against
+the same shoe reuse earlier work. Split EV plays one split hand against the
+post-split composition and doubles it; resplits are not modelled.
+"""
+import argparse
+import json
+from functools import lru_cache
+from typing import Dict, Iterable, Sequence, Tuple
+
+from blackjack import values
+
+Composition = Tuple[int, ...]
+
+DEALER_CACHE_SIZE = 8192
+
+# Player draws after which dealer probabilities stop being recomputed (see _Solver)
+DEFAULT_EXACT_DEPTH = 0
+
+# Dealer outcome slots: final totals 17-21, then bust
+BUST = 5
+
+def full_shoe(num_decks: int = 6) -> Composition:
+    return tuple([4 * num_decks] * 8 + [16 * num_decks, 4 * num_decks])
+
+def remove(comp: Composition, card_values: Iterable[int]) -> Composition:
+    """Return the composition with the given card values taken out."""
+    counts = list(comp)
+    for value in card_values:
+        if counts[value - 2] <= 0:
+            raise ValueError(f"No card of value {value} left in the composition")
+        counts[value - 2] -= 1
+    return tuple(counts)
+
+def composition_of(cards: Iterable[tuple]) -> Composition:
+    """Composition of a collection of (rank, suit) cards, e.g. the undealt part of a deck."""
+    counts = [0] * 10
+    for card in cards:
+        counts[values[card[0]] - 2] += 1
+    return tuple(counts)
+
+def remaining_shoe(num_decks: int, penetration: float) -> Composition:
+    """A neutral composition: every rank depleted evenly after dealing `penetration` of the shoe."""
+    return tuple(round(count * (1 - penetration)) for count in full_shoe(num_decks))
+
+def composition_after(num_decks: int, seen_cards: Iterable[tuple]) -> Composition:
+    """Composition of a fresh shoe after removing (rank, suit) cards that have been seen."""
+    return remove(full_shoe(num_decks), (values[card[0]] for card in seen_cards))
+
+def add_card(total: int, soft: int, value: int) -> Tuple[int, int]:
+    """Total and softness after adding a card of `value` (2-11) to a hand."""
+    if value == 11:
+        if soft:
+            total, soft = total + 1, soft
+        else:
+            total, soft = total + 11, 1
+    else:
+        total += value
+    if total > 21 and soft:
+        total, soft = total - 10, 0
+    return total, soft
+
+@lru_cache(maxsize=DEALER_CACHE_SIZE)
+def dealer_distribution(up: int, comp: Composition, hit_soft_17: bool = False,
+                        peek: bool = True) -> Tuple[float, ...]:
+    """
+    Probabilities of the dealer finishing on 17, 18, 19, 20, 21 or busting.
+
+    `comp` must already exclude the upcard. With `peek`, the dealer has
+    checked for blackjack, so a ten under an ace (or an ace under a ten) is
+    ruled out for the hole card.
+    """
+    counts = list(comp)
+    memo = {}
+
+    def draw(total, soft, n, code, exclude=-1):
+        # The dealer holds total (soft when an ace counts 11) and must draw;
+        # code identifies the cards drawn so far, so it keys the memo with total/soft
+        key = code + total * 2 + soft
+        if exclude < 0:
+            cached = memo.get(key)
+            if cached is not None:
+                return cached
+        pool = n - counts[exclude] if exclude >= 0 else n
+        acc = [0.0] * 6
+        if pool <= 0:
+            return acc
+        for i in range(10):
+            c = counts[i]
+            if not c or i == exclude:
+                continue
+            p = c / pool
+            t, s = add_card(total, soft, i + 2)
+            if t > 21:
+                acc[BUST] += p
+            elif t >= 17 and not (hit_soft_17 and s and t == 17):
+                acc[t - 17] += p
+            else:
+                counts[i] = c - 1
+                sub = draw(t, s, n - 1, code + (64 << (5 * i)))
+                counts[i] = c
+                for k in range(6):
+                    acc[k] += p * sub[k]
+        if exclude < 0:
+            memo[key] = acc
+        return acc
+
+    exclude = -1
+    if peek and up == 11:
+        exclude = 8
+    elif peek and up == 10:
+        exclude = 9
+    return tuple(draw(up, int(up == 11), sum(counts), 0, exclude))
+
+def stand_ev(total: int, up: int, comp: Composition, hit_soft_17: bool = False, peek: bool = True) -> float:
+    if total > 21:
+        return -1.0
+    dist = dealer_distribution(up, comp, hit_soft_17, peek)
+    ev = dist[BUST]
+    for slot in range(5):
+        dealer = slot + 17
+        if total > dealer:
+            ev += dist[slot]
+        elif total < dealer:
+            ev -= dist[slot]
+    return ev
+
+class _Solver:
+    """
+    Player-side recursion for one query; memoizes optimal play per hand state.
+
+    Player draw probabilities always follow the exact shrinking composition.
+    Dealer distributions are recomputed for the composition after each of the
+    first `exact_depth` player draws; deeper states reuse their ancestor's
+    distribution, which keeps interactive queries fast at a negligible cost
+    in accuracy.
+    """
+
+    def __init__(self, up, hit_soft_17, peek, exact_depth):
+        self.up = up
+        self.hit_soft_17 = hit_soft_17
+        self.peek = peek
+        self.exact_depth = exact_depth
+        self.memo = {}
+
+    def stand(self, total, dcomp):
+        return stand_ev(total, self.up, dcomp, self.hit_soft_17, self.peek)
+
+    def best(self, total, soft, comp, dcomp, depth):
+        """EV of the best of standing or hitting from this hand."""
+        if total > 21:
+            return -1.0
+        if total == 21:
+            return self.stand(total, dcomp)
+        key = (total, soft, comp, dcomp)
+        cached = self.memo.get(key)
+        if cached is None:
+            cached = max(self.stand(total, dcomp), self.hit(total, soft, comp, dcomp, depth))
+            self.memo[key] = cached
+        return cached
+
+    def hit(self, total, soft, comp, dcomp, depth):
+        n = sum(comp)
+        exact = depth < self.exact_depth
+        ev = 0.0
+        for i, c in enumerate(comp):
+            if c:
+                t, s = add_card(total, soft, i + 2)
+                rest = comp[:i] + (c - 1,) + comp[i + 1:]
+                ev += c / n * self.best(t, s, rest, rest if exact else dcomp, depth + 1)
+        return ev
+
+    def double(self, total, soft, comp, dcomp, depth):
+        n = sum(comp)
+        exact = depth < self.exact_depth
+        ev = 0.0
+        for i, c in enumerate(comp):
+            if c:
+                t, _ = add_card(total, soft, i + 2)
+                rest = comp[:i] + (c - 1,) + comp[i + 1:]
+                ev += c / n * self.stand(t, rest if exact else dcomp)
+        return 2 * ev
+
+    def split(self, value, comp, double_after_split):
+        """Play one hand started from the split card and count it twice."""
+        n = sum(comp)
+        ev = 0.0
+        for i, c in enumerate(comp):
+            if not c:
+                continue
+            t, s = add_card(*add_card(0, 0, value), i + 2)
+            rest = comp[:i] + (c - 1,) + comp[i + 1:]
+            dcomp = rest if self.exact_depth else comp
+            if value == 11:
+                hand = self.stand(t, dcomp)
+            else:
+                hand = self.best(t, s, rest, dcomp, 1)
+                if double_after_split:
+                    hand = max(hand, self.double(t, s, rest, dcomp, 1))
+            ev += c / n * hand
+        return 2 * ev
+
+def solve(player: Sequence[int], up: int, comp: Composition, hit_soft_17: bool = False,
+          peek: bool = True, double_after_split: bool = True,
+          exact_depth: int = DEFAULT_EXACT_DEPTH) -> Dict[str, float]:
+    """
+    Expected value of every legal action for a hand of card values.
+
+    `comp` is the shoe after removing the player's cards and the dealer
+    upcard. Returns a dict keyed by the action names used by
+    recommend_hilo_action.
+    """
+    total, soft = 0, 0
+    for value in player:
+        total, soft = add_card(total, soft, value)
+    solver = _Solver(up, hit_soft_17, peek, exact_depth)
+    evs = {"Stand": solver.stand(total, comp)}
+    if total < 21:
+        evs["Hit"] = solver.hit(total, soft, comp, comp, 0)
+    if len(player) == 2:
+        evs["Double"] = solver.double(total, soft, comp, comp, 0)
+        evs["Surrender"] = -0.5
+        if player[0] == player[1]:
+            evs["Split"] = solver.split(player[0], comp, double_after_split)
+    return evs
+
+def solve_hand(player_hand, dealer_hand, comp: Composition, **kwargs) -> Dict[str, float]:
+    """solve() for (rank, suit) hands as used by the CLI and GUIs; dealer_hand[0] is the upcard."""
+    return solve([values[card[0]] for card in player_hand], values[dealer_hand[0][0]], comp, **kwargs)
+
+def best_action(evs: Dict[str, float]) -> str:
+    return max(evs, key=evs.get)
+
+# Representative two-card hands for each chart row
+HARD_HANDS = {total: ((total - 2, 2) if total <= 11 else (10, total - 10)) for total in range(5, 21)}
+SOFT_HANDS = {total: (11, total - 11) for total in range(13, 21)}
+PAIR_HANDS = {value: (value, value) for value in range(2, 12)}
+
+def strategy_chart(comp: Composition, hit_soft_17: bool = False, peek: bool = True,
+                   double_after_split: bool = True, exact_depth: int = DEFAULT_EXACT_DEPTH
+                   ) -> Dict[str, Dict[int, Dict[int, str]]]:
+    """
+    Best action for every chart cell at the given composition.
+
+    Returns {'hard'|'soft'|'pair': {total: {upcard: action}}}, built from one
+    representative two-card hand per row.
+    """
+    chart = {'hard': {}, 'soft': {}, 'pair': {}}
+    rows = [('hard', t, h) for t, h in HARD_HANDS.items()]
+    rows += [('soft', t, h) for t, h in SOFT_HANDS.items()]
+    rows += [('pair', v, h) for v, h in PAIR_HANDS.items()]
+    for kind, total, hand in rows:
+        cells = chart[kind].setdefault(total, {})
+        for up in range(2, 12):
+            try:
+                rest = remove(comp, hand + (up,))
+            except ValueError:
+                continue
+            evs = solve(hand, up, rest, hit_soft_17, peek, double_after_split, exact_depth)
+            if kind != 'pair':
+                evs.pop("Split", None)
+            cells[up] = best_action(evs)
+    return chart
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Composition-dependent blackjack EV solver")
+    parser.add_argument('--decks', type=int, default=6)
+    parser.add_argument('--player', type=int, nargs='*', help="Player card values (11 = ace)")
+    parser.add_argument('--up', type=int, help="Dealer upcard value (11 = ace)")
+    parser.add_argument('--h17', action='store_true', help="Dealer hits soft 17")
+    parser.add_argument('--penetration', type=float, default=0.0,
+                        help="Fraction of the shoe already dealt (evenly depleted)")
+    args = parser.parse_args(argv)
+
+    comp = remaining_shoe(args.decks, args.penetration)
+    if args.player and args.up:
+        result = solve(args.player, args.up, remove(comp, args.player + [args.up]), args.h17)
+    else:
+        result = strategy_chart(comp, args.h17)
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
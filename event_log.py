@@ -0,0 +1,190 @@
+"""
+Append-only binary log of shoes, dealt cards, decisions and outcomes.
+
+Every event is one fixed-width 16-byte little-endian record:
+
+    hand    uint32  hand number within the log
+    shoe    uint32  shoe number within the log
+    kind    uint8   SHUFFLE, DEAL, DECISION or OUTCOME
+    actor   uint8   PLAYER or DEALER (DEAL), 0 otherwise
+    code    uint8   card byte (DEAL), action taken (DECISION), number of decks (SHUFFLE)
+    aux     uint8   recommended action (DECISION)
+    value   int16   true count x 10 (DECISION), net units x 2 (OUTCOME)
+    (2 bytes padding)
+
+Cards use the byte encoding from cards.py and actions the codes from
+strategy.py. EventLog buffers records in memory and writes them in batches;
+the readers memory-map the file, so logs far larger than RAM can be replayed
+or aggregated a chunk at a time.
+"""
+import mmap
+import os
+import struct
+from typing import Iterator, List, NamedTuple, Sequence
+
+from cards import from_tuple
+
+RECORD = struct.Struct('<IIBBBBh2x')
+RECORD_SIZE = RECORD.size
+
+SHUFFLE, DEAL, DECISION, OUTCOME = range(4)
+PLAYER, DEALER = range(2)
+NO_ACTION = 255
+
+DEFAULT_BUFFER_RECORDS = 4096
+
+class Event(NamedTuple):
+    hand: int
+    shoe: int
+    kind: int
+    actor: int
+    code: int
+    aux: int
+    value: int
+
+class HandRecord(NamedTuple):
+    hand: int
+    shoe: int
+    player_cards: List[int]
+    dealer_cards: List[int]
+    decisions: List[tuple]
+    net: float
+    # Decks in the shoe from the last SHUFFLE record, 0 if the log has none yet
+    num_decks: int = 0
+
+class EventLog:
+    """Buffered writer for the binary event log; use as a context manager or call close()."""
+
+    def __init__(self, path: str, buffer_records: int = DEFAULT_BUFFER_RECORDS):
+        self.path = path
+        self._file = open(path, 'ab')
+        self._buffer = bytearray(buffer_records * RECORD_SIZE)
+        self._used = 0
+        # Continue numbering after any hands and shoes already in the file
+        self.hand = 0
+        self.shoe = 0
+        if os.path.getsize(path) >= RECORD_SIZE:
+            with open(path, 'rb') as f:
+                f.seek(-RECORD_SIZE, os.SEEK_END)
+                last = Event(*RECORD.unpack(f.read(RECORD_SIZE)))
+            self.hand, self.shoe = last.hand, last.shoe
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, kind, actor=0, code=0, aux=0, value=0):
+        RECORD.pack_into(self._buffer, self._used, self.hand, self.shoe, kind, actor, code, aux, value)
+        self._used += RECORD_SIZE
+        if self._used == len(self._buffer):
+            self.flush()
+
+    def shuffle(self, num_decks: int) -> int:
+        """Start a new shoe and return its number."""
+        self.shoe += 1
+        self._write(SHUFFLE, code=num_decks)
+        return self.shoe
+
+    def begin_hand(self) -> int:
+        self.hand += 1
+        return self.hand
+
+    def deal(self, actor: int, card) -> None:
+        """Record a dealt card, given as a card byte or a (rank, suit) tuple."""
+        self._write(DEAL, actor, card if isinstance(card, int) else from_tuple(card))
+
+    def decision(self, action: int, recommended: int = NO_ACTION, true_count: float = 0.0) -> None:
+        self._write(DECISION, 0, action, recommended, max(-32768, min(32767, round(true_count * 10))))
+
+    def outcome(self, net: float) -> None:
+        self._write(OUTCOME, value=round(net * 2))
+
+    def hand_record(self, player_cards: Sequence, dealer_cards: Sequence,
+                    actions: Sequence[int], net: float) -> None:
+        """Record a complete hand in one call (used by the simulator)."""
+        self.begin_hand()
+        for card in player_cards:
+            self.deal(PLAYER, card)
+        for card in dealer_cards:
+            self.deal(DEALER, card)
+        for action in actions:
+            self.decision(action, action)
+        self.outcome(net)
+
+    def flush(self) -> None:
+        if self._used:
+            self._file.write(memoryview(self._buffer)[:self._used])
+            self._used = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+def _mapped(path: str):
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < RECORD_SIZE:
+            return None
+        return mmap.mmap(f.fileno(), size - size % RECORD_SIZE, access=mmap.ACCESS_READ)
+
+def iter_events(path: str) -> Iterator[Event]:
+    """Stream every record from a memory-mapped log."""
+    mapped = _mapped(path)
+    if mapped is None:
+        return
+    with mapped:
+        for fields in RECORD.iter_unpack(mapped):
+            yield Event(*fields)
+
+def replay(path: str) -> Iterator[HandRecord]:
+    """Rebuild hands from the log, one at a time."""
+    current = None
+    num_decks = 0
+    for event in iter_events(path):
+        if event.kind == SHUFFLE:
+            num_decks = event.code
+            continue
+        if current is None or current.hand != event.hand:
+            if current is not None:
+                yield current
+            current = HandRecord(event.hand, event.shoe, [], [], [], 0.0, num_decks)
+        if event.kind == DEAL:
+            (current.player_cards if event.actor == PLAYER else current.dealer_cards).append(event.code)
+        elif event.kind == DECISION:
+            current.decisions.append((event.code, event.aux, event.value / 10))
+        elif event.kind == OUTCOME:
+            current = current._replace(net=event.value / 2)
+    if current is not None:
+        yield current
+
+def aggregate(path: str, chunk_records: int = 1 << 20) -> dict:
+    """
+    Totals over every hand in the log, computed a chunk at a time with NumPy.
+
+    Returns hands, net units, sum of squared net, decisions and how many
+    decisions followed the recommendation.
+    """
+    # NumPy is only needed for bulk reads, so the CLI and GUIs do not pay for importing it
+    import numpy as np
+
+    dtype = np.dtype([('hand', '<u4'), ('shoe', '<u4'), ('kind', 'u1'), ('actor', 'u1'),
+                      ('code', 'u1'), ('aux', 'u1'), ('value', '<i2'), ('pad', 'V2')])
+    totals = {'hands': 0, 'net': 0.0, 'net_sq': 0.0, 'decisions': 0, 'followed': 0}
+    size = os.path.getsize(path) // RECORD_SIZE
+    if not size:
+        return totals
+    records = np.memmap(path, dtype=dtype, mode='r', shape=(size,))
+    for start in range(0, size, chunk_records):
+        chunk = records[start:start + chunk_records]
+        outcomes = chunk['value'][chunk['kind'] == OUTCOME].astype(np.float64) / 2
+        decisions = chunk[chunk['kind'] == DECISION]
+        totals['hands'] += len(outcomes)
+        totals['net'] += float(outcomes.sum())
+        totals['net_sq'] += float((outcomes ** 2).sum())
+        totals['decisions'] += len(decisions)
+        totals['followed'] += int((decisions['code'] == decisions['aux']).sum())
+    return totals
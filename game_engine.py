@@ -0,0 +1,195 @@
+"""
+UI-independent blackjack game engine.
+
+GameEngine owns the shoe, the hands, the count tracker and the optional
+event log, and moves through a small state machine:
+
+    WAITING -> PLAYER_TURN -> (DEALER_TURN) -> FINISHED -> PLAYER_TURN ...
+
+Every change is announced to subscribers as (event, data) pairs, so a front
+end only has to render what it is told. Events:
+
+    'state'           {'state': new state}
+    'new_hand'        {'shoe': number of the shoe being dealt}
+    'shuffle'         {'num_decks': decks in the new shoe} (only once the cut card is out)
+    'deal'            {'actor': PLAYER or DEALER, 'card': (rank, suit)}
+    'reveal'          {'cards': the dealer's full hand} (also when the player busts)
+    'recommendation'  {'action': recommended action name, 'true_count': Hi-Lo true count}
+    'outcome'         {'net': units won, 'player_value', 'dealer_value', 'bust': player busted}
+
+Handlers run synchronously on the thread that called the engine.
+
+snapshot() captures the shoe, count and hands as an immutable
+game_state.GameState, and restore() puts the engine back to one, e.g. to
+resume a saved session.
+"""
+from typing import Callable, List
+
+from shuffling_deck import ContinuousShoe, SeedLike
+from blackjack import calculate_hand_value, recommend_hilo_action
+from cards import from_tuple, to_tuples
+from counting import ShoeTracker
+from event_log import DEALER, PLAYER
+from game_state import GameState
+from strategy import ACTION_NAMES, HIT, STAND
+
+WAITING, PLAYER_TURN, DEALER_TURN, FINISHED = range(4)
+STATE_NAMES = ("Waiting", "Player's turn", "Dealer's turn", "Finished")
+
+Listener = Callable[[str, dict], None]
+
+class GameEngine:
+    """One player against the dealer; call new_hand(), then hit() and stand()."""
+
+    def __init__(self, num_decks: int = 6, penetration: float = 0.75, event_log=None, seed: SeedLike = None):
+        self.num_decks = num_decks
+        self.event_log = event_log
+        self.shoe = ContinuousShoe(num_decks, penetration, seed)
+        # A shoe run dry mid-hand starts a new count like any other shuffle
+        self.shoe.on_shuffle = self._shuffle
+        self.tracker = ShoeTracker(num_decks=num_decks)
+        self.player_hand = []
+        self.dealer_hand = []
+        self.hole_hidden = False
+        self.recommendation = None
+        self.state = WAITING
+        self._listeners: List[Listener] = []
+
+    def subscribe(self, listener: Listener) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Listener) -> None:
+        self._listeners.remove(listener)
+
+    def emit(self, event: str, **data) -> None:
+        for listener in self._listeners:
+            listener(event, data)
+
+    def _set_state(self, state):
+        self.state = state
+        self.emit('state', state=state)
+
+    def _require(self, state):
+        if self.state != state:
+            raise ValueError(f"Not allowed in state {STATE_NAMES[self.state]!r}")
+
+    def _shuffle(self):
+        self.tracker.reset()
+        if self.event_log:
+            self.event_log.shuffle(self.num_decks)
+        self.emit('shuffle', num_decks=self.num_decks)
+
+    def _deal(self, actor, counted=True):
+        card = self.shoe.deal()
+        (self.player_hand if actor == PLAYER else self.dealer_hand).append(card)
+        if counted:
+            self.tracker.observe(card)
+        if self.event_log:
+            self.event_log.deal(actor, card)
+        self.emit('deal', actor=actor, card=card)
+        return card
+
+    def _recommend(self):
+        # The game only offers hit and stand
+        self.recommendation = recommend_hilo_action(self.player_hand, self.dealer_hand,
+                                                    self.tracker.running_count, self.tracker.decks_remaining,
+                                                    can_double=False, can_split=False, can_surrender=False)
+        self.emit('recommendation', action=self.recommendation, true_count=self.tracker.true_count())
+
+    def _log_decision(self, action):
+        if self.event_log:
+            self.event_log.decision(action, ACTION_NAMES.index(self.recommendation), self.tracker.true_count())
+
+    def _reveal(self):
+        self.hole_hidden = False
+        self.tracker.observe(self.dealer_hand[1])
+        self.emit('reveal', cards=list(self.dealer_hand))
+
+    def _finish(self, net, bust=False):
+        # A bust hand ends without the dealer playing, but the hole card is still turned over
+        if self.hole_hidden:
+            self._reveal()
+        if self.event_log:
+            self.event_log.outcome(net)
+        self._set_state(FINISHED)
+        self.emit('outcome', net=net, player_value=calculate_hand_value(self.player_hand),
+                  dealer_value=calculate_hand_value(self.dealer_hand), bust=bust)
+
+    def new_hand(self) -> None:
+        """Deal two cards each from the current shoe, reshuffling first if the cut card is out."""
+        if self.state in (PLAYER_TURN, DEALER_TURN):
+            raise ValueError("Finish the current hand first")
+        if self.shoe.start_hand():
+            self._shuffle()
+        self.player_hand = []
+        self.dealer_hand = []
+        self.hole_hidden = True
+        self.emit('new_hand', shoe=self.shoe.shoe_number)
+        if self.event_log:
+            self.event_log.begin_hand()
+        for actor in (PLAYER, PLAYER, DEALER):
+            self._deal(actor)
+        # The hole card stays out of the count until it is revealed
+        self._deal(DEALER, counted=False)
+        self._set_state(PLAYER_TURN)
+        self._recommend()
+
+    def hit(self) -> None:
+        self._require(PLAYER_TURN)
+        self._log_decision(HIT)
+        self._deal(PLAYER)
+        if calculate_hand_value(self.player_hand) > 21:
+            self._finish(-1, bust=True)
+        else:
+            self._recommend()
+
+    def stand(self) -> None:
+        """Reveal the hole card, draw the dealer to 17 and settle the hand."""
+        self._require(PLAYER_TURN)
+        self._log_decision(STAND)
+        self._set_state(DEALER_TURN)
+        self._reveal()
+        while calculate_hand_value(self.dealer_hand) < 17:
+            self._deal(DEALER)
+
+        player_value = calculate_hand_value(self.player_hand)
+        dealer_value = calculate_hand_value(self.dealer_hand)
+        if dealer_value > 21 or player_value > dealer_value:
+            self._finish(1)
+        elif player_value < dealer_value:
+            self._finish(-1)
+        else:
+            self._finish(0)
+
+    def analysis_inputs(self):
+        """
+        Copies of the player hand, dealer hand and unseen-card composition, safe
+        to hand to a background worker while the game moves on. The dealer's
+        hidden card is not counted yet, so it is still part of the composition.
+        """
+        return list(self.player_hand), list(self.dealer_hand), tuple(self.tracker.remaining)
+
+    def snapshot(self) -> GameState:
+        """The current shoe, count and hands as an immutable GameState."""
+        shoe = bytes(from_tuple(card) for card in self.shoe.undealt())
+        return GameState(self.num_decks, shoe, 0, self.shoe.dealt, tuple(self.tracker.remaining),
+                         bytes(from_tuple(card) for card in self.player_hand),
+                         bytes(from_tuple(card) for card in self.dealer_hand),
+                         self.hole_hidden, self.state)
+
+    def restore(self, state: GameState) -> None:
+        """
+        Continue from a snapshot: its undealt cards are dealt next and its count
+        and hands replace the current ones. Later shoes still come from this
+        engine's own shuffle stream.
+        """
+        if state.num_decks != self.num_decks:
+            raise ValueError(f"Snapshot is for {state.num_decks} decks, not {self.num_decks}")
+        self.shoe.resume(to_tuples(state.undealt), state.dealt)
+        self.tracker.restore(state.remaining)
+        self.player_hand = to_tuples(state.player)
+        self.dealer_hand = to_tuples(state.dealer)
+        self.hole_hidden = state.hole_hidden
+        self._set_state(state.state)
+        if state.state == PLAYER_TURN:
+            self._recommend()
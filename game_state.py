@@ -0,0 +1,294 @@
+"""
+Compact, copy-on-write snapshots of a hand in progress, and what-if play-outs.
+
+A GameState holds everything needed to continue a hand: the undealt part of
+the shoe in deal order, how many cards of each value the player has not
+seen (the running count of any system follows from that; a hidden hole card
+is not seen yet), the player's and dealer's cards and the game state.
+Cards are the one-byte encoding from cards.py. A state is immutable:
+dealing from it returns a new state that shares the shoe bytes and only
+moves a cursor, so a state can be forked thousands of times for the cost of
+a small tuple each.
+
+to_bytes() packs a state into a fixed header plus the card bytes (about 250
+bytes for a fresh 6-deck shoe), so a session can be saved and resumed, or a
+state handed to worker processes, without pickling engine objects.
+
+what_if() estimates the EV of hitting, standing and doubling from a state by
+sampling continuations: the cards the player has not seen (the rest of the
+shoe and a hidden hole card) are dealt in random order, and every action is
+played out on the same sampled cards. After a hit the player follows the
+strategy table; the dealer stands on soft 17 and does not peek, as in
+GameEngine.
+"""
+import argparse
+import json
+import math
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from cards import CARD_HILO, CARD_VALUE, CARDS_PER_DECK, to_tuples
+from counting import CARD_SLOTS, SYSTEMS
+from shuffling_deck import SeedLike, lazy_shuffle, make_rng
+from strategy import HIT, default_strategy
+
+FORMAT_VERSION = 1
+MAGIC = b'BJGS'
+
+# magic, version, decks, game state, hole hidden, player cards, dealer cards,
+# cards dealt, undealt cards, remaining per value slot
+HEADER = struct.Struct('<4sHBBBBBxHH10H')
+
+ACTIONS = ('hit', 'stand', 'double')
+
+class GameState(NamedTuple):
+    num_decks: int
+    # Undealt cards at capture time, in deal order; pos of them have been dealt since
+    shoe: bytes
+    pos: int
+    # Cards dealt from the shoe so far
+    dealt: int
+    # Cards not seen yet per value slot (2-9, ten-valued, ace), a hidden hole card included
+    remaining: Tuple[int, ...]
+    player: bytes
+    # dealer[1] is the hole card
+    dealer: bytes
+    hole_hidden: bool
+    # GameEngine state code
+    state: int
+
+    @classmethod
+    def new_shoe(cls, num_decks: int, shoe: Iterable[int], state: int = 0) -> 'GameState':
+        """A state at the start of a shoe, before any card is dealt."""
+        return cls(num_decks, bytes(shoe), 0, 0, (4 * num_decks,) * 8 + (16 * num_decks, 4 * num_decks),
+                   b'', b'', False, state)
+
+    def deal(self, to_dealer: bool = False, hidden: bool = False) -> 'GameState':
+        """Deal the next card to the player (or the dealer; `hidden` for the hole card)."""
+        card = self.shoe[self.pos]
+        remaining = list(self.remaining)
+        if not hidden:
+            remaining[CARD_SLOTS[card]] -= 1
+        if to_dealer:
+            return self._replace(pos=self.pos + 1, dealt=self.dealt + 1, remaining=tuple(remaining),
+                                 dealer=self.dealer + bytes((card,)), hole_hidden=hidden or self.hole_hidden)
+        return self._replace(pos=self.pos + 1, dealt=self.dealt + 1, remaining=tuple(remaining),
+                             player=self.player + bytes((card,)))
+
+    def reveal(self) -> 'GameState':
+        """Turn the hole card over, taking it out of the unseen cards."""
+        if not self.hole_hidden:
+            return self
+        remaining = list(self.remaining)
+        remaining[CARD_SLOTS[self.dealer[1]]] -= 1
+        return self._replace(remaining=tuple(remaining), hole_hidden=False)
+
+    @property
+    def undealt(self) -> bytes:
+        return self.shoe[self.pos:]
+
+    @property
+    def player_cards(self) -> List[tuple]:
+        return to_tuples(self.player)
+
+    @property
+    def dealer_cards(self) -> List[tuple]:
+        return to_tuples(self.dealer)
+
+    def unseen(self) -> List[int]:
+        """Card bytes the player has not seen: a hidden hole card, then the rest of the shoe."""
+        hole = [self.dealer[1]] if self.hole_hidden else []
+        return hole + list(self.undealt)
+
+    def running_count(self, system: str = 'hilo') -> int:
+        """Running count of `system` over the cards seen, i.e. those no longer in `remaining`."""
+        counting = SYSTEMS[system]
+        full = (4 * self.num_decks,) * 8 + (16 * self.num_decks, 4 * self.num_decks)
+        return counting.initial_running_count(self.num_decks) + sum(
+            tag * (total - left) for tag, total, left in zip(counting.tags, full, self.remaining))
+
+    def true_count(self, system: str = 'hilo') -> float:
+        decks = sum(self.remaining) / CARDS_PER_DECK
+        rc = self.running_count(system)
+        return rc / decks if decks else rc
+
+    def to_bytes(self) -> bytes:
+        """Header plus the undealt cards and both hands; already-dealt shoe bytes are dropped."""
+        undealt = self.undealt
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, self.num_decks, self.state, self.hole_hidden,
+                             len(self.player), len(self.dealer), self.dealt, len(undealt), *self.remaining)
+        return header + undealt + self.player + self.dealer
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'GameState':
+        if len(data) < HEADER.size:
+            raise ValueError("Truncated game state")
+        magic, version, num_decks, state, hole_hidden, n_player, n_dealer, dealt, n_shoe, *remaining = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a version {FORMAT_VERSION} game state")
+        if len(data) != HEADER.size + n_shoe + n_player + n_dealer:
+            raise ValueError("Game state length does not match its header")
+        start = HEADER.size
+        shoe = bytes(data[start:start + n_shoe])
+        player = bytes(data[start + n_shoe:start + n_shoe + n_player])
+        dealer = bytes(data[start + n_shoe + n_player:])
+        return cls(num_decks, shoe, 0, dealt, tuple(remaining), player, dealer, bool(hole_hidden), state)
+
+def _hand(cards: Iterable[int]) -> Tuple[int, int]:
+    """Total and number of aces still counted as 11."""
+    total = aces = 0
+    for card in cards:
+        value = CARD_VALUE[card]
+        total += value
+        aces += value == 11
+    while total > 21 and aces:
+        total -= 10
+        aces -= 1
+    return total, aces
+
+def _add(total: int, aces: int, card: int) -> Tuple[int, int]:
+    value = CARD_VALUE[card]
+    total += value
+    aces += value == 11
+    if total > 21 and aces:
+        total -= 10
+        aces -= 1
+    return total, aces
+
+class BranchResult(NamedTuple):
+    ev: float
+    std_error: float
+    samples: int
+
+def _branch_sums(state: GameState, actions: Sequence[str], samples: int, seed: SeedLike) -> List[Tuple[float, float]]:
+    """Sums and sums of squares of the units won by each action over `samples` sampled continuations."""
+    rng = make_rng(seed)
+    lookup = default_strategy().lookup
+    unseen = state.unseen()
+    up = CARD_VALUE[state.dealer[0]]
+    start_total, start_aces = _hand(state.player)
+    rc = state.running_count()
+    hidden = state.hole_hidden
+    sums = [[0.0, 0.0] for _ in actions]
+
+    for _ in range(samples):
+        stream = lazy_shuffle(unseen, rng)
+        drawn: List[int] = []
+
+        def card(k):
+            # The k-th unseen card of this continuation, shared by every action
+            while len(drawn) <= k:
+                drawn.append(next(stream))
+            return drawn[k]
+
+        first = 1 if hidden else 0
+        hole = card(0) if hidden else state.dealer[1]
+        for a, action in enumerate(actions):
+            total, aces = start_total, start_aces
+            k = first
+            bet = 1.0
+            if action == 'double':
+                total, aces = _add(total, aces, card(k))
+                k += 1
+                bet = 2.0
+            elif action == 'hit':
+                count = rc
+                while True:
+                    drew = card(k)
+                    k += 1
+                    total, aces = _add(total, aces, drew)
+                    count += CARD_HILO[drew]
+                    if total >= 21:
+                        break
+                    decks = (len(unseen) - k) / CARDS_PER_DECK
+                    if lookup(total, aces > 0, 0, up, count / decks if decks else count, False, False, False) != HIT:
+                        break
+            if total > 21:
+                net = -bet
+            else:
+                dealer, dealer_aces = _hand(state.dealer[:1] + bytes((hole,)) + state.dealer[2:])
+                while dealer < 17:
+                    dealer, dealer_aces = _add(dealer, dealer_aces, card(k))
+                    k += 1
+                if dealer > 21 or total > dealer:
+                    net = bet
+                elif total < dealer:
+                    net = -bet
+                else:
+                    net = 0.0
+            sums[a][0] += net
+            sums[a][1] += net * net
+    return [tuple(s) for s in sums]
+
+def _branch_shard(args):
+    data, actions, samples, seed = args
+    return _branch_sums(GameState.from_bytes(data), actions, samples, seed)
+
+def what_if(state: GameState, actions: Sequence[str] = ACTIONS, samples: int = 10_000, seed: SeedLike = None,
+            workers: Optional[int] = None) -> Dict[str, BranchResult]:
+    """
+    EV of each action from `state`, by playing every action out on `samples`
+    sampled continuations. With `workers`, the samples are split across
+    processes, which receive the state as bytes.
+    """
+    unknown = set(actions) - set(ACTIONS)
+    if unknown:
+        raise ValueError(f"Unknown actions: {sorted(unknown)} (expected some of {ACTIONS})")
+    if len(state.player) < 2 or len(state.dealer) < 2:
+        raise ValueError("what_if needs a dealt hand")
+    if not workers or workers == 1:
+        shards = [_branch_sums(state, actions, samples, seed)]
+    else:
+        from runner import derive_seed
+        master = seed if isinstance(seed, int) else make_rng(seed).getrandbits(64)
+        data = state.to_bytes()
+        sizes = [samples // workers + (k < samples % workers) for k in range(workers)]
+        jobs = [(data, tuple(actions), size, derive_seed(master, k)) for k, size in enumerate(sizes) if size]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(_branch_shard, jobs))
+
+    results = {}
+    for a, action in enumerate(actions):
+        total = sum(shard[a][0] for shard in shards)
+        total_sq = sum(shard[a][1] for shard in shards)
+        ev = total / samples
+        variance = max(total_sq / samples - ev * ev, 0.0)
+        results[action] = BranchResult(ev, math.sqrt(variance / samples), samples)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot a dealt hand and estimate what-if EVs from it")
+    parser.add_argument('--decks', type=int, default=6)
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the shoe and the sampled continuations")
+    parser.add_argument('--samples', type=int, default=20_000)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--forks', type=int, default=10_000, help="Forks to time")
+    args = parser.parse_args(argv)
+
+    from game_engine import GameEngine
+    engine = GameEngine(args.decks, seed=args.seed)
+    engine.new_hand()
+    state = engine.snapshot()
+
+    start = time.perf_counter()
+    for _ in range(args.forks):
+        state.deal()
+    fork_seconds = (time.perf_counter() - start) / args.forks
+    data = state.to_bytes()
+    if GameState.from_bytes(data) != state._replace(shoe=state.undealt, pos=0):
+        raise RuntimeError("Game state changed in a to_bytes/from_bytes round trip")
+
+    start = time.perf_counter()
+    results = what_if(state, samples=args.samples, seed=args.seed, workers=args.workers)
+    print(json.dumps({
+        'player': state.player_cards, 'dealer_upcard': state.dealer_cards[0],
+        'true_count': state.true_count(), 'state_bytes': len(data), 'fork_microseconds': fork_seconds * 1e6,
+        'what_if': {action: result._asdict() for action, result in results.items()},
+        'what_if_seconds': time.perf_counter() - start,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,8 @@
 import tkinter as tk
 from tkinter import messagebox
 from shuffling_deck import generate_deck, shuffle_all_decks
-from blackjack import convert_to_tuples, calculate_hand_value
-
-# Hi-Lo card counting values
-hilo_values = {
-    '2': 1, '3': 1, '4': 1, '5': 1, '6': 1,
-    '7': 0, '8': 0, '9': 0,
-    '10': -1, 'J': -1, 'Q': -1, 'K': -1, 'A': -1
-}
-
-def calculate_running_count(hand, running_count):
-    for card in hand:
-        rank = card[0]
-        if rank in hilo_values:
-            running_count += hilo_values[rank]
-    return running_count
-
-def true_count(running_count, remaining_decks):
-    if remaining_decks == 0:
-        return running_count
-    return running_count / remaining_decks
-
-def recommend_hilo_action(player_hand, dealer_hand, running_count, remaining_decks):
-    true_count_value = true_count(running_count, remaining_decks)
-    player_value = calculate_hand_value(player_hand)
-    dealer_up_card = dealer_hand[0][0]
-
-    if true_count_value >= 2:
-        return "Stand" if player_value >= 12 else "Hit"
-    elif true_count_value >= 1:
-        return "Hit" if player_value <= 15 else "Stand"
-    else:
-        if player_value >= 13 or (player_value >= 12 and dealer_up_card in ['2', '3', '4', '5', '6']):
-            return "Stand"
-        else:
-            return "Hit"
+from blackjack import convert_to_tuples, calculate_hand_value, recommend_hilo_action
+from counting import ShoeTracker
 
 class BlackjackGUI:
     def __init__(self, root):
@@ -47,8 +14,7 @@ class BlackjackGUI:
 
     def initialize_game(self):
         self.deck = []
-        self.running_count = 0
-        self.remaining_decks = 0
+        self.tracker = ShoeTracker(num_decks=1)
         self.player_hand = []
         self.dealer_hand = []
 
@@ -101,10 +67,11 @@ class BlackjackGUI:
     def start_game(self):
         self.deck = shuffle_all_decks(generate_deck())
         self.deck = convert_to_tuples(self.deck)
-        self.remaining_decks = len(self.deck) // 52
         self.player_hand = [self.deck.pop(), self.deck.pop()]
         self.dealer_hand = [self.deck.pop(), self.deck.pop()]
-        self.running_count = calculate_running_count(self.player_hand + self.dealer_hand, 0)
+        self.tracker.reset()
+        # The dealer's second card is face down and only counted once revealed
+        self.tracker.observe_all(self.player_hand + self.dealer_hand[:1])
         self.update_display()
 
     def update_display(self):
@@ -114,12 +81,12 @@ class BlackjackGUI:
         self.dealer_rank_label.config(text=f"Dealer's Hand Rank: {calculate_hand_value(self.dealer_hand)}")
         self.player_rank_label.config(text=f"Your Hand Rank: {calculate_hand_value(self.player_hand)}")
 
-        self.recommendation_label.config(text=f"Recommendation: {recommend_hilo_action(self.player_hand, self.dealer_hand, self.running_count, self.remaining_decks)}")
+        self.recommendation_label.config(text=f"Recommendation: {recommend_hilo_action(self.player_hand, self.dealer_hand, self.tracker.running_count, self.tracker.decks_remaining, can_double=False, can_split=False, can_surrender=False)}")
 
     def hit(self):
         new_card = self.deck.pop()
         self.player_hand.append(new_card)
-        self.running_count = calculate_running_count([new_card], self.running_count)
+        self.tracker.observe(new_card)
         self.update_display()
 
         if calculate_hand_value(self.player_hand) > 21:
@@ -128,10 +95,11 @@ class BlackjackGUI:
 
     def stand(self):
         self.dealer_hand_label.config(text=", ".join([f"{card[0]} of {card[1]}" for card in self.dealer_hand]))
+        self.tracker.observe(self.dealer_hand[1])
         while calculate_hand_value(self.dealer_hand) < 17 and len(self.deck) > 0:
             new_card = self.deck.pop()
             self.dealer_hand.append(new_card)
-            self.running_count = calculate_running_count([new_card], self.running_count)
+            self.tracker.observe(new_card)
         self.update_display()
         self.check_winner()
 
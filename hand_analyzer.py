@@ -0,0 +1,337 @@
+"""
+Grade recorded player decisions against the strategy table, at scale.
+
+Hand histories are read from JSON lines, CSV or the binary event log
+written by `python -m blackjack play` and pyqt_blackjack.py (--log). A hand gives the
+shoe it came from, the player's and dealer's cards in the order they were
+dealt (dealer upcard first) and the player's actions:
+
+    {"shoe": 12, "decks": 6, "player": ["10", "6", "K"], "dealer": ["9", "7"], "actions": ["hit"]}
+
+    shoe,decks,player,dealer,actions
+    12,6,10 6 K,9 7,hit
+
+Cards are ranks (2-10, J, Q, K, A) or [rank, suit] pairs; actions are
+hit, stand, double, split and surrender or their chart letters H, S, D, P, R.
+Histories from a game that only offers hit and stand, such as the console
+game and the GUIs, should be graded with --hit-stand, so the chart is not
+allowed a double, split or surrender the player could not take.
+Hands of one shoe must appear in dealing order. The Hi-Lo count at every
+decision is rebuilt from the cards seen so far in the shoe: earlier hands
+in full, this hand's player cards and the upcard. The hole card is counted
+once the hand is over. Grading stops at a split, because the split hands'
+cards are not recorded separately.
+
+EV lost is the solver EV of the recommended action minus that of the
+action taken. The EVs come from ev_solver for the situation's representative
+two-card hand at a mid-shoe composition shifted to the decision's true
+count. They are memoized per situation, not solved per decision.
+
+The file is streamed in chunks that end on shoe boundaries and graded by
+a process pool. Only a bounded number of chunks is in flight, so memory
+stays flat however long the history is.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from cards import CARD_VALUE
+from ev_solver import HARD_HANDS, PAIR_HANDS, SOFT_HANDS, full_shoe, remove, solve
+from event_log import replay
+from round_engine import HILO_TAGS
+from strategy import (ACTION_NAMES, DOUBLE, HIT, MAX_TC, MIN_TC, SPLIT, STAND, SURRENDER, default_strategy,
+                      use_deviations)
+
+JSONL, CSV, EVENT_LOG = 'jsonl', 'csv', 'eventlog'
+FORMATS = (JSONL, CSV, EVENT_LOG)
+
+DEFAULT_CHUNK_HANDS = 20_000
+DEFAULT_DECKS = 6
+
+RANK_VALUES = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '10': 10,
+               'J': 10, 'Q': 10, 'K': 10, 'A': 11}
+ACTIONS = {'hit': HIT, 'h': HIT, 'stand': STAND, 's': STAND, 'double': DOUBLE, 'd': DOUBLE,
+           'split': SPLIT, 'p': SPLIT, 'surrender': SURRENDER, 'r': SURRENDER}
+
+_JSON_SHOE = re.compile(r'"shoe"\s*:\s*("(?:[^"\\]|\\.)*"|[^,}\s]+)')
+
+class Hand(NamedTuple):
+    shoe: str
+    decks: int
+    # Card values, 11 for aces
+    player: List[int]
+    dealer: List[int]
+    actions: List[int]
+
+def _card_value(card) -> int:
+    rank = card[0] if isinstance(card, (list, tuple)) else card
+    return RANK_VALUES[str(rank).strip().upper()]
+
+def _action(name: str) -> int:
+    return ACTIONS[name.strip().lower()]
+
+def parse_json_hand(line: str, decks: int = DEFAULT_DECKS) -> Hand:
+    data = json.loads(line)
+    return Hand(str(data['shoe']), int(data.get('decks', decks)), [_card_value(c) for c in data['player']],
+                [_card_value(c) for c in data['dealer']], [_action(a) for a in data['actions']])
+
+def parse_csv_hand(row: dict, decks: int = DEFAULT_DECKS) -> Hand:
+    return Hand(row['shoe'].strip(), int(row.get('decks') or decks),
+                [_card_value(c) for c in row['player'].split()], [_card_value(c) for c in row['dealer'].split()],
+                [_action(a) for a in row['actions'].split()])
+
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.json', '.ndjson'):
+        return JSONL
+    if extension == '.csv':
+        return CSV
+    return EVENT_LOG
+
+class Tally:
+    """Decisions, errors and EV lost per situation ('hard 16 v 10'), mergeable across workers."""
+
+    def __init__(self):
+        self.situations: Dict[str, List[float]] = {}
+        self.hands = 0
+        self.skipped = 0
+
+    def add(self, situation: str, error: bool, ev_lost: float) -> None:
+        counts = self.situations.get(situation)
+        if counts is None:
+            counts = self.situations[situation] = [0, 0, 0.0]
+        counts[0] += 1
+        counts[1] += error
+        counts[2] += ev_lost
+
+    def merge(self, other: 'Tally') -> None:
+        for situation, (decisions, errors, ev_lost) in other.situations.items():
+            counts = self.situations.setdefault(situation, [0, 0, 0.0])
+            counts[0] += decisions
+            counts[1] += errors
+            counts[2] += ev_lost
+        self.hands += other.hands
+        self.skipped += other.skipped
+
+    def report(self, top: int = 20) -> dict:
+        decisions = sum(c[0] for c in self.situations.values())
+        errors = sum(c[1] for c in self.situations.values())
+        ev_lost = sum(c[2] for c in self.situations.values())
+        worst = sorted(self.situations.items(), key=lambda item: item[1][2], reverse=True)[:top]
+        return {
+            'hands': self.hands, 'skipped_hands': self.skipped, 'decisions': decisions, 'errors': errors,
+            'error_rate': errors / decisions if decisions else 0.0,
+            'ev_lost': ev_lost, 'ev_lost_per_decision': ev_lost / decisions if decisions else 0.0,
+            'situations': {situation: {'decisions': n, 'errors': e, 'error_rate': e / n, 'ev_lost': lost}
+                           for situation, (n, e, lost) in worst},
+        }
+
+@lru_cache(maxsize=None)
+def count_composition(num_decks: int, tc: int) -> Tuple[int, ...]:
+    """
+    A half-dealt shoe whose Hi-Lo true count is `tc`: low cards (2-6) taken
+    out for positive counts, tens and aces (4 to 1) for negative ones.
+    """
+    decks_left = num_decks / 2
+    counts = [round(count * decks_left / num_decks) for count in full_shoe(num_decks)]
+    rc = round(tc * decks_left)
+    cycle = (0, 1, 2, 3, 4) if rc > 0 else (8, 8, 8, 8, 9)
+    for k in range(abs(rc)):
+        slot = cycle[k % len(cycle)]
+        if counts[slot] > 1:
+            counts[slot] -= 1
+    return tuple(counts)
+
+@lru_cache(maxsize=None)
+def _solved(kind: str, total: int, up: int, tc: int, num_decks: int) -> Dict[int, float]:
+    hand = {'hard': HARD_HANDS, 'soft': SOFT_HANDS, 'pair': PAIR_HANDS}[kind].get(total)
+    if hand is None:
+        return {}
+    try:
+        comp = remove(count_composition(num_decks, tc), hand + (up,))
+    except ValueError:
+        return {}
+    return {ACTION_NAMES.index(name): ev for name, ev in solve(hand, up, comp).items()}
+
+@lru_cache(maxsize=None)
+def situation_evs(kind: str, total: int, up: int, tc: int, first: bool, num_decks: int) -> Dict[int, float]:
+    """Solver EV per action code for a situation's representative hand; empty when there is none."""
+    evs = _solved(kind, total, up, tc, num_decks)
+    if not first:
+        evs = {action: ev for action, ev in evs.items() if action in (HIT, STAND)}
+    return evs
+
+def _state(cards: Sequence[int]) -> Tuple[int, bool]:
+    total = sum(cards)
+    aces = cards.count(11)
+    while total > 21 and aces:
+        total -= 10
+        aces -= 1
+    return total, aces > 0
+
+def grade_hands(hands: Sequence[Hand], hit_stand: bool = False) -> Tally:
+    """
+    Grade a run of hands; count state carries over while the shoe stays the
+    same. With `hit_stand`, the chart may only hit or stand.
+    """
+    tally = Tally()
+    lookup = default_strategy().lookup
+    tags = HILO_TAGS
+    shoe = None
+    rc = seen = 0
+    for hand in hands:
+        if hand.shoe != shoe:
+            shoe = hand.shoe
+            rc = seen = 0
+        player, dealer = hand.player, hand.dealer
+        if len(player) < 2 or not dealer:
+            tally.skipped += 1
+            continue
+        tally.hands += 1
+        up = dealer[0]
+        cards = player[:2]
+        drawn = 2
+        visible = rc + tags[up] + tags[player[0]] + tags[player[1]]
+        # Cards out of the shoe: earlier hands, the player's cards so far and both dealer cards
+        out = seen + 4
+        size = hand.decks * 52
+        for k, action in enumerate(hand.actions):
+            total, soft = _state(cards)
+            if total >= 21:
+                break
+            first = k == 0 and not hit_stand
+            pair = cards[0] if first and cards[0] == cards[1] else 0
+            tc = visible * 52 / (size - out) if size > out else 0.0
+            recommended = lookup(total, soft, pair, up, tc, first, first, first)
+            kind = 'pair' if pair else 'soft' if soft else 'hard'
+            situation = f"{kind} {pair or total} v {'A' if up == 11 else up}"
+            ev_lost = 0.0
+            if action != recommended:
+                bucket = min(max(math.floor(tc), MIN_TC), MAX_TC)
+                evs = situation_evs(kind, pair or total, up, bucket, first, hand.decks)
+                if action in evs and recommended in evs:
+                    ev_lost = evs[recommended] - evs[action]
+            tally.add(situation, action != recommended, ev_lost)
+            if action in (HIT, DOUBLE) and drawn < len(player):
+                cards.append(player[drawn])
+                visible += tags[player[drawn]]
+                drawn += 1
+                out += 1
+            if action != HIT:
+                break
+        rc += sum(tags[card] for card in player) + sum(tags[card] for card in dealer)
+        seen += len(player) + len(dealer)
+    return tally
+
+def _grade_lines(args) -> Tally:
+    """Worker: parse and grade one chunk of JSON lines or CSV rows."""
+    fmt, lines, fieldnames, decks, hit_stand = args
+    hands = []
+    skipped = 0
+    rows = csv.DictReader(lines, fieldnames=fieldnames) if fmt == CSV else lines
+    for row in rows:
+        try:
+            hands.append(parse_csv_hand(row, decks) if fmt == CSV else parse_json_hand(row, decks))
+        except (KeyError, ValueError, TypeError, AttributeError):
+            skipped += 1
+    tally = grade_hands(hands, hit_stand)
+    tally.skipped += skipped
+    return tally
+
+def _grade_hands(args) -> Tally:
+    return grade_hands(*args)
+
+def _text_chunks(path: str, fmt: str, chunk_hands: int, decks: int, hit_stand: bool) -> Iterator[tuple]:
+    """Raw-line chunks of a JSON lines or CSV file, each ending where a shoe ends."""
+    with open(path, newline='') as f:
+        fieldnames = None
+        if fmt == CSV:
+            fieldnames = next(csv.reader([f.readline()]))
+            shoe_column = fieldnames.index('shoe')
+        chunk = []
+        shoe = None
+        for line in f:
+            if not line.strip():
+                continue
+            if fmt == CSV:
+                line_shoe = next(csv.reader([line]))[shoe_column] if '"' in line else line.split(',')[shoe_column].strip()
+            else:
+                match = _JSON_SHOE.search(line)
+                line_shoe = match.group(1) if match else None
+            if len(chunk) >= chunk_hands and line_shoe != shoe:
+                yield fmt, chunk, fieldnames, decks, hit_stand
+                chunk = []
+            chunk.append(line)
+            shoe = line_shoe
+        if chunk:
+            yield fmt, chunk, fieldnames, decks, hit_stand
+
+def _event_log_chunks(path: str, chunk_hands: int, decks: int, hit_stand: bool) -> Iterator[tuple]:
+    """Hands replayed from a binary event log, chunked on shoe boundaries."""
+    chunk = []
+    shoe = None
+    for record in replay(path):
+        if len(chunk) >= chunk_hands and record.shoe != shoe:
+            yield chunk, hit_stand
+            chunk = []
+        shoe = record.shoe
+        # The SHUFFLE records give the shoe size; `decks` only stands in for logs without one
+        chunk.append(Hand(str(record.shoe), record.num_decks or decks,
+                          [CARD_VALUE[card] for card in record.player_cards],
+                          [CARD_VALUE[card] for card in record.dealer_cards],
+                          [action for action, _, _ in record.decisions]))
+    if chunk:
+        yield chunk, hit_stand
+
+def analyze(path: str, fmt: Optional[str] = None, workers: Optional[int] = None,
+            chunk_hands: int = DEFAULT_CHUNK_HANDS, decks: int = DEFAULT_DECKS,
+            deviation_files: Optional[Sequence[str]] = None, hit_stand: bool = False) -> Tally:
+    """Grade every decision in a hand-history file across a process pool; see grade_hands for `hit_stand`."""
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown hand-history format: {fmt!r} (expected one of {FORMATS})")
+    if fmt == EVENT_LOG:
+        chunks, grade = _event_log_chunks(path, chunk_hands, decks, hit_stand), _grade_hands
+    else:
+        chunks, grade = _text_chunks(path, fmt, chunk_hands, decks, hit_stand), _grade_lines
+    workers = workers or os.cpu_count() or 1
+    tally = Tally()
+    initializer = use_deviations if deviation_files else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                             initargs=(deviation_files,) if deviation_files else ()) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(grade, chunk))
+            # Keep a couple of chunks per worker queued and no more
+            while len(pending) > 2 * workers:
+                tally.merge(pending.popleft().result())
+        while pending:
+            tally.merge(pending.popleft().result())
+    return tally
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade hand-history decisions against the strategy table")
+    parser.add_argument('path', help="JSON lines (.jsonl), CSV (.csv) or binary event log")
+    parser.add_argument('--format', choices=FORMATS, help="Override detection from the file extension")
+    parser.add_argument('--decks', type=int, default=DEFAULT_DECKS, help="Decks per shoe when a hand does not say")
+    parser.add_argument('--deviations', nargs='+', help="Deviation CSVs to grade against instead of the Illustrious 18")
+    parser.add_argument('--hit-stand', action='store_true',
+                        help="The game only offered hit and stand (console game, GUIs)")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--chunk-hands', type=int, default=DEFAULT_CHUNK_HANDS)
+    parser.add_argument('--top', type=int, default=20, help="Situations to list, most EV lost first")
+    args = parser.parse_args(argv)
+
+    tally = analyze(args.path, args.format, args.workers, args.chunk_hands, args.decks, args.deviations,
+                    args.hit_stand)
+    print(json.dumps(tally.report(args.top), indent=2))
+
+if __name__ == "__main__":
+    main()
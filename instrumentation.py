@@ -0,0 +1,254 @@
+"""
+Opt-in timing and call counts for the assistant's hot paths.
+
+Nothing is measured until Instrumentation.enable() is called: it replaces
+the shuffling, hand-evaluation, counting and recommendation functions with
+timing wrappers, and disable() puts the originals back, so the disabled
+cost is exactly zero. Every wrapped function keeps a call count, total and
+maximum time and a latency histogram; the recommendation histograms are the
+per-decision latencies.
+
+Snapshots can be written to a file periodically, as JSON or in the
+Prometheus text exposition format, or served as Prometheus text over HTTP.
+Counters are updated without a lock, so calls racing on other threads can
+occasionally be missed.
+"""
+import bisect
+import functools
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Group -> "module:attribute" targets; attributes may be Class.method
+DEFAULT_TARGETS = {
+    'shuffle': ('shuffling_deck:apply_shuffle', 'shuffling_deck:ContinuousShoe.shuffle',
+                'shuffling_deck:ContinuousShoe.deal', 'cards:Shoe.shuffle'),
+    'hand_evaluation': ('blackjack.hand:hand_state', 'blackjack.hand:calculate_hand_value'),
+    'counting': ('blackjack.hand:calculate_running_count', 'blackjack.hand:true_count',
+                 'counting:ShoeTracker.observe', 'counting:ShoeTracker.observe_byte'),
+    'recommendation': ('blackjack.hand:recommend_hilo_action', 'strategy:StrategyTable.lookup',
+                       'ev_solver:solve_hand'),
+}
+
+# Histogram upper bounds in seconds, 1 µs to 1 s
+LATENCY_BOUNDS = tuple(scale * 10.0 ** exponent for exponent in range(-6, 0) for scale in (1, 2.5, 5)) + (1.0,)
+
+class CallStats:
+    """Call count, total and maximum time, and a latency histogram for one function."""
+    __slots__ = ('name', 'group', 'count', 'total', 'max', 'buckets')
+
+    def __init__(self, name: str, group: str):
+        self.name = name
+        self.group = group
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # One slot per bound plus an overflow slot
+        self.buckets = [0] * (len(LATENCY_BOUNDS) + 1)
+
+    def observe(self, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        self.buckets[bisect.bisect_left(LATENCY_BOUNDS, elapsed)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the histogram bucket holding quantile q (the maximum for the overflow bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BOUNDS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            'group': self.group, 'count': self.count, 'total_seconds': self.total,
+            'mean_seconds': self.total / self.count if self.count else 0.0, 'max_seconds': self.max,
+            'p50_seconds': self.quantile(0.5), 'p99_seconds': self.quantile(0.99),
+            'buckets': dict(zip([str(b) for b in LATENCY_BOUNDS] + ['+Inf'], self.buckets)),
+        }
+
+def _timed(fn, stats: CallStats):
+    clock = time.perf_counter
+    observe = stats.observe
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            observe(clock() - start)
+    return wrapper
+
+def _modules_named(module_name: str) -> List:
+    """
+    The module, plus __main__ when it was started from the same file (python
+    simulator.py runs simulator's code as __main__, separately from any
+    `import simulator`).
+    """
+    module = importlib.import_module(module_name)
+    modules = [module]
+    main = sys.modules.get('__main__')
+    main_file = getattr(main, '__file__', None)
+    if main is not module and main_file and os.path.splitext(os.path.basename(main_file))[0] == module_name:
+        modules.append(main)
+    return modules
+
+class Instrumentation:
+    """Wraps the target functions while enabled and collects their CallStats."""
+
+    def __init__(self, targets: Dict[str, Iterable[str]] = None):
+        self.targets = {group: tuple(names) for group, names in (targets or DEFAULT_TARGETS).items()}
+        self.stats: Dict[str, CallStats] = {}
+        self.started = None
+        # (owner, attribute, original) for everything patched, to undo in disable()
+        self._patches: List[Tuple[object, str, object]] = []
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._patches)
+
+    def _patch(self, owner, attribute: str, replacement) -> None:
+        self._patches.append((owner, attribute, owner.__dict__[attribute]))
+        setattr(owner, attribute, replacement)
+
+    def _wrap(self, group: str, target: str) -> None:
+        module_name, _, path = target.partition(':')
+        owner_path, _, attribute = path.rpartition('.')
+        modules = _modules_named(module_name)
+        for module in modules:
+            owner = module
+            for part in filter(None, owner_path.split('.')):
+                owner = getattr(owner, part)
+            original = owner.__dict__[attribute]
+            name = f"{module_name}.{path}"
+            stats = self.stats.setdefault(name, CallStats(name, group))
+            wrapper = _timed(original, stats)
+            self._patch(owner, attribute, wrapper)
+            if owner_path:
+                continue
+            # Functions imported by name into other modules (from blackjack import ...)
+            for other in list(sys.modules.values()):
+                if other is not module and getattr(other, attribute, None) is original:
+                    self._patch(other, attribute, wrapper)
+
+    def enable(self, groups: Optional[Iterable[str]] = None) -> 'Instrumentation':
+        """Start timing the targets of `groups` (default: all of them)."""
+        if self.enabled:
+            raise ValueError("Instrumentation is already enabled")
+        for group in groups or self.targets:
+            if group not in self.targets:
+                raise ValueError(f"Unknown instrumentation group: {group!r} (expected one of {tuple(self.targets)})")
+            for target in self.targets[group]:
+                self._wrap(group, target)
+        self.started = time.time()
+        return self
+
+    def disable(self) -> None:
+        """Restore every original function and stop snapshot writing and serving."""
+        for owner, attribute, original in reversed(self._patches):
+            setattr(owner, attribute, original)
+        self._patches.clear()
+        self._stop.set()
+        if self._snapshot_thread:
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def snapshot(self) -> dict:
+        return {
+            'timestamp': time.time(), 'started': self.started,
+            'metrics': {name: stats.to_dict() for name, stats in self.stats.items()},
+        }
+
+    def render_prometheus(self) -> str:
+        """All histograms in the Prometheus text exposition format."""
+        lines = [
+            "# HELP blackjack_call_seconds Time spent in instrumented calls.",
+            "# TYPE blackjack_call_seconds histogram",
+        ]
+        for name, stats in self.stats.items():
+            labels = f'group="{stats.group}",function="{name}"'
+            cumulative = 0
+            for bound, n in zip(LATENCY_BOUNDS, stats.buckets):
+                cumulative += n
+                lines.append(f'blackjack_call_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'blackjack_call_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f'blackjack_call_seconds_sum{{{labels}}} {stats.total!r}')
+            lines.append(f'blackjack_call_seconds_count{{{labels}}} {stats.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path: str) -> None:
+        """Write a snapshot, as Prometheus text for .prom/.txt paths and JSON otherwise."""
+        if path.endswith(('.prom', '.txt')):
+            text = self.render_prometheus()
+        else:
+            text = json.dumps(self.snapshot(), indent=2)
+        # Write then rename, so a reader never sees a half-written snapshot
+        partial = path + '.tmp'
+        with open(partial, 'w') as f:
+            f.write(text)
+        os.replace(partial, path)
+
+    def start_snapshots(self, path: str, interval: float = 10.0) -> None:
+        """Write a snapshot to `path` every `interval` seconds, and once more on disable()."""
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                self.write_snapshot(path)
+            self.write_snapshot(path)
+        self._snapshot_thread = threading.Thread(target=run, name='metrics-snapshots', daemon=True)
+        self._snapshot_thread.start()
+
+    def serve(self, port: int, host: str = '127.0.0.1') -> None:
+        """Serve render_prometheus() at http://host:port/metrics from a background thread."""
+        instrumentation = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = instrumentation.render_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True).start()
+
+    def summary(self) -> str:
+        """A plain-text table of every function that was called, slowest in total first."""
+        rows = sorted((s for s in self.stats.values() if s.count), key=lambda s: s.total, reverse=True)
+        if not rows:
+            return "No instrumented calls."
+        width = max(len(s.name) for s in rows)
+        lines = [f"{'function':<{width}}  {'calls':>9}  {'total ms':>10}  {'mean µs':>9}  "
+                 f"{'p50 µs':>8}  {'p99 µs':>8}  {'max µs':>9}"]
+        for s in rows:
+            lines.append(f"{s.name:<{width}}  {s.count:>9}  {s.total * 1e3:>10.2f}  {s.total / s.count * 1e6:>9.1f}  "
+                         f"{s.quantile(0.5) * 1e6:>8.1f}  {s.quantile(0.99) * 1e6:>8.1f}  {s.max * 1e6:>9.1f}")
+        return "\n".join(lines)
@@ -0,0 +1,135 @@
+"""
+Load generator for server.py.
+
+Opens `tables x seats` client connections, seats them at their tables and
+plays a number of rounds per client, always following the server's
+recommendation. Per-decision latency is the time from sending hit/stand to
+receiving the server's echo of that action. Prints a JSON report.
+
+    python load_generator.py --spawn --tables 1000 --seats 3 --rounds 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+from server import DEFAULT_PORT, raise_file_limit
+
+async def _connect(host, port, unix_path):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+async def play(table: str, rounds: int, latencies: List[float], host: str = '127.0.0.1',
+               port: int = DEFAULT_PORT, unix_path: Optional[str] = None) -> int:
+    """Play `rounds` rounds at one seat and return the net units won."""
+    reader, writer = await _connect(host, port, unix_path)
+
+    def send(op):
+        writer.write(json.dumps({'op': op}).encode() + b"\n")
+
+    writer.write(json.dumps({'op': 'join', 'table': table}).encode() + b"\n")
+    joined = json.loads(await reader.readline())
+    if joined['event'] != 'joined':
+        raise RuntimeError(joined.get('message', joined))
+    seat = joined['seat']
+    key = str(seat)
+
+    net = 0
+    for _ in range(rounds):
+        send('deal')
+        sent = None
+        while True:
+            message = json.loads(await reader.readline())
+            event = message['event']
+            if event == 'turn' and message['seat'] == seat:
+                sent = time.perf_counter()
+                send('hit' if message['recommendation'] == "Hit" else 'stand')
+            elif event in ('card', 'stand') and message['seat'] == seat and sent is not None:
+                latencies.append(time.perf_counter() - sent)
+                sent = None
+            elif event == 'result' and key in message['nets']:
+                net += message['nets'][key]
+                break
+            elif event == 'error':
+                raise RuntimeError(message['message'])
+    send('leave')
+    await writer.drain()
+    writer.close()
+    return net
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+async def generate_load(tables: int = 100, seats: int = 3, rounds: int = 20, **connection) -> dict:
+    latencies: List[float] = []
+    start = time.perf_counter()
+    nets = await asyncio.gather(*(play(f"load-{t}", rounds, latencies, **connection)
+                                  for t in range(tables) for _ in range(seats)))
+    elapsed = time.perf_counter() - start
+    ordered = sorted(latencies)
+    return {
+        'tables': tables,
+        'clients': tables * seats,
+        'rounds_per_client': rounds,
+        'decisions': len(latencies),
+        'net': sum(nets),
+        'elapsed': elapsed,
+        'decisions_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'latency_ms': {name: 1000 * _percentile(ordered, fraction)
+                       for name, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99), ('max', 1.0))},
+    }
+
+def _wait_for_server(host, port, unix_path, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if unix_path:
+                probe = socket.socket(socket.AF_UNIX)
+                probe.connect(unix_path)
+            else:
+                probe = socket.create_connection((host, port))
+            probe.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the blackjack session server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', help="Connect to this Unix socket path instead of TCP")
+    parser.add_argument('--tables', type=int, default=100)
+    parser.add_argument('--seats', type=int, default=3, help="Clients per table")
+    parser.add_argument('--rounds', type=int, default=20, help="Rounds played by each client")
+    parser.add_argument('--spawn', action='store_true', help="Start a server subprocess for the run")
+    args = parser.parse_args(argv)
+
+    raise_file_limit()
+    server = None
+    if args.spawn:
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py')
+        command = [sys.executable, script, '--port', str(args.port)]
+        if args.unix:
+            command += ['--unix', args.unix]
+        server = subprocess.Popen(command)
+    try:
+        if server is not None:
+            _wait_for_server(args.host, args.port, args.unix)
+        report = asyncio.run(generate_load(args.tables, args.seats, args.rounds,
+                                           host=args.host, port=args.port, unix_path=args.unix))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,96 +1,65 @@
+import argparse
 import sys
+from dataclasses import replace
 from PyQt5.QtWidgets import (QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, 
                              QHBoxLayout, QMessageBox, QFrame)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
 
-from shuffling_deck import generate_deck, shuffle_all_decks
-from blackjack import convert_to_tuples, calculate_hand_value
+from blackjack import calculate_hand_value, values
+from dealer_odds import DealerOdds, format_distribution
+from event_log import DEALER, EventLog
+from ev_solver import solve_hand
+from game_engine import FINISHED, PLAYER_TURN, GameEngine
+from rules import CLASSIC_RULES
+from strategy import use_deviations, use_strategy
+from strategy_cache import load_cache
 
-# Hi-Lo card counting values
-hilo_values = {
-    '2': 1, '3': 1, '4': 1, '5': 1, '6': 1,
-    '7': 0, '8': 0, '9': 0,
-    '10': -1, 'J': -1, 'Q': -1, 'K': -1, 'A': -1
-}
+class EVSignals(QObject):
+    finished = pyqtSignal(int, dict)
 
-def calculate_running_count(hand, running_count):
+class EVTask(QRunnable):
     """
-    Update and return the running count for the given hand of cards.
-
-    The running_count is adjusted based on the Hi-Lo system:
-    - Low cards (2-6) add to the count.
-    - High cards (10-Ace) subtract from the count.
-    - 7, 8, 9 are neutral.
-    """
-    for card in hand:
-        rank = card[0]
-        if rank in hilo_values:
-            running_count += hilo_values[rank]
-    return running_count
-
-def true_count(running_count, remaining_decks):
+    Solve the EV of every action on a QThreadPool worker so the window stays
+    responsive; the result comes back to the UI thread through a signal.
     """
-    Calculate and return the true count by dividing the running count by 
-    the number of remaining decks.
-
-    True count provides a more accurate measure of card distribution 
-    than running count alone.
-    """
-    if remaining_decks == 0:
-        return running_count
-    return running_count / remaining_decks
+    def __init__(self, request_id, player_hand, dealer_hand, composition):
+        super().__init__()
+        self.signals = EVSignals()
+        self.request_id = request_id
+        self.player_hand = player_hand
+        self.dealer_hand = dealer_hand
+        self.composition = composition
 
-def recommend_hilo_action(player_hand, dealer_hand, running_count, remaining_decks):
-    """
-    Recommend an action ("Hit" or "Stand") based on the player's hand value, 
-    the dealer's up card, and the Hi-Lo true count.
-
-    The logic:
-    - If the true count is high (>= 2), we tend to stand on lower player values 
-      because the deck is 'rich' in high cards.
-    - If the true count is slightly positive (>= 1), we might adjust our hitting/standing 
-      threshold a bit more aggressively.
-    - Otherwise, we fall back to a basic strategy that considers the player's 
-      hand and the dealer's up card.
-    """
-    true_count_value = true_count(running_count, remaining_decks)
-    player_value = calculate_hand_value(player_hand)
-    dealer_up_card = dealer_hand[0][0]
-
-    if true_count_value >= 2:
-        # With a higher true count, if you have >=12, stand; otherwise, hit.
-        return "Stand" if player_value >= 12 else "Hit"
-    elif true_count_value >= 1:
-        # Slightly positive count: hit if <=15, else stand.
-        return "Hit" if player_value <= 15 else "Stand"
-    else:
-        # Neutral/negative count: follow a basic strategy based on dealer up card.
-        if player_value >= 13 or (player_value >= 12 and dealer_up_card in ['2', '3', '4', '5', '6']):
-            return "Stand"
-        else:
-            return "Hit"
+    def run(self):
+        # This game never peeks for dealer blackjack
+        evs = solve_hand(self.player_hand, self.dealer_hand, self.composition, peek=False)
+        self.signals.finished.emit(self.request_id, evs)
 
 class BlackjackGUI(QWidget):
     """
     A PyQt5-based graphical user interface for a Blackjack game utilizing 
     the Hi-Lo card counting system to provide hit/stand recommendations.
     """
-    def __init__(self):
+    def __init__(self, event_log=None, num_decks=6, penetration=0.75):
         super().__init__()
         self.setWindowTitle("Blackjack with Hi-Lo Card Counting")
+        self.event_log = event_log
+        self.num_decks = num_decks
+        self.penetration = penetration
         self.initialize_game()
         self.create_widgets()
         self.start_game()
 
     def initialize_game(self):
         """
-        Initialize or reset game state variables.
+        Create the game engine and the worker pool used for EV solving.
         """
-        self.deck = []
-        self.running_count = 0
-        self.remaining_decks = 0
-        self.player_hand = []
-        self.dealer_hand = []
+        self.engine = GameEngine(self.num_decks, self.penetration, self.event_log)
+        self.thread_pool = QThreadPool.globalInstance()
+        self.ev_request = 0
+        self.dealer_revealed = False
+        # Exact dealer odds for the unseen cards; this game stands on soft 17 and never peeks
+        self.dealer_odds = DealerOdds(self.num_decks, peek=False)
 
     def create_widgets(self):
         """
@@ -126,6 +95,10 @@ class BlackjackGUI(QWidget):
         self.dealer_rank_label.setStyleSheet("font-size:12pt;")
         dealer_frame_layout.addWidget(self.dealer_rank_label)
 
+        self.dealer_odds_label = QLabel("")
+        self.dealer_odds_label.setStyleSheet("font-size:10pt;")
+        dealer_frame_layout.addWidget(self.dealer_odds_label)
+
         dealer_frame.setLayout(dealer_frame_layout)
         self.layout.addWidget(dealer_frame)
 
@@ -152,6 +125,11 @@ class BlackjackGUI(QWidget):
         self.recommendation_label.setStyleSheet("font-size:14pt; font-weight:bold; color:blue;")
         self.layout.addWidget(self.recommendation_label)
 
+        # Expected value of each action for the current shoe composition
+        self.ev_label = QLabel("")
+        self.ev_label.setStyleSheet("font-size:10pt;")
+        self.layout.addWidget(self.ev_label)
+
         # Buttons Section
         self.button_frame = QFrame()
         button_layout = QHBoxLayout()
@@ -163,6 +141,11 @@ class BlackjackGUI(QWidget):
         self.stand_button.clicked.connect(self.stand)
         button_layout.addWidget(self.stand_button)
 
+        self.restart_button = QPushButton("Restart")
+        self.restart_button.clicked.connect(self.restart_game)
+        self.restart_button.setVisible(False)
+        button_layout.addWidget(self.restart_button)
+
         self.button_frame.setLayout(button_layout)
         self.layout.addWidget(self.button_frame)
 
@@ -170,111 +153,136 @@ class BlackjackGUI(QWidget):
 
     def start_game(self):
         """
-        Set up a new game:
-        - Shuffle the deck
-        - Deal initial cards to player and dealer
-        - Update the running and true counts
-        - Refresh the display
+        Subscribe to the engine and deal the first hand.
+        """
+        self.engine.subscribe(self.on_engine_event)
+        self.engine.new_hand()
+
+    def on_engine_event(self, event, data):
         """
-        self.deck = shuffle_all_decks(generate_deck())
-        self.deck = convert_to_tuples(self.deck)
-        self.remaining_decks = len(self.deck) // 52
-        self.player_hand = [self.deck.pop(), self.deck.pop()]
-        self.dealer_hand = [self.deck.pop(), self.deck.pop()]
-        self.running_count = calculate_running_count(self.player_hand + self.dealer_hand, 0)
-        self.update_display()
-
-    def update_display(self):
+        Render engine events:
+        - Redraw the hands whenever a card is dealt or the dealer reveals
+        - Keep the dealer odds in step with every card seen (the hole card once revealed)
+        - Show the recommendation and dealer odds, and start solving EVs in the background
+        - Enable the buttons that fit the new state
+        - Announce the outcome of the hand
         """
-        Update all labels to reflect the current state of the game:
-        - Show dealer's partial hand (first card + hidden)
-        - Show player's full hand
-        - Show both hand values and recommended action
+        if event == 'new_hand':
+            self.dealer_revealed = False
+        elif event == 'shuffle':
+            self.dealer_odds.reset()
+        elif event == 'reveal':
+            self.dealer_revealed = True
+            self.dealer_odds.observe(data['cards'][1])
+            self.dealer_odds_label.setText("")
+            self.update_hands()
+        elif event == 'deal':
+            hole_card = data['actor'] == DEALER and len(self.engine.dealer_hand) == 2 and not self.dealer_revealed
+            if not hole_card:
+                self.dealer_odds.observe(data['card'])
+            self.update_hands()
+        elif event == 'recommendation':
+            self.recommendation_label.setText(f"Recommendation: {data['action']}")
+            self.update_dealer_odds()
+            self.request_evs()
+        elif event == 'state':
+            playing = data['state'] == PLAYER_TURN
+            self.hit_button.setEnabled(playing)
+            self.stand_button.setEnabled(playing)
+            self.restart_button.setVisible(data['state'] == FINISHED)
+        elif event == 'outcome':
+            self.ev_label.setText("")
+            self.dealer_odds_label.setText("")
+            if data['bust']:
+                message = "You busted! Dealer wins."
+            elif data['net'] > 0:
+                message = "You win!"
+            elif data['net'] < 0:
+                message = "Dealer wins!"
+            else:
+                message = "It's a tie!"
+            QMessageBox.information(self, "Game Over", message)
+
+    def update_hands(self):
         """
-        self.dealer_hand_label.setText(f"{self.dealer_hand[0][0]} of {self.dealer_hand[0][1]} [Hidden]")
-        self.player_hand_label.setText(", ".join([f"{card[0]} of {card[1]}" for card in self.player_hand]))
-
-        self.dealer_rank_label.setText(f"Dealer's Hand Rank: {calculate_hand_value(self.dealer_hand)}")
-        self.player_rank_label.setText(f"Your Hand Rank: {calculate_hand_value(self.player_hand)}")
-
-        recommendation = recommend_hilo_action(self.player_hand, self.dealer_hand, self.running_count, self.remaining_decks)
-        self.recommendation_label.setText(f"Recommendation: {recommendation}")
-
-    def hit(self):
+        Show the dealer's partial hand (first card + hidden) until it is revealed,
+        the player's full hand, and the value of every visible card.
         """
-        Player chooses to hit:
-        - Draw a card from the deck
-        - Update counts and display
-        - Check if player busts
+        player_hand = self.engine.player_hand
+        dealer_hand = self.engine.dealer_hand
+        visible = dealer_hand if self.dealer_revealed else dealer_hand[:1]
+        dealer_text = ", ".join(f"{card[0]} of {card[1]}" for card in visible)
+        if not self.dealer_revealed and len(dealer_hand) > 1:
+            dealer_text += " [Hidden]"
+        self.dealer_hand_label.setText(dealer_text)
+        self.player_hand_label.setText(", ".join([f"{card[0]} of {card[1]}" for card in player_hand]))
+
+        self.dealer_rank_label.setText(f"Dealer's Hand Rank: {calculate_hand_value(visible)}")
+        self.player_rank_label.setText(f"Your Hand Rank: {calculate_hand_value(player_hand)}")
+
+    def update_dealer_odds(self):
         """
-        if len(self.deck) == 0:
-            QMessageBox.information(self, "Deck Empty", "No more cards in the deck!")
-            return
-
-        new_card = self.deck.pop()
-        self.player_hand.append(new_card)
-        self.running_count = calculate_running_count([new_card], self.running_count)
-        self.update_display()
-
-        # Check for bust
-        if calculate_hand_value(self.player_hand) > 21:
-            QMessageBox.information(self, "Game Over", "You busted! Dealer wins.")
-            self.end_game()
+        Show how the dealer finishes from the upcard, drawing from every card
+        not seen yet (the hidden card included).
+        """
+        up = values[self.engine.dealer_hand[0][0]]
+        self.dealer_odds_label.setText("Dealer odds: " + format_distribution(self.dealer_odds.distribution(up)))
 
-    def stand(self):
+    def request_evs(self):
         """
-        Player chooses to stand:
-        - Reveal dealer's hidden card
-        - Dealer draws until reaching at least 17 or runs out of cards
-        - Check winner
+        Queue an EV solve for the current decision; results for decisions the
+        player has already moved past are dropped when they arrive.
         """
-        self.dealer_hand_label.setText(", ".join([f"{card[0]} of {card[1]}" for card in self.dealer_hand]))
-        while calculate_hand_value(self.dealer_hand) < 17 and len(self.deck) > 0:
-            new_card = self.deck.pop()
-            self.dealer_hand.append(new_card)
-            self.running_count = calculate_running_count([new_card], self.running_count)
+        self.ev_request += 1
+        self.ev_label.setText("EV: calculating...")
+        task = EVTask(self.ev_request, *self.engine.analysis_inputs())
+        task.signals.finished.connect(self.show_evs)
+        self.thread_pool.start(task)
 
-        self.update_display()
-        self.check_winner()
+    def show_evs(self, request_id, evs):
+        if request_id == self.ev_request and self.engine.state == PLAYER_TURN:
+            self.ev_label.setText("EV: " + "   ".join(f"{action} {ev:+.3f}" for action, ev in evs.items()))
 
-    def check_winner(self):
+    def hit(self):
         """
-        Determine the outcome once the dealer finishes drawing:
-        - Compare player_value and dealer_value
-        - Display a message for the outcome (win, lose, tie)
-        - End the game
+        Player chooses to hit; the engine deals, counts and settles a bust.
         """
-        player_value = calculate_hand_value(self.player_hand)
-        dealer_value = calculate_hand_value(self.dealer_hand)
-        if dealer_value > 21 or player_value > dealer_value:
-            QMessageBox.information(self, "Game Over", "You win!")
-        elif player_value < dealer_value:
-            QMessageBox.information(self, "Game Over", "Dealer wins!")
-        else:
-            QMessageBox.information(self, "Game Over", "It's a tie!")
-        self.end_game()
-
-    def end_game(self):
+        self.engine.hit()
+
+    def stand(self):
         """
-        Disable the Hit and Stand buttons and provide a Restart button.
+        Player chooses to stand; the engine plays out the dealer and settles.
         """
-        self.hit_button.setEnabled(False)
-        self.stand_button.setEnabled(False)
-        restart_button = QPushButton("Restart")
-        restart_button.clicked.connect(self.restart_game)
-        self.button_frame.layout().addWidget(restart_button)
+        self.engine.stand()
 
     def restart_game(self):
         """
-        Restart the game by opening a new window and closing the current one.
-        Creating and showing the new window first ensures the app stays open.
+        Deal a new hand in the same window.
         """
-        self.new_window = BlackjackGUI()
-        self.new_window.show()
-        self.close()
+        self.engine.new_hand()
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = BlackjackGUI()
+    parser = argparse.ArgumentParser(description="Blackjack with Hi-Lo Card Counting")
+    parser.add_argument('--decks', type=int, default=6)
+    parser.add_argument('--penetration', type=float, default=0.75, help="Fraction of the shoe dealt before reshuffling")
+    parser.add_argument('--log', help="Append dealt cards, decisions and outcomes to this binary event log")
+    parser.add_argument('--deviations', nargs='+', help="Deviation CSVs to use instead of the Illustrious 18, "
+                        "e.g. from deviation_optimizer.py")
+    args, qt_args = parser.parse_known_args()
+    if args.deviations:
+        use_deviations(args.deviations)
+    # The solved chart from `python strategy_cache.py build --classic`, when one exists for the game
+    # GameEngine plays: hit/stand only, no peek
+    strategy_cache = load_cache(replace(CLASSIC_RULES, num_decks=args.decks, penetration=args.penetration))
+    if strategy_cache:
+        use_strategy(strategy_cache.strategy())
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    event_log = EventLog(args.log) if args.log else None
+    window = BlackjackGUI(event_log, args.decks, args.penetration)
     window.show()
-    sys.exit(app.exec_())
+    status = app.exec_()
+    QThreadPool.globalInstance().waitForDone()
+    if event_log:
+        event_log.close()
+    sys.exit(status)
@@ -0,0 +1,251 @@
+"""
+Allocation-light engine that plays complete rounds under a Rules object.
+
+The engine reads card values (2-11, 11 for an ace) from a shoe given as
+bytes, advancing a cursor and keeping a running count as cards are seen; the
+dealer's hole card is only counted once it is revealed. A round covers
+insurance, the dealer's peek, blackjacks, late surrender, doubles, splits
+(re-splits up to max_hands, split aces with one card each unless the rules
+say otherwise) and the dealer's play under H17 or S17.
+
+A round can have several spots, all played by the same strategy: cards go
+round the table in casino order (one to each spot, the upcard, a second to
+each spot, the hole card), the spots are played left to right, and every
+card passes through the same running count. The work per round grows
+linearly with the number of spots.
+
+Decisions come from any object with StrategyTable's interface: lookup(total,
+soft, pair, up, tc, can_double, can_split, can_surrender) returning an action
+code, and take_insurance(tc). Per-hand state lives in lists allocated once
+per engine, so a round allocates nothing beyond the floats it returns.
+"""
+from typing import List, Optional, Sequence
+
+from counting import SYSTEMS
+from rules import DEFAULT_RULES, Rules
+from strategy import DOUBLE, HIT, SPLIT, SURRENDER, default_strategy
+
+# Hi-Lo tag indexed by card value
+HILO_TAGS = [0, 0] + list(SYSTEMS['hilo'].tags)
+
+class RoundEngine:
+    """Plays rounds from one shoe at a time; call new_shoe(), then play_round() until the cut card."""
+
+    def __init__(self, rules: Rules = DEFAULT_RULES, strategy=None, tags: Optional[Sequence[int]] = None):
+        self.rules = rules
+        self.strategy = strategy if strategy is not None else default_strategy()
+        self.tags = list(tags) if tags is not None else HILO_TAGS
+        self.shoe = b''
+        self.size = 0
+        self.pos = 0
+        self.rc = 0
+        # Where the last round started and where the player's cards ended, so the
+        # caller can recover who got which card in a one-spot round: player p1, p2,
+        # then first + 4 up to player_end; dealer up and hole, then player_end up to pos
+        self.first = 0
+        self.player_end = 0
+        # Set record to collect the action codes taken in each round in `actions`
+        self.record = False
+        self.actions: List[int] = []
+        self.hands = 0
+        self.reserve(1)
+
+    def new_shoe(self, values: bytes, running_count: int = 0) -> None:
+        """Start dealing from a freshly shuffled shoe of card values."""
+        self.shoe = values
+        self.size = len(values)
+        self.pos = 0
+        self.rc = running_count
+
+    @property
+    def true_count(self) -> float:
+        return self.rc * 52 / (self.size - self.pos)
+
+    def reserve(self, spots: int) -> None:
+        """Size the per-hand lists and spot_nets for rounds of `spots` spots."""
+        hands = spots * self.rules.max_hands
+        self._firsts = [0] * hands
+        self._totals = [0] * hands
+        self._bets = [0.0] * hands
+        self._owners = [0] * hands
+        self.spot_nets = [0.0] * spots
+
+    def play_round(self, bet: float = 1.0, spots: int = 1) -> float:
+        """
+        Play one round with `bet` units on each of `spots` spots and return the
+        units won or lost in total; spot_nets[s] holds spot s's share.
+        """
+        rules = self.rules
+        shoe = self.shoe
+        tags = self.tags
+        size = self.size
+        lookup = self.strategy.lookup
+        record = self.record
+        actions = self.actions
+        if record:
+            actions.clear()
+        if spots > len(self.spot_nets):
+            self.reserve(spots)
+        spot_nets = self.spot_nets
+
+        first = pos = self.first = self.pos
+        # Deal a card to every spot, the upcard, a second card to every spot, then the hole card
+        up = shoe[pos + spots]
+        hole = shoe[pos + 2 * spots + 1]
+        pos += 2 * spots + 2
+        rc = self.rc + tags[up]
+        for s in range(spots):
+            rc += tags[shoe[first + s]] + tags[shoe[first + spots + 1 + s]]
+        dealer_blackjack = up + hole == 21
+        self.hands += spots
+
+        insurance = 0.0
+        if up == 11 and rules.insurance and self.strategy.take_insurance(rc * 52 / (size - pos)):
+            insurance = bet if dealer_blackjack else -bet / 2
+        peeked = dealer_blackjack and rules.dealer_peek
+
+        max_hands = rules.max_hands
+        firsts = self._firsts
+        totals = self._totals
+        bets = self._bets
+        owners = self._owners
+        # Hands across all spots; each spot's split hands follow each other from `start`
+        n = 0
+        live = 0
+        for s in range(spots):
+            spot_net = insurance
+            p1 = shoe[first + s]
+            p2 = shoe[first + spots + 1 + s]
+            if p1 + p2 == 21 or peeked:
+                if p1 + p2 != 21:
+                    spot_net -= bet
+                elif not dealer_blackjack:
+                    spot_net += bet * rules.blackjack_payout
+                spot_nets[s] = spot_net
+                continue
+
+            start = i = n
+            firsts[n] = p1
+            owners[n] = s
+            n += 1
+            # Hands this spot has, counting splits
+            m = 1
+            c2 = p2
+            while i < n:
+                c1 = firsts[i]
+                if i > start:
+                    c2 = shoe[pos]
+                    pos += 1
+                    rc += tags[c2]
+                total = c1 + c2
+                soft = (c1 == 11) + (c2 == 11)
+                if total > 21:
+                    total -= 10
+                    soft -= 1
+                hand_bet = bet
+                two_cards = True
+                one_card_only = m > 1 and c1 == 11 and not rules.hit_split_aces
+
+                while total < 21:
+                    pair = 0
+                    if (two_cards and c1 == c2 and m < max_hands
+                            and (c1 != 11 or m == 1 or rules.resplit_aces)):
+                        pair = c1
+                    if one_card_only and not pair:
+                        break
+                    action = lookup(
+                        total, soft > 0, pair, up, rc * 52 / (size - pos),
+                        two_cards and not one_card_only and (m == 1 or rules.double_after_split)
+                        and rules.can_double(total),
+                        pair > 0,
+                        two_cards and m == 1 and rules.surrender,
+                    )
+                    if record:
+                        actions.append(action)
+                    if action == SPLIT and pair:
+                        # This hand keeps one card and draws again; the other waits its turn
+                        firsts[n] = c1
+                        owners[n] = s
+                        n += 1
+                        m += 1
+                        c2 = shoe[pos]
+                        pos += 1
+                        rc += tags[c2]
+                        total = c1 + c2
+                        soft = (c1 == 11) + (c2 == 11)
+                        if total > 21:
+                            total -= 10
+                            soft -= 1
+                        one_card_only = c1 == 11 and not rules.hit_split_aces
+                        continue
+                    if one_card_only:
+                        break
+                    if action == SURRENDER:
+                        total = 0
+                        hand_bet = 0.0
+                        spot_net -= bet / 2
+                        break
+                    if action != HIT and action != DOUBLE:
+                        break
+                    card = shoe[pos]
+                    pos += 1
+                    rc += tags[card]
+                    total += card
+                    if card == 11:
+                        soft += 1
+                    if total > 21 and soft:
+                        total -= 10
+                        soft -= 1
+                    two_cards = False
+                    if action == DOUBLE:
+                        hand_bet += bet
+                        break
+
+                if total > 21:
+                    spot_net -= hand_bet
+                    hand_bet = 0.0
+                elif hand_bet:
+                    live += 1
+                totals[i] = total
+                bets[i] = hand_bet
+                i += 1
+            spot_nets[s] = spot_net
+
+        rc += tags[hole]
+        self.player_end = pos
+        if live:
+            if dealer_blackjack:
+                # No peek: the dealer's blackjack takes every bet still on the table
+                for k in range(n):
+                    spot_nets[owners[k]] -= bets[k]
+            else:
+                dealer = up + hole
+                dsoft = (up == 11) + (hole == 11)
+                if dealer > 21:
+                    dealer -= 10
+                    dsoft -= 1
+                hit_soft_17 = rules.hit_soft_17
+                while dealer < 17 or (hit_soft_17 and dealer == 17 and dsoft):
+                    card = shoe[pos]
+                    pos += 1
+                    rc += tags[card]
+                    dealer += card
+                    if card == 11:
+                        dsoft += 1
+                    if dealer > 21 and dsoft:
+                        dealer -= 10
+                        dsoft -= 1
+                for k in range(n):
+                    hand_bet = bets[k]
+                    if hand_bet:
+                        total = totals[k]
+                        if dealer > 21 or total > dealer:
+                            spot_nets[owners[k]] += hand_bet
+                        elif total < dealer:
+                            spot_nets[owners[k]] -= hand_bet
+        self.rc = rc
+        self.pos = pos
+        net = 0.0
+        for s in range(spots):
+            net += spot_nets[s]
+        return net
@@ -0,0 +1,60 @@
+"""
+Table rules.
+
+A Rules object describes one game: shoe size and cut-card depth, how the
+dealer plays soft 17 and whether it peeks for blackjack, the blackjack
+payout, and which doubles, splits, surrender and insurance are offered.
+round_engine plays complete rounds under a Rules object.
+"""
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+@dataclass(frozen=True)
+class Rules:
+    num_decks: int = 6
+    # Fraction of the shoe dealt before the cut card comes out
+    penetration: float = 0.75
+    hit_soft_17: bool = False
+    # The dealer checks for blackjack under an ace or ten before the player acts;
+    # without a peek, a dealer blackjack also takes doubled and split bets
+    dealer_peek: bool = True
+    blackjack_payout: float = 1.5
+    # Totals a two-card hand may double on; None allows any two cards
+    double_totals: Optional[Tuple[int, ...]] = None
+    double_after_split: bool = True
+    # Most hands a player can hold after splitting and re-splitting
+    max_hands: int = 4
+    resplit_aces: bool = False
+    hit_split_aces: bool = False
+    # Late surrender: after the peek, on the first two cards, not after a split
+    surrender: bool = True
+    insurance: bool = True
+
+    def __post_init__(self):
+        if self.num_decks < 1:
+            raise ValueError(f"num_decks must be at least 1, got {self.num_decks}")
+        if not 0 < self.penetration <= 1:
+            raise ValueError(f"penetration must be in (0, 1], got {self.penetration}")
+        if self.max_hands < 1:
+            raise ValueError(f"max_hands must be at least 1, got {self.max_hands}")
+
+    @property
+    def max_cards_per_round(self) -> int:
+        """Upper bound on the cards one round can use, so a shoe never runs dry mid-round."""
+        return self.max_cards_for(1)
+
+    def max_cards_for(self, spots: int) -> int:
+        """Upper bound on the cards a round with `spots` player spots can use."""
+        # A hand stays under 22 with at most 11 cards (four aces, four 2s, three 3s)
+        return 11 * (self.max_hands * spots + 1)
+
+    def can_double(self, total: int) -> bool:
+        return self.double_totals is None or total in self.double_totals
+
+# The rules the default strategy chart in data/ was built for
+DEFAULT_RULES = Rules()
+
+# Close to the game play_blackjack and the GUIs deal: hit or stand only, no
+# blackjack bonus and no peek (here a dealer blackjack beats any other 21)
+CLASSIC_RULES = Rules(dealer_peek=False, blackjack_payout=1.0, double_totals=(), max_hands=1,
+                      surrender=False, insurance=False)
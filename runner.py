@@ -0,0 +1,121 @@
+"""
+Multi-core sharded simulation runner.
+
+The requested hands are cut into fixed-size shards, and every shard gets its
+own RNG seed derived from one master seed. Because the shard layout and seeds
+depend only on the master seed and shard size, the merged result is identical
+whether the shards run on one worker or on every core. Workers send back only
+the aggregate SimulationResult for their shard, never per-hand records.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from simulator import STRATEGIES, SimulationResult, merge_results, simulate
+
+DEFAULT_SHARD_HANDS = 250_000
+
+@dataclass
+class WorkerStats:
+    pid: int
+    shards: int = 0
+    hands: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def hands_per_sec(self) -> float:
+        return self.hands / self.elapsed if self.elapsed else 0.0
+
+@dataclass
+class RunReport:
+    result: SimulationResult
+    workers: List[WorkerStats] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'result': self.result.to_dict(),
+            'wall_time': self.wall_time,
+            'hands_per_sec': self.result.hands / self.wall_time if self.wall_time else 0.0,
+            'workers': [
+                {'pid': w.pid, 'shards': w.shards, 'hands': w.hands,
+                 'elapsed': w.elapsed, 'hands_per_sec': w.hands_per_sec}
+                for w in self.workers
+            ],
+        }
+
+def derive_seed(master_seed: int, index: int) -> int:
+    """Derive an independent 64-bit seed for shard `index` from the master seed."""
+    digest = hashlib.sha256(f"{master_seed}:{index}".encode()).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+def _run_shard(args):
+    strategy_name, hands, seed, num_decks, penetration, spots = args
+    result = simulate(STRATEGIES[strategy_name], hands=hands, num_decks=num_decks,
+                      penetration=penetration, seed=seed, name=strategy_name, spots=spots)
+    return os.getpid(), result
+
+def run(strategy: str = 'hilo', hands: int = 10_000_000, master_seed: int = 0,
+        num_decks: int = 6, penetration: float = 0.75, workers: Optional[int] = None,
+        shard_hands: int = DEFAULT_SHARD_HANDS, spots: int = 1) -> RunReport:
+    """
+    Simulate `hands` hands of a named strategy across a process pool.
+
+    `workers` defaults to every core; `workers=1` runs in-process.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy!r}")
+    workers = workers or os.cpu_count() or 1
+
+    jobs = []
+    remaining = hands
+    index = 0
+    while remaining > 0:
+        size = min(shard_hands, remaining)
+        jobs.append((strategy, size, derive_seed(master_seed, index), num_decks, penetration, spots))
+        remaining -= size
+        index += 1
+
+    start = time.perf_counter()
+    if workers == 1:
+        outputs = [_run_shard(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(_run_shard, jobs))
+    wall_time = time.perf_counter() - start
+
+    stats: Dict[int, WorkerStats] = {}
+    for pid, result in outputs:
+        worker = stats.setdefault(pid, WorkerStats(pid))
+        worker.shards += 1
+        worker.hands += result.hands
+        worker.elapsed += result.elapsed
+
+    # pool.map preserves job order, so the merge is the same for any worker count
+    merged = merge_results([result for _, result in outputs], name=strategy)
+    merged.seed = master_seed
+    return RunReport(result=merged, workers=list(stats.values()), wall_time=wall_time)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded multi-core blackjack simulation")
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='hilo')
+    parser.add_argument('--hands', type=int, default=10_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--decks', type=int, default=6)
+    parser.add_argument('--penetration', type=float, default=0.75)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--shard-hands', type=int, default=DEFAULT_SHARD_HANDS)
+    parser.add_argument('--spots', type=int, default=1, help="Player spots per round")
+    args = parser.parse_args(argv)
+
+    report = run(args.strategy, args.hands, args.seed, args.decks, args.penetration,
+                 args.workers, args.shard_hands, args.spots)
+    print(json.dumps(report.to_dict(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Asyncio session server hosting many blackjack tables at once.
+
+Each table has up to `max_seats` seats sharing one shoe and one Hi-Lo count.
+Clients speak line-delimited JSON over a local TCP or Unix socket: one object
+per line, requests carry an "op" and server messages an "event".
+
+Requests:
+    {"op": "join", "table": "name"}   take a seat ("table" may be omitted to be
+                                      placed at any table with a free seat)
+    {"op": "deal"}                    ready for the next round; a round starts
+                                      once every seated player is ready
+    {"op": "hit"} / {"op": "stand"}   act on your hand when it is your turn
+    {"op": "leave"}
+
+Events:
+    joined   {"table", "seat"}
+    shuffle  {"num_decks"}
+    round    {"hands": {seat: cards}, "dealer_up": card}
+    turn     {"seat", "hand", "value", "recommendation", "true_count"}
+    card     {"seat", "card", "value"}       a hit, echoed to the whole table
+    stand    {"seat"}
+    result   {"dealer": cards, "dealer_value", "nets": {seat: units}}
+    error    {"message"}
+
+Cards are [rank, suit] pairs. Rounds follow play_blackjack: hit or stand
+only, the dealer stands on 17, and a win pays even money. The hole card is
+only counted once the dealer reveals it, so recommendations never leak it.
+A round only starts once the cut card is still ahead and the shoe holds
+enough cards for every seat's longest possible hand; otherwise the shoe is
+reshuffled first.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import Dict, List, Optional
+
+from blackjack import calculate_hand_value, recommend_hilo_action
+from cards import Shoe
+from counting import ShoeTracker
+from game_engine import FINISHED, PLAYER_TURN, WAITING
+from rules import CLASSIC_RULES
+
+DEFAULT_PORT = 8642
+DEFAULT_MAX_SEATS = 7
+
+class Session:
+    """One client connection and the seat it holds."""
+
+    __slots__ = ('writer', 'table', 'seat', 'ready', 'hand', 'done')
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.table: Optional['Table'] = None
+        self.seat = -1
+        self.ready = False
+        self.hand: List[tuple] = []
+        self.done = True
+
+    def send(self, message: dict) -> None:
+        self.send_line(json.dumps(message).encode() + b"\n")
+
+    def send_line(self, line: bytes) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(line)
+
+def check_table_options(num_decks: int, penetration: float, max_seats: int) -> None:
+    """Reject table settings whose full shoe could run dry in a round with every seat taken."""
+    if num_decks < 1:
+        raise ValueError(f"num_decks must be at least 1, got {num_decks}")
+    if not 0 < penetration <= 1:
+        raise ValueError(f"penetration must be in (0, 1], got {penetration}")
+    if max_seats < 1:
+        raise ValueError(f"max_seats must be at least 1, got {max_seats}")
+    if CLASSIC_RULES.max_cards_for(max_seats) > 52 * num_decks:
+        raise ValueError(f"A {num_decks}-deck shoe cannot be guaranteed to last a round of {max_seats} seats")
+
+class Table:
+    """Seats sharing one shoe and count; rounds start when every seated player is ready."""
+
+    def __init__(self, name: str, num_decks: int = 6, penetration: float = 0.75,
+                 max_seats: int = DEFAULT_MAX_SEATS):
+        check_table_options(num_decks, penetration, max_seats)
+        self.name = name
+        self.seats: List[Optional[Session]] = [None] * max_seats
+        self.shoe = Shoe(num_decks, penetration)
+        self.shoe.shuffle()
+        self.tracker = ShoeTracker(num_decks, systems=('hilo',))
+        self.dealer_hand: List[tuple] = []
+        self.state = WAITING
+        self.turn = 0
+        self.rounds = 0
+
+    @property
+    def players(self) -> List[Session]:
+        return [session for session in self.seats if session is not None]
+
+    @property
+    def has_free_seat(self) -> bool:
+        return None in self.seats
+
+    def broadcast(self, message: dict) -> None:
+        line = json.dumps(message).encode() + b"\n"
+        for session in self.seats:
+            if session is not None:
+                session.send_line(line)
+
+    def sit(self, session: Session) -> int:
+        seat = self.seats.index(None)
+        self.seats[seat] = session
+        session.table, session.seat, session.ready, session.done = self, seat, False, True
+        session.hand = []
+        return seat
+
+    def leave(self, session: Session) -> None:
+        self.seats[session.seat] = None
+        session.table = None
+        if self.state == PLAYER_TURN and self.turn == session.seat:
+            self.advance()
+        elif self.state != PLAYER_TURN:
+            self.maybe_start()
+
+    def ready(self, session: Session) -> None:
+        session.ready = True
+        self.maybe_start()
+
+    def maybe_start(self) -> None:
+        players = self.players
+        if self.state != PLAYER_TURN and players and all(session.ready for session in players):
+            self.start_round(players)
+
+    def _deal(self) -> tuple:
+        card = self.shoe.deal_tuple()
+        self.tracker.observe(card)
+        return card
+
+    def start_round(self, players: List[Session]) -> None:
+        # Every hand stays under 22 with at most 11 cards, so this round can never run the shoe dry
+        if self.shoe.needs_shuffle or self.shoe.remaining < CLASSIC_RULES.max_cards_for(len(players)):
+            self.shoe.shuffle()
+            self.tracker.reset()
+            self.broadcast({'event': 'shuffle', 'num_decks': self.shoe.num_decks})
+        for session in players:
+            session.ready = False
+            session.done = False
+            session.hand = [self._deal()]
+        self.dealer_hand = [self._deal()]
+        for session in players:
+            session.hand.append(self._deal())
+        # The hole card stays out of the count until it is revealed
+        self.dealer_hand.append(self.shoe.deal_tuple())
+        self.rounds += 1
+        self.state = PLAYER_TURN
+        self.broadcast({'event': 'round', 'hands': {session.seat: session.hand for session in players},
+                        'dealer_up': self.dealer_hand[0]})
+        self.turn = -1
+        self.advance()
+
+    def advance(self) -> None:
+        """Prompt the next seat still playing, or play out the dealer."""
+        for seat in range(self.turn + 1, len(self.seats)):
+            session = self.seats[seat]
+            if session is not None and not session.done:
+                self.turn = seat
+                self.prompt(session)
+                return
+        self.finish_round()
+
+    def prompt(self, session: Session) -> None:
+        tracker = self.tracker
+        self.broadcast({
+            'event': 'turn', 'seat': session.seat, 'hand': session.hand,
+            'value': calculate_hand_value(session.hand),
+            'recommendation': recommend_hilo_action(session.hand, self.dealer_hand, tracker.running_count,
+                                                    tracker.decks_remaining, False, False, False),
+            'true_count': round(tracker.true_count(), 2),
+        })
+
+    def act(self, session: Session, op: str) -> None:
+        if self.state != PLAYER_TURN or self.turn != session.seat:
+            session.send({'event': 'error', 'message': "Not your turn"})
+            return
+        if op == 'hit':
+            card = self._deal()
+            session.hand.append(card)
+            value = calculate_hand_value(session.hand)
+            self.broadcast({'event': 'card', 'seat': session.seat, 'card': card, 'value': value})
+            if value < 21:
+                self.prompt(session)
+                return
+        else:
+            self.broadcast({'event': 'stand', 'seat': session.seat})
+        session.done = True
+        self.advance()
+
+    def finish_round(self) -> None:
+        self.tracker.observe(self.dealer_hand[1])
+        while calculate_hand_value(self.dealer_hand) < 17:
+            self.dealer_hand.append(self._deal())
+        dealer_value = calculate_hand_value(self.dealer_hand)
+        nets = {}
+        for session in self.players:
+            # Players who sat down mid-round have no hand to settle
+            if session.hand:
+                player_value = calculate_hand_value(session.hand)
+                if player_value > 21:
+                    nets[session.seat] = -1
+                elif dealer_value > 21 or player_value > dealer_value:
+                    nets[session.seat] = 1
+                elif player_value < dealer_value:
+                    nets[session.seat] = -1
+                else:
+                    nets[session.seat] = 0
+        self.state = FINISHED
+        self.broadcast({'event': 'result', 'dealer': self.dealer_hand, 'dealer_value': dealer_value, 'nets': nets})
+        self.maybe_start()
+
+class BlackjackServer:
+    """Routes client requests to tables, creating tables on demand."""
+
+    def __init__(self, num_decks: int = 6, penetration: float = 0.75, max_seats: int = DEFAULT_MAX_SEATS):
+        check_table_options(num_decks, penetration, max_seats)
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.max_seats = max_seats
+        self.tables: Dict[str, Table] = {}
+        self._open: Optional[Table] = None
+        self.connections = 0
+
+    def table(self, name: Optional[str]) -> Table:
+        if name is None:
+            if self._open is None or not self._open.has_free_seat:
+                self._open = self.table(f"auto-{len(self.tables)}")
+            return self._open
+        table = self.tables.get(name)
+        if table is None:
+            table = self.tables[name] = Table(name, self.num_decks, self.penetration, self.max_seats)
+        return table
+
+    def handle(self, session: Session, request: dict) -> None:
+        op = request.get('op')
+        table = session.table
+        if op == 'join':
+            if table is not None:
+                table.leave(session)
+            table = self.table(request.get('table'))
+            if not table.has_free_seat:
+                session.send({'event': 'error', 'message': f"Table {table.name!r} is full"})
+                return
+            seat = table.sit(session)
+            session.send({'event': 'joined', 'table': table.name, 'seat': seat})
+        elif table is None:
+            session.send({'event': 'error', 'message': "Join a table first"})
+        elif op == 'deal':
+            table.ready(session)
+        elif op in ('hit', 'stand'):
+            table.act(session, op)
+        elif op == 'leave':
+            table.leave(session)
+        else:
+            session.send({'event': 'error', 'message': f"Unknown op {op!r}"})
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = Session(writer)
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    session.send({'event': 'error', 'message': "Invalid JSON"})
+                else:
+                    self.handle(session, request)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            if session.table is not None:
+                session.table.leave(session)
+            writer.close()
+
+async def serve(host: str = '127.0.0.1', port: int = DEFAULT_PORT, unix_path: Optional[str] = None,
+                **table_options) -> None:
+    server = BlackjackServer(**table_options)
+    if unix_path:
+        listener = await asyncio.start_unix_server(server.serve_client, unix_path, backlog=4096)
+    else:
+        listener = await asyncio.start_server(server.serve_client, host, port, backlog=4096)
+    async with listener:
+        await listener.serve_forever()
+
+def raise_file_limit() -> None:
+    """Allow as many open sockets as the hard limit permits."""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-table blackjack session server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument('--decks', type=int, default=6)
+    parser.add_argument('--penetration', type=float, default=0.75)
+    parser.add_argument('--seats', type=int, default=DEFAULT_MAX_SEATS, help="Seats per table")
+    args = parser.parse_args(argv)
+    try:
+        check_table_options(args.decks, args.penetration, args.seats)
+    except ValueError as e:
+        parser.error(str(e))
+
+    raise_file_limit()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, num_decks=args.decks,
+                          penetration=args.penetration, max_seats=args.seats))
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
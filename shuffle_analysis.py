@@ -0,0 +1,193 @@
+"""
+Batch shuffle-quality analysis for the riffle shuffler.
+
+riffle_batch reproduces shuffling_deck.riffle_pass on a whole array of
+shoes at once. Each row follows the same left/right coin-flip process, so
+the distribution matches (the RNG stream differs). Each row of the array is
+a permutation of card indices in the new-shoe order of DECK_TUPLES * decks,
+so every statistic compares where a card ended up with where it started:
+
+- rising sequences: maximal runs of consecutive original indices kept in
+  order. A uniform shuffle averages (n + 1) / 2; a riffle at most doubles
+  them per pass, so few passes leave few sequences;
+- total variation distance from uniform of the rising-sequence count
+  (against the Eulerian distribution a uniform shuffle gives). For a
+  Gilbert-Shannon-Reeds riffle this is the full permutation distance; for
+  this riffle it is a lower bound;
+- positional bias: the mean over cards of the distance between a card's
+  final-position distribution and uniform. A uniform control (NumPy
+  permutations of the same batch sizes) gives its sampling-noise floor;
+- adjacency: how many originally neighbouring cards are still neighbours
+  in order (about 1 per uniform shoe), and the correlation of the Hi-Lo
+  tags of adjacent cards, which is the clumping that would leak into count
+  estimates (-1 / (n - 1) when uniform).
+"""
+import argparse
+import json
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from counting import RANK_SLOTS, SYSTEMS
+from shuffling_deck import DECK_TUPLES
+
+DEFAULT_BATCH = 2_000
+UNIFORM = 0
+
+def riffle_batch(shoes: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    One riffle pass on every row of a (shoes x cards) array.
+
+    riffle_pass walks both halves in rounds: the left card drops on a coin
+    flip, then the right card on another, and once a half runs out the rest
+    of the other half follows. Here all the flips are drawn at once, drops
+    past the end of a half are masked out and the survivors are compacted
+    in round order, which gives the same interleaving process row by row.
+    """
+    count, n = shoes.shape
+    mid = n // 2
+    # Enough rounds for one half to run out in all but astronomically rare cases;
+    # either way the remaining cards are appended in order below
+    rounds = n + 8 * math.isqrt(n) + 16
+    drops = rng.random((count, rounds, 2)) > 0.5
+    taken = np.cumsum(drops, axis=1)
+    drops &= taken <= (mid, n - mid)
+    source = np.where([True, False], taken - 1, mid + taken - 1).reshape(count, 2 * rounds)
+    drops = drops.reshape(count, 2 * rounds)
+
+    order = np.argsort(~drops, axis=1, kind='stable')[:, :n]
+    result = np.take_along_axis(source, order, axis=1)
+    # Positions past the dropped cards take the leftover cards: left half first, then right
+    left_done = np.minimum(taken[:, -1, 0], mid)[:, None]
+    right_done = np.minimum(taken[:, -1, 1], n - mid)[:, None]
+    extra = np.arange(n)[None, :] - (left_done + right_done)
+    leftover = np.where(extra < mid - left_done, left_done + extra, mid + right_done + extra - (mid - left_done))
+    result = np.where(extra >= 0, leftover, result)
+    return np.take_along_axis(shoes, result, axis=1)
+
+def shuffled_batch(count: int, n: int, passes: int, rng: np.random.Generator) -> np.ndarray:
+    """`count` shoes of n card indices after `passes` riffle passes (0 passes: uniform permutations)."""
+    shoes = np.broadcast_to(np.arange(n, dtype=np.int16), (count, n))
+    if passes == UNIFORM:
+        return rng.permuted(shoes, axis=1)
+    shoes = np.ascontiguousarray(shoes)
+    for _ in range(passes):
+        shoes = riffle_batch(shoes, rng)
+    return shoes
+
+def positions(shoes: np.ndarray) -> np.ndarray:
+    """Final position of every original card index."""
+    result = np.empty_like(shoes)
+    np.put_along_axis(result, shoes.astype(np.intp), np.arange(shoes.shape[1], dtype=shoes.dtype)[None, :], axis=1)
+    return result
+
+def rising_sequences(shoes: np.ndarray) -> np.ndarray:
+    """Rising sequences per shoe: 1 + cards that ended up before the card they followed."""
+    where = positions(shoes)
+    return 1 + (where[:, 1:] < where[:, :-1]).sum(axis=1)
+
+@lru_cache(maxsize=None)
+def eulerian_distribution(n: int) -> np.ndarray:
+    """P(a uniform permutation of n cards has k rising sequences), k = 1..n, from Eulerian numbers."""
+    row = [1]
+    for m in range(2, n + 1):
+        row = [(k + 1) * (row[k] if k < m - 1 else 0) + (m - k) * (row[k - 1] if k else 0) for k in range(m)]
+    total = math.factorial(n)
+    # Scale before dividing so tiny probabilities survive the float conversion
+    return np.array([a * 10 ** 18 // total for a in row], dtype=np.float64) / 1e18
+
+def hilo_tags(num_decks: int) -> np.ndarray:
+    """Hi-Lo tag of every original card index."""
+    tags = SYSTEMS['hilo'].tags
+    return np.array([tags[RANK_SLOTS[rank]] for rank, _ in DECK_TUPLES * num_decks], dtype=np.float64)
+
+@dataclass
+class ShuffleReport:
+    decks: int
+    # 0 for the uniform control
+    passes: int
+    shoes: int
+    rising_sequences: float
+    rising_sequences_tvd: float
+    positional_tvd: float
+    adjacent_pairs_kept: float
+    adjacent_tag_correlation: float
+    elapsed: float
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def analyze(num_decks: int, passes: int, shoes: int, seed: int = 0, batch: int = DEFAULT_BATCH) -> ShuffleReport:
+    """Shuffle `shoes` shoes with `passes` riffle passes (0: uniform control) and measure them."""
+    start = time.perf_counter()
+    rng = np.random.default_rng([seed, num_decks, passes])
+    n = 52 * num_decks
+    tags = hilo_tags(num_decks)
+    rising_counts = np.zeros(n + 1, dtype=np.int64)
+    position_counts = np.zeros(n * n, dtype=np.int64)
+    kept = 0
+    # Sums for the adjacent-tag correlation
+    xy = x = y = xx = yy = 0.0
+    done = 0
+    while done < shoes:
+        size = min(batch, shoes - done)
+        shuffled = shuffled_batch(size, n, passes, rng)
+        where = positions(shuffled).astype(np.intp)
+        rising_counts += np.bincount(1 + (where[:, 1:] < where[:, :-1]).sum(axis=1), minlength=n + 1)
+        position_counts += np.bincount((np.arange(n) * n + where).ravel(), minlength=n * n)
+        kept += int((where[:, 1:] == where[:, :-1] + 1).sum())
+        left = tags[shuffled[:, :-1]]
+        right = tags[shuffled[:, 1:]]
+        xy += float((left * right).sum())
+        x += float(left.sum())
+        y += float(right.sum())
+        xx += float((left * left).sum())
+        yy += float((right * right).sum())
+        done += size
+
+    pairs = shoes * (n - 1)
+    covariance = xy / pairs - (x / pairs) * (y / pairs)
+    spread = math.sqrt((xx / pairs - (x / pairs) ** 2) * (yy / pairs - (y / pairs) ** 2))
+    rising = rising_counts[1:] / shoes
+    position_freq = position_counts.reshape(n, n) / shoes
+    return ShuffleReport(
+        decks=num_decks, passes=passes, shoes=shoes,
+        rising_sequences=float((np.arange(1, n + 1) * rising).sum()),
+        rising_sequences_tvd=float(0.5 * np.abs(rising - eulerian_distribution(n)).sum()),
+        positional_tvd=float(0.5 * np.abs(position_freq - 1 / n).sum(axis=1).mean()),
+        adjacent_pairs_kept=kept / shoes,
+        adjacent_tag_correlation=covariance / spread,
+        elapsed=time.perf_counter() - start,
+    )
+
+def _analyze(args) -> ShuffleReport:
+    return analyze(*args)
+
+def sweep(decks: Sequence[int], passes: Sequence[int], shoes: int, seed: int = 0,
+          batch: int = DEFAULT_BATCH, workers: Optional[int] = None) -> List[ShuffleReport]:
+    """analyze() every deck count and pass count, plus a uniform control per deck count, across processes."""
+    jobs = [(d, p, shoes, seed, batch) for d in decks for p in sorted(set(passes) | {UNIFORM})]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_analyze, jobs))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure riffle-shuffle quality by pass and deck count")
+    parser.add_argument('--decks', type=int, nargs='+', default=[1, 2, 6, 8])
+    parser.add_argument('--passes', type=int, nargs='+', default=list(range(1, 11)))
+    parser.add_argument('--shoes', type=int, default=50_000, help="Shoes per (decks, passes) combination")
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH, help="Shoes shuffled per NumPy batch")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    reports = sweep(args.decks, args.passes, args.shoes, args.seed, args.batch, args.workers)
+    print(json.dumps({'elapsed': time.perf_counter() - start, 'reports': [r.to_dict() for r in reports]}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,263 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Callable, Iterator, List, MutableSequence, Optional, Sequence, Union
 import random
+import sys
+import time
+
+from rules import CLASSIC_RULES
 
 @dataclass
-class Card: 
+class Card:
     suit: str
     rank: str
 
+# Shuffle engine modes accepted by shuffle_indices / shuffle_all_decks
+RIFFLE = 'riffle'
+FISHER_YATES = 'fisher_yates'
+TRUE_RANDOM = 'true_random'
+SHUFFLE_MODES = (RIFFLE, FISHER_YATES, TRUE_RANDOM)
+
+SeedLike = Union[None, int, random.Random]
+
 def generate_deck() -> List[Card]:
     suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
     ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
     return [Card(suit, rank) for suit in suits for rank in ranks]
 
+def make_rng(seed: SeedLike = None) -> random.Random:
+    """
+    Return an RNG stream for the shuffle engine.
+
+    An existing random.Random is used as-is so callers can share one stream
+    across several shuffles; an int gives a reproducible stream; None seeds
+    from OS entropy.
+    """
+    if isinstance(seed, random.Random):
+        return seed
+    return random.Random(seed)
+
+def riffle_pass(deck: Sequence, rng: random.Random) -> list:
+    """
+    One riffle pass: split the deck in half and interleave the halves randomly.
+
+    Walks both halves with cursors instead of popping from the front, so the
+    pass is O(n). It consumes the RNG exactly like the original pop(0)-based
+    implementation, so a given seed produces the same order as before.
+    """
+    n = len(deck)
+    mid = n // 2
+    i, j = 0, mid
+    rand = rng.random
+    shuffled = []
+    append = shuffled.append
+    while i < mid or j < n:
+        if i < mid and (j >= n or rand() > 0.5):
+            append(deck[i])
+            i += 1
+        if j < n and (i >= mid or rand() > 0.5):
+            append(deck[j])
+            j += 1
+    return shuffled
+
+def fisher_yates(items: MutableSequence, rng: random.Random) -> MutableSequence:
+    """Shuffle items in place with Fisher–Yates (random.Random.shuffle) and return them."""
+    rng.shuffle(items)
+    return items
+
+def shuffle_indices(n: int, seed: SeedLike = None, mode: str = RIFFLE, passes: int = 5) -> List[int]:
+    """
+    Return a permutation of range(n) produced by the selected shuffle mode.
+
+    - 'riffle': `passes` realistic riffle passes (see riffle_pass).
+    - 'fisher_yates': a uniform permutation from the seeded RNG stream.
+    - 'true_random': a uniform permutation drawn from OS entropy; the seed is
+      ignored and the result is not reproducible.
+    """
+    order = list(range(n))
+    return apply_shuffle(order, seed, mode, passes)
+
+def apply_shuffle(items: Sequence, seed: SeedLike = None, mode: str = RIFFLE, passes: int = 5) -> list:
+    """Return a shuffled copy of any sequence (cards, indices, ints) in linear time per pass."""
+    if mode == RIFFLE:
+        rng = make_rng(seed)
+        deck = list(items)
+        for _ in range(passes):
+            deck = riffle_pass(deck, rng)
+        return deck
+    if mode == FISHER_YATES:
+        return fisher_yates(list(items), make_rng(seed))
+    if mode == TRUE_RANDOM:
+        return fisher_yates(list(items), random.SystemRandom())
+    raise ValueError(f"Unknown shuffle mode: {mode!r} (expected one of {SHUFFLE_MODES})")
+
 def shuffle(deck: List[Card], rng: random.Random) -> List[Card]:
     """Shuffle a deck by interleaving two halves randomly."""
+    return riffle_pass(deck, rng)
+
+def shuffle_all_decks(all_decks: List[Card], num_shuffles: int = 5,
+                      seed: SeedLike = None, mode: str = RIFFLE) -> List[Card]:
+    """
+    Perform multiple shuffles on the combined decks.
+
+    Pass `seed` (an int or a random.Random stream) to get the same shoe back
+    for the same seed; `mode` selects the shuffle engine.
+    """
+    return apply_shuffle(all_decks, seed, mode, num_shuffles)
+
+# One deck of (rank, suit) tuples in generate_deck order
+DECK_TUPLES = [(card.rank, card.suit) for card in generate_deck()]
+
+def lazy_shuffle(items: Sequence, rng: random.Random) -> Iterator:
+    """
+    Yield the items in random order, doing one Fisher–Yates step per item.
+
+    The steps are random.Random.shuffle's, so the items come out in the order
+    that popping from the end of rng.shuffle(list(items)) would give.
+    """
+    pool = list(items)
+    randrange = rng.randrange
+    for i in range(len(pool) - 1, 0, -1):
+        j = randrange(i + 1)
+        pool[i], pool[j] = pool[j], pool[i]
+        yield pool[i]
+    if pool:
+        yield pool[0]
+
+def shoe_cards(num_decks: int = 6, seed: SeedLike = None, mode: str = RIFFLE, passes: int = 5) -> Iterator[tuple]:
+    """
+    Deal one freshly shuffled shoe of (rank, suit) cards, one card at a time.
+
+    Cards come out in the order the original game dealt them, by popping from
+    the end of the shuffled shoe. Fisher–Yates and true-random shoes are
+    shuffled lazily as they are dealt; riffle passes need the whole shoe, so a
+    riffled shoe is shuffled up front.
+    """
+    shoe = DECK_TUPLES * num_decks
+    if mode == FISHER_YATES:
+        return lazy_shuffle(shoe, make_rng(seed))
+    if mode == TRUE_RANDOM:
+        return lazy_shuffle(shoe, random.SystemRandom())
+    return reversed(apply_shuffle(shoe, seed, mode, passes))
+
+def stream_shoes(num_decks: int = 6, seed: SeedLike = None, mode: str = RIFFLE,
+                 passes: int = 5) -> Iterator[Iterator[tuple]]:
+    """An endless stream of shoes from one RNG stream; each shoe is dealt lazily by shoe_cards."""
+    rng = make_rng(seed)
+    while True:
+        yield shoe_cards(num_decks, rng, mode, passes)
+
+class ContinuousShoe:
+    """
+    A shoe that lasts across hands and is reshuffled once the cut card is out.
+
+    Call start_hand() before each hand: it reshuffles when the cut card has
+    been reached (and before the first hand) and returns True when a new shoe
+    began, so callers can reset their counts. The cut must leave at least
+    `reserve` cards behind it (by default one player hand and the dealer's at
+    their longest), so a hand started before the cut cannot run the shoe dry.
+    Should it happen anyway, deal() moves on to the next shoe and calls
+    on_shuffle first, so the caller can reset its count and log the shuffle.
+    """
+
+    def __init__(self, num_decks: int = 6, penetration: float = 0.75, seed: SeedLike = None,
+                 mode: str = RIFFLE, passes: int = 5, reserve: int = CLASSIC_RULES.max_cards_per_round):
+        self.num_decks = num_decks
+        self.size = 52 * num_decks
+        self.cut = int(self.size * penetration)
+        if not 0 < penetration <= 1 or self.size - self.cut < reserve:
+            raise ValueError(f"Penetration {penetration} must leave at least {reserve} cards "
+                             f"behind the cut card of a {num_decks}-deck shoe")
+        self._shoes = stream_shoes(num_decks, seed, mode, passes)
+        self._cards = iter(())
+        self.dealt = self.size
+        self.shoe_number = 0
+        self.on_shuffle: Optional[Callable[[], None]] = None
+
+    def shuffle(self) -> None:
+        self._cards = next(self._shoes)
+        self.dealt = 0
+        self.shoe_number += 1
+
+    @property
+    def needs_shuffle(self) -> bool:
+        return self.dealt >= self.cut
+
+    @property
+    def remaining(self) -> int:
+        return self.size - self.dealt
+
+    def start_hand(self) -> bool:
+        if self.needs_shuffle:
+            self.shuffle()
+            return True
+        return False
+
+    def deal(self) -> tuple:
+        if self.dealt >= self.size:
+            self.shuffle()
+            if self.on_shuffle:
+                self.on_shuffle()
+        self.dealt += 1
+        return next(self._cards)
+
+    def undealt(self) -> List[tuple]:
+        """The cards left in the current shoe in deal order (a lazily shuffled shoe is shuffled out)."""
+        rest = list(self._cards)
+        self._cards = iter(rest)
+        return rest
+
+    def resume(self, cards: Sequence[tuple], dealt: int) -> None:
+        """Deal `cards` next, as the rest of a shoe that has already dealt `dealt` cards."""
+        self._cards = iter(cards)
+        self.dealt = dealt
+
+    def __iter__(self) -> Iterator[tuple]:
+        """Deal cards forever, moving through shoe after shoe."""
+        while True:
+            yield self.deal()
+
+def _legacy_shuffle(deck, rng):
+    """The original pop(0)-based riffle, kept only as the benchmark reference."""
     half1 = deck[:len(deck) // 2]
     half2 = deck[len(deck) // 2:]
-    
     shuffled = []
     while half1 or half2:
         if half1 and (not half2 or rng.random() > 0.5):
             shuffled.append(half1.pop(0))
         if half2 and (not half1 or rng.random() > 0.5):
             shuffled.append(half2.pop(0))
-    
     return shuffled
 
-def shuffle_all_decks(all_decks: List[Card], num_shuffles: int = 5) -> List[Card]:
-    """Perform multiple shuffles on the combined decks."""
-    deck = all_decks.copy()
-    rng = random.Random()
-    rng.seed()
+def benchmark(num_decks: int = 8, num_shuffles: int = 5, repeats: int = 200, seed: int = 0) -> dict:
+    """
+    Time the legacy riffle against each shuffle engine mode on a num_decks shoe.
+
+    Returns shoes-per-second for every implementation and checks that the new
+    riffle reproduces the legacy order for the same seed.
+    """
+    shoe = [card for _ in range(num_decks) for card in generate_deck()]
+    results = {}
 
-    for _ in range(num_shuffles):
-        deck = shuffle(deck, rng)
-    
-    return deck
+    def run(label, fn):
+        start = time.perf_counter()
+        for r in range(repeats):
+            fn(seed + r)
+        elapsed = time.perf_counter() - start
+        results[label] = repeats / elapsed if elapsed else float('inf')
+
+    def legacy(s):
+        rng = random.Random(s)
+        deck = shoe
+        for _ in range(num_shuffles):
+            deck = _legacy_shuffle(deck, rng)
+        return deck
+
+    run('legacy_riffle', legacy)
+    for mode in SHUFFLE_MODES:
+        run(mode, lambda s, mode=mode: apply_shuffle(shoe, s, mode, num_shuffles))
+
+    results['riffle_matches_legacy'] = legacy(seed) == apply_shuffle(shoe, seed, RIFFLE, num_shuffles)
+    return results
 
 def main():
     # For demonstration, generate a deck and shuffle it multiple times
@@ -43,11 +265,15 @@ def main():
     print("Original Deck:")
     for card in deck:
         print(card)
-    
+
     shuffled_deck = shuffle_all_decks(deck)
     print("\nShuffled Deck:")
     for card in shuffled_deck:
         print(card)
 
 if __name__ == "__main__":
-    main()
+    if '--bench' in sys.argv:
+        for name, value in benchmark().items():
+            print(f"{name}: {value:.1f} shoes/sec" if isinstance(value, float) else f"{name}: {value}")
+    else:
+        main()
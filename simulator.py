@@ -0,0 +1,330 @@
+"""
+Headless Monte Carlo simulator for mass hand playouts.
+
+Cards come from an array-backed cards.Shoe and are read as their blackjack
+value (2-11, with 11 for an ace); round_engine plays every round under a
+Rules object (H17/S17, peek, blackjack payout, doubles, splits, surrender,
+insurance). Hit/stand strategies are compiled once into a flat decision
+table and StrategyTable strategies are used as they are, so the inner loop
+does no printing and no per-hand allocation.
+
+With several spots per round, every spot bets one unit. Spots share the
+dealer's hand, so their results are correlated: the result reports the
+variance per round alongside the per-hand variance, and the correlation
+between two spots, which is what spreading to more spots trades against the
+extra hands per round.
+"""
+import argparse
+import json
+import math
+import time
+from dataclasses import dataclass, asdict, replace
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from shuffling_deck import RIFFLE, SeedLike, make_rng
+from blackjack import recommend_hilo_action
+from cards import Shoe
+from event_log import EventLog
+from round_engine import RoundEngine
+from rules import CLASSIC_RULES, DEFAULT_RULES, Rules
+from strategy import HIT, STAND, StrategyTable, default_strategy, load_strategy
+
+# True-count buckets the decision table is built for (true count is floored)
+MIN_TC = -10
+MAX_TC = 10
+
+# (total, soft, dealer_up_value, true_count) -> True to hit
+Strategy = Callable[[int, bool, int, int], bool]
+AnyStrategy = Union[Strategy, StrategyTable]
+
+@dataclass
+class SimulationResult:
+    strategy: str
+    hands: int
+    wins: int
+    losses: int
+    pushes: int
+    net: float
+    net_sq: float
+    shoes: int
+    num_decks: int
+    penetration: float
+    seed: Optional[int]
+    elapsed: float
+    rules: Optional[Rules] = None
+    # Player spots per round; hands counts every spot's hand
+    spots: int = 1
+    rounds: int = 0
+    round_net_sq: float = 0.0
+
+    @property
+    def ev(self) -> float:
+        """Mean units won per hand."""
+        return self.net / self.hands if self.hands else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Per-hand variance of the units won."""
+        if not self.hands:
+            return 0.0
+        return self.net_sq / self.hands - self.ev ** 2
+
+    @property
+    def std_error(self) -> float:
+        return (self.variance / self.hands) ** 0.5 if self.hands else 0.0
+
+    @property
+    def round_ev(self) -> float:
+        """Mean units won per round, across all spots."""
+        return self.net / self.rounds if self.rounds else 0.0
+
+    @property
+    def round_variance(self) -> float:
+        """Per-round variance of the units won across all spots."""
+        if not self.rounds:
+            return 0.0
+        return self.round_net_sq / self.rounds - self.round_ev ** 2
+
+    @property
+    def spot_correlation(self) -> float:
+        """Correlation between the results of two spots in the same round."""
+        if self.spots < 2 or not self.variance:
+            return 0.0
+        spots = self.spots
+        covariance = (self.round_variance - spots * self.variance) / (spots * (spots - 1))
+        return covariance / self.variance
+
+    @property
+    def hands_per_sec(self) -> float:
+        return self.hands / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.update(ev=self.ev, variance=self.variance, std_error=self.std_error,
+                    hands_per_sec=self.hands_per_sec, round_ev=self.round_ev,
+                    round_variance=self.round_variance, spot_correlation=self.spot_correlation)
+        return data
+
+def _rank_for_value(value: int) -> str:
+    return 'A' if value == 11 else str(value)
+
+def hand_for(total: int, soft: bool) -> List[tuple]:
+    """Build a representative hand of (rank, suit) tuples with the given total."""
+    if soft:
+        rest = total - 11
+        return [('A', ''), ('A' if rest == 1 else str(rest), '')]
+    if total <= 11:
+        return [(str(total - 2), ''), ('2', '')]
+    if total <= 20:
+        return [('10', ''), (str(total - 10), '')]
+    return [('10', ''), ('9', ''), ('2', '')]
+
+def hilo_strategy(total: int, soft: bool, up: int, tc: int) -> bool:
+    """The assistant's own Hi-Lo recommendation, restricted to hit/stand."""
+    hand = hand_for(total, soft)
+    return recommend_hilo_action(hand, [(_rank_for_value(up), '')], tc, 1,
+                                 can_double=False, can_split=False, can_surrender=False) == "Hit"
+
+def basic_strategy(total: int, soft: bool, up: int, tc: int) -> bool:
+    """Hit/stand basic strategy for a game without doubles or splits."""
+    if soft:
+        return total <= 17 or (total == 18 and up >= 9)
+    if total >= 17:
+        return False
+    if total >= 13:
+        return up >= 7
+    if total == 12:
+        return not 4 <= up <= 6
+    return True
+
+def mimic_dealer_strategy(total: int, soft: bool, up: int, tc: int) -> bool:
+    return total < 17
+
+def never_bust_strategy(total: int, soft: bool, up: int, tc: int) -> bool:
+    return total <= 11 or (soft and total < 17)
+
+STRATEGIES: Dict[str, AnyStrategy] = {
+    'hilo': hilo_strategy,
+    'basic': basic_strategy,
+    'mimic_dealer': mimic_dealer_strategy,
+    'never_bust': never_bust_strategy,
+    # Full charts with doubles, splits and surrender
+    'hilo_table': default_strategy(),
+    'basic_table': load_strategy(deviation_paths=()),
+}
+
+def build_decision_table(strategy: Strategy) -> List[bool]:
+    """
+    Evaluate a strategy once for every reachable state.
+
+    The result is indexed by ((tc - MIN_TC) * 2 + soft) * 22 + total) * 12 + up.
+    """
+    table = [False] * ((MAX_TC - MIN_TC + 1) * 2 * 22 * 12)
+    for tc in range(MIN_TC, MAX_TC + 1):
+        for soft in (0, 1):
+            for total in range(12 if soft else 4, 22):
+                for up in range(2, 12):
+                    index = (((tc - MIN_TC) * 2 + soft) * 22 + total) * 12 + up
+                    table[index] = bool(strategy(total, bool(soft), up, tc))
+    return table
+
+class HitStandStrategy:
+    """Present a hit/stand Strategy callable through StrategyTable's interface for RoundEngine."""
+
+    def __init__(self, strategy: Strategy):
+        self.table = build_decision_table(strategy)
+
+    def lookup(self, total: int, soft: bool, pair: int, up: int, tc: float,
+               can_double: bool = True, can_split: bool = True, can_surrender: bool = True) -> int:
+        tc = math.floor(tc)
+        if tc < MIN_TC:
+            tc = MIN_TC
+        elif tc > MAX_TC:
+            tc = MAX_TC
+        return HIT if self.table[(((tc - MIN_TC) * 2 + soft) * 22 + total) * 12 + up] else STAND
+
+    def take_insurance(self, tc: float) -> bool:
+        return False
+
+def simulate(strategy: AnyStrategy = hilo_strategy, hands: int = 1_000_000, num_decks: Optional[int] = None,
+             penetration: Optional[float] = None, seed: SeedLike = None, num_shuffles: int = 5,
+             shuffle_mode: str = RIFFLE, name: Optional[str] = None,
+             event_log: Optional[EventLog] = None, rules: Optional[Rules] = None,
+             spots: int = 1) -> SimulationResult:
+    """
+    Play `hands` hands of `strategy` through consecutive shoes under `rules`,
+    `spots` hands per round (the last round may go past `hands` by up to
+    spots - 1). A round only starts while the shoe holds enough cards for
+    the longest possible round, so with many spots the shoe ends before the
+    cut card.
+
+    `strategy` is a hit/stand Strategy callable or a StrategyTable (which also
+    doubles, splits, surrenders and takes insurance). `num_decks` and
+    `penetration`, when given, override the rules. Each shoe is reshuffled
+    once the cut card comes out. The same seed always replays the same shoes,
+    so strategies can be compared on common random numbers. Pass an EventLog
+    to record every round (one-spot rounds only).
+    """
+    if spots < 1:
+        raise ValueError(f"spots must be at least 1, got {spots}")
+    if event_log is not None and spots > 1:
+        raise ValueError("Event logs record one player hand per round; simulate with spots=1")
+    rules = rules or DEFAULT_RULES
+    if num_decks is not None or penetration is not None:
+        rules = replace(rules, num_decks=rules.num_decks if num_decks is None else num_decks,
+                        penetration=rules.penetration if penetration is None else penetration)
+    rng = make_rng(seed)
+    engine = RoundEngine(rules, strategy if hasattr(strategy, 'lookup') else HitStandStrategy(strategy))
+    engine.record = event_log is not None
+    engine.reserve(spots)
+    play_round = engine.play_round
+    spot_nets = engine.spot_nets
+    source = Shoe(rules.num_decks, rules.penetration)
+    cut = min(source.cut, len(source) - rules.max_cards_for(spots))
+    if cut <= 0:
+        raise ValueError(f"A {rules.num_decks}-deck shoe cannot be guaranteed to last a round of {spots} spots")
+
+    played = wins = losses = pushes = shoes = rounds = 0
+    net = net_sq = round_net_sq = 0.0
+    start = time.perf_counter()
+
+    while played < hands:
+        source.shuffle(rng, shuffle_mode, num_shuffles)
+        engine.new_shoe(source.values())
+        raw = source.cards
+        shoes += 1
+        if event_log is not None:
+            event_log.shuffle(rules.num_decks)
+        while engine.pos < cut and played < hands:
+            outcome = play_round(1.0, spots)
+            rounds += 1
+            net += outcome
+            round_net_sq += outcome * outcome
+            for spot_net in spot_nets:
+                played += 1
+                if spot_net > 0:
+                    wins += 1
+                elif spot_net < 0:
+                    losses += 1
+                else:
+                    pushes += 1
+                net_sq += spot_net * spot_net
+            if event_log is not None:
+                first, player_end = engine.first, engine.player_end
+                event_log.hand_record(
+                    [raw[first], raw[first + 2]] + list(raw[first + 4:player_end]),
+                    [raw[first + 1], raw[first + 3]] + list(raw[player_end:engine.pos]),
+                    engine.actions,
+                    outcome,
+                )
+
+    elapsed = time.perf_counter() - start
+    return SimulationResult(
+        strategy=name or getattr(strategy, '__name__', 'custom'),
+        hands=played, wins=wins, losses=losses, pushes=pushes, net=net, net_sq=net_sq,
+        shoes=shoes, num_decks=rules.num_decks, penetration=rules.penetration,
+        seed=seed if isinstance(seed, int) else None, elapsed=elapsed, rules=rules,
+        spots=spots, rounds=rounds, round_net_sq=round_net_sq,
+    )
+
+def merge_results(results: List[SimulationResult], name: Optional[str] = None) -> SimulationResult:
+    """Combine shard results into one aggregate; counts and sums add exactly."""
+    first = results[0]
+    return SimulationResult(
+        strategy=name or first.strategy,
+        hands=sum(r.hands for r in results),
+        wins=sum(r.wins for r in results),
+        losses=sum(r.losses for r in results),
+        pushes=sum(r.pushes for r in results),
+        net=sum(r.net for r in results),
+        net_sq=sum(r.net_sq for r in results),
+        shoes=sum(r.shoes for r in results),
+        num_decks=first.num_decks,
+        penetration=first.penetration,
+        seed=None,
+        elapsed=sum(r.elapsed for r in results),
+        rules=first.rules,
+        spots=first.spots,
+        rounds=sum(r.rounds for r in results),
+        round_net_sq=sum(r.round_net_sq for r in results),
+    )
+
+def compare(strategies: Dict[str, AnyStrategy], **kwargs) -> Dict[str, SimulationResult]:
+    """Run every strategy on the same seeded shoes and return results by name."""
+    return {name: simulate(strategy, name=name, **kwargs) for name, strategy in strategies.items()}
+
+def compare_spots(strategy: AnyStrategy, spot_counts: Sequence[int], **kwargs) -> Dict[int, SimulationResult]:
+    """Run one strategy on the same seeded shoes at every spot count and return results by spot count."""
+    return {spots: simulate(strategy, spots=spots, **kwargs) for spots in spot_counts}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless blackjack Monte Carlo simulator")
+    parser.add_argument('--hands', type=int, default=1_000_000)
+    parser.add_argument('--decks', type=int, default=6)
+    parser.add_argument('--penetration', type=float, default=0.75)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), action='append',
+                        help="Strategy to simulate (repeatable, default: all)")
+    parser.add_argument('--classic', action='store_true',
+                        help="Play the hit/stand game of play_blackjack instead of full casino rules")
+    parser.add_argument('--h17', action='store_true', help="Dealer hits soft 17")
+    parser.add_argument('--payout', type=float, help="Blackjack payout (default 1.5, 1.0 with --classic)")
+    parser.add_argument('--spots', type=int, nargs='+', default=[1],
+                        help="Player spots per round; several counts compare spreading on the same shoes")
+    args = parser.parse_args(argv)
+
+    rules = CLASSIC_RULES if args.classic else DEFAULT_RULES
+    rules = replace(rules, hit_soft_17=args.h17,
+                    blackjack_payout=rules.blackjack_payout if args.payout is None else args.payout)
+    names = args.strategy or sorted(STRATEGIES)
+    kwargs = dict(hands=args.hands, num_decks=args.decks, penetration=args.penetration, seed=args.seed, rules=rules)
+    if args.spots == [1]:
+        results = compare({name: STRATEGIES[name] for name in names}, **kwargs)
+        print(json.dumps({name: result.to_dict() for name, result in results.items()}, indent=2))
+        return
+    spread = {name: compare_spots(STRATEGIES[name], args.spots, name=name, **kwargs) for name in names}
+    print(json.dumps({name: {str(spots): result.to_dict() for spots, result in by_spots.items()}
+                      for name, by_spots in spread.items()}, indent=2))
+
+if __name__ == "__main__":
+    main()
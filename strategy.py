@@ -0,0 +1,200 @@
+"""
+Table-driven playing strategy with true-count deviations.
+
+Every decision is precomputed into one dense byte table indexed by hand kind
+(hard, soft or pair), player total (or pair card value), dealer upcard value
+and floored true-count bucket, so a lookup is a few integer operations with
+no string handling. Each cell packs the preferred action in its low three
+bits and the action to fall back to, when the preferred one is not allowed,
+in the next three.
+
+The base chart and the count deviations are loaded from CSV files; the
+defaults in data/ are multi-deck basic strategy and the Hi-Lo Illustrious 18
+plus Fab 4 surrender indices.
+"""
+import csv
+import math
+import os
+from functools import lru_cache
+from typing import Iterable, Optional
+
+HIT, STAND, DOUBLE, SPLIT, SURRENDER = range(5)
+NONE = 7
+ACTION_NAMES = ("Hit", "Stand", "Double", "Split", "Surrender")
+
+HARD, SOFT, PAIR = range(3)
+KINDS = {'hard': HARD, 'soft': SOFT, 'pair': PAIR}
+
+MIN_TC = -10
+MAX_TC = 10
+TC_BUCKETS = MAX_TC - MIN_TC + 1
+
+UPCARD_COLUMNS = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'A')
+
+# Chart code -> (preferred action, fallback action)
+CODES = {
+    'H': (HIT, HIT),
+    'S': (STAND, STAND),
+    'D': (DOUBLE, HIT),
+    'DS': (DOUBLE, STAND),
+    'P': (SPLIT, NONE),
+    'R': (SURRENDER, HIT),
+    'RS': (SURRENDER, STAND),
+    '-': (NONE, NONE),
+}
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DEFAULT_CHART = os.path.join(DATA_DIR, 'basic_strategy.csv')
+DEFAULT_DEVIATIONS = os.path.join(DATA_DIR, 'illustrious18.csv')
+
+def _cell(code: str) -> int:
+    try:
+        preferred, fallback = CODES[code.strip().upper()]
+    except KeyError:
+        raise ValueError(f"Unknown strategy code: {code!r}") from None
+    return preferred | (fallback << 3)
+
+def _totals(spec: str) -> range:
+    low, _, high = spec.partition('-')
+    return range(int(low), int(high or low) + 1)
+
+def parse_upcard(spec: str) -> int:
+    """Dealer upcard value from a CSV cell such as '7', 'A' or '11'."""
+    spec = spec.strip().upper()
+    return 11 if spec in ('A', '11') else int(spec)
+
+def csv_rows(path: str) -> Iterable[dict]:
+    """Rows of a strategy or deviation CSV, skipping '#' comment lines."""
+    with open(path, newline='') as f:
+        yield from csv.DictReader(line for line in f if not line.startswith('#'))
+
+def _index(kind: int, total: int, up: int, bucket: int) -> int:
+    return ((kind * 22 + total) * 12 + up) * TC_BUCKETS + bucket
+
+class StrategyTable:
+    """A complete strategy: base chart plus count deviations, in one byte table."""
+
+    def __init__(self):
+        self.table = bytearray([STAND | (STAND << 3)]) * (3 * 22 * 12 * TC_BUCKETS)
+        for total in range(2, 12):
+            for up in range(2, 12):
+                self._fill(PAIR, total, up, range(TC_BUCKETS), NONE | (NONE << 3))
+        self.insurance_index: Optional[int] = None
+
+    @classmethod
+    def from_buffer(cls, table, insurance_index: Optional[int] = None) -> 'StrategyTable':
+        """Wrap an already built table, e.g. a memory-mapped cache, without copying it."""
+        strategy = cls.__new__(cls)
+        strategy.table = table
+        strategy.insurance_index = insurance_index
+        return strategy
+
+    def _fill(self, kind, total, up, buckets, cell):
+        for bucket in buckets:
+            self.table[_index(kind, total, up, bucket)] = cell
+
+    def load_chart(self, path: str) -> 'StrategyTable':
+        """Load a base chart with columns kind,total,2,...,10,A; totals may be ranges like 17-21."""
+        for row in csv_rows(path):
+            kind = KINDS[row['kind'].strip().lower()]
+            for total in _totals(row['total']):
+                for column in UPCARD_COLUMNS:
+                    self._fill(kind, total, parse_upcard(column), range(TC_BUCKETS), _cell(row[column]))
+        return self
+
+    def load_deviations(self, path: str) -> 'StrategyTable':
+        """Load count deviations with columns kind,total,upcard,index,direction,action."""
+        for row in csv_rows(path):
+            kind_name = row['kind'].strip().lower()
+            index = int(row['index'])
+            if kind_name == 'insurance':
+                self.insurance_index = index
+                continue
+            self.add_deviation(KINDS[kind_name], int(row['total']), parse_upcard(row['upcard']),
+                               index, row['direction'].strip(), row['action'])
+        return self
+
+    def add_deviation(self, kind: int, total: int, up: int, index: int, direction: str, code: str) -> None:
+        """Play `code` whenever the true count is at or above (>=) or below (<) `index`."""
+        if direction == '>=':
+            buckets = range(max(index - MIN_TC, 0), TC_BUCKETS)
+        elif direction == '<':
+            buckets = range(0, min(max(index - MIN_TC, 0), TC_BUCKETS))
+        else:
+            raise ValueError(f"Unknown deviation direction: {direction!r}")
+        self._fill(kind, total, up, buckets, _cell(code))
+
+    def lookup(self, total: int, soft: bool, pair: int, up: int, tc: float,
+               can_double: bool = True, can_split: bool = True, can_surrender: bool = True) -> int:
+        """
+        Return the action code for a hand.
+
+        `pair` is the value of the paired card (0 when the hand is not a pair)
+        and `up` is the dealer upcard value, 11 for an ace.
+        """
+        bucket = math.floor(tc) - MIN_TC
+        if bucket < 0:
+            bucket = 0
+        elif bucket >= TC_BUCKETS:
+            bucket = TC_BUCKETS - 1
+        table = self.table
+        if pair and can_split:
+            if table[_index(PAIR, pair, up, bucket)] & 7 == SPLIT:
+                return SPLIT
+        cell = table[_index(SOFT if soft else HARD, total, up, bucket)]
+        action = cell & 7
+        if (action == DOUBLE and not can_double) or (action == SURRENDER and not can_surrender):
+            action = cell >> 3
+        return action
+
+    def cell(self, kind: int, total: int, up: int, tc: float = 0) -> tuple:
+        """The (preferred, fallback) actions stored for one chart cell at a true count."""
+        bucket = min(max(math.floor(tc) - MIN_TC, 0), TC_BUCKETS - 1)
+        cell = self.table[_index(kind, total, up, bucket)]
+        return cell & 7, cell >> 3
+
+    def take_insurance(self, tc: float) -> bool:
+        return self.insurance_index is not None and tc >= self.insurance_index
+
+def load_strategy(chart_path: str = DEFAULT_CHART, deviation_paths: Iterable[str] = (DEFAULT_DEVIATIONS,)) -> StrategyTable:
+    """Build a StrategyTable from a chart file and any number of deviation files, applied in order."""
+    table = StrategyTable().load_chart(chart_path)
+    for path in deviation_paths:
+        table.load_deviations(path)
+    return table
+
+# Deviation files behind default_strategy(); swap them with use_deviations()
+_deviation_paths = (DEFAULT_DEVIATIONS,)
+# A prebuilt table that replaces the CSV files entirely; see use_strategy()
+_installed: Optional[StrategyTable] = None
+
+@lru_cache(maxsize=None)
+def default_strategy() -> StrategyTable:
+    """The shared basic strategy + deviations table (Illustrious 18 unless replaced), loaded once."""
+    if _installed is not None:
+        return _installed
+    return load_strategy(deviation_paths=_deviation_paths)
+
+def deviation_paths() -> tuple:
+    """The deviation files default_strategy() is built from."""
+    return _deviation_paths
+
+def use_strategy(table: Optional[StrategyTable]) -> None:
+    """Make default_strategy() return `table` (None goes back to the CSV files). Call it at startup."""
+    global _installed
+    _installed = table
+    default_strategy.cache_clear()
+
+def use_deviations(paths: Iterable[str]) -> None:
+    """
+    Make default_strategy() load these deviation files instead, e.g. indices
+    found by deviation_optimizer.py. Call it at startup, before the table is
+    first used: tables already handed out keep their old deviations.
+    """
+    global _deviation_paths, _installed
+    paths = tuple(paths)
+    # Fail now rather than on the first recommendation
+    load_strategy(deviation_paths=paths)
+    _deviation_paths = paths
+    _installed = None
+    default_strategy.cache_clear()
@@ -0,0 +1,270 @@
+"""
+Versioned on-disk cache of solved strategy tables and dealer probabilities.
+
+Solving a basic-strategy chart with ev_solver takes seconds, too long to do
+each time a front end starts. A cache file holds, for one rules
+configuration and deck count:
+
+- the full-shoe dealer final-total distribution for every upcard;
+- the complete StrategyTable byte table: the solved chart plus the count
+  deviations, ready for lookups;
+- the deviation indices themselves and the insurance index.
+
+Files are plain fixed-layout binary, so loading one is an mmap and a header
+check and lookups read straight from the mapping. Each file is named after
+a digest of the format version, the rules (penetration aside, which does
+not change the chart) and the contents of the chart and deviation CSVs, so
+changing any of them selects a different file and a stale one is never
+read. Build caches ahead of time with `python strategy_cache.py build`.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ev_solver import HARD_HANDS, PAIR_HANDS, SOFT_HANDS, dealer_distribution, full_shoe, remove, solve
+from rules import CLASSIC_RULES, DEFAULT_RULES, Rules
+from strategy import (ACTION_NAMES, DEFAULT_CHART, DOUBLE, HIT, KINDS, MIN_TC, NONE, SPLIT, STAND, SURRENDER,
+                      StrategyTable, csv_rows, deviation_paths, parse_upcard)
+
+FORMAT_VERSION = 1
+MAGIC = b'BJSC'
+CACHE_DIR = os.environ.get('BLACKJACK_CACHE_DIR',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache'))
+
+# magic, format version, reserved, key digest, insurance index, then offset/size pairs for
+# the key JSON, dealer distributions, strategy table and deviation records
+HEADER = struct.Struct('<4sHH32si7I')
+# kind, total, upcard, index, direction (0 for >=, 1 for <), chart code
+DEVIATION = struct.Struct('<BBBbB2s')
+NO_INSURANCE = -(2 ** 31)
+UPCARDS = range(2, 12)
+# Dealer outcome slots per upcard: 17-21 and bust
+DEALER_SLOTS = 6
+
+# (preferred, fallback) -> chart code, the inverse of strategy.CODES
+_CODE_NAMES = {
+    (HIT, HIT): 'H', (STAND, STAND): 'S', (DOUBLE, HIT): 'D', (DOUBLE, STAND): 'DS',
+    (SPLIT, NONE): 'P', (SURRENDER, HIT): 'R', (SURRENDER, STAND): 'RS', (NONE, NONE): '-',
+}
+
+def _file_digest(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def cache_key(rules: Rules, chart_path: str = DEFAULT_CHART, deviation_files: Optional[Sequence[str]] = None) -> dict:
+    """Everything a cache file depends on; any change gives a different file."""
+    deviation_files = deviation_paths() if deviation_files is None else tuple(deviation_files)
+    rule_fields = asdict(rules)
+    rule_fields.pop('penetration')
+    return {
+        'version': FORMAT_VERSION,
+        'rules': rule_fields,
+        'chart': _file_digest(chart_path),
+        'deviations': [_file_digest(path) for path in deviation_files],
+    }
+
+def key_digest(key: dict) -> bytes:
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).digest()
+
+def cache_path(key: dict, cache_dir: str = CACHE_DIR) -> str:
+    rules = key['rules']
+    dealer = 'h17' if rules['hit_soft_17'] else 's17'
+    return os.path.join(cache_dir, f"{rules['num_decks']}d-{dealer}-{key_digest(key).hex()[:16]}.bjc")
+
+def _chart_code(evs: Dict[str, float], pair_row: bool) -> str:
+    if pair_row:
+        return 'P' if max(evs, key=evs.get) == "Split" else '-'
+    evs.pop("Split", None)
+    preferred = ACTION_NAMES.index(max(evs, key=evs.get))
+    fallback = HIT if evs.get("Hit", -2.0) > evs["Stand"] else STAND
+    return _CODE_NAMES[(preferred, fallback if preferred in (DOUBLE, SURRENDER) else preferred)]
+
+def solve_strategy(rules: Rules, chart_path: str = DEFAULT_CHART,
+                   deviation_files: Sequence[str] = ()) -> StrategyTable:
+    """
+    The chart solved by ev_solver for a full shoe under `rules`, with the
+    deviation files applied on top. Rows the solver has no representative
+    hand for (hard 4 and 21, soft 12 and 21) keep their values from chart_path.
+    """
+    table = StrategyTable().load_chart(chart_path)
+    comp = full_shoe(rules.num_decks)
+    rows = [('hard', t, h) for t, h in HARD_HANDS.items()]
+    rows += [('soft', t, h) for t, h in SOFT_HANDS.items()]
+    rows += [('pair', v, h) for v, h in PAIR_HANDS.items()]
+    for kind, total, hand in rows:
+        for up in UPCARDS:
+            evs = solve(hand, up, remove(comp, hand + (up,)), rules.hit_soft_17, rules.dealer_peek,
+                        rules.double_after_split)
+            if not rules.surrender:
+                evs.pop("Surrender")
+            if rules.max_hands < 2:
+                evs.pop("Split", None)
+            if not rules.can_double(total if kind != 'pair' else 2 * hand[0]):
+                evs.pop("Double")
+            table.add_deviation(KINDS[kind], total, up, MIN_TC, '>=', _chart_code(evs, kind == 'pair'))
+    for path in deviation_files:
+        table.load_deviations(path)
+    return table
+
+def build(rules: Rules, chart_path: str = DEFAULT_CHART, deviation_files: Optional[Sequence[str]] = None) -> bytes:
+    """The complete contents of a cache file."""
+    deviation_files = deviation_paths() if deviation_files is None else tuple(deviation_files)
+    key = cache_key(rules, chart_path, deviation_files)
+    key_bytes = json.dumps(key, sort_keys=True).encode()
+
+    dealer = []
+    for up in UPCARDS:
+        dealer.extend(dealer_distribution(up, remove(full_shoe(rules.num_decks), (up,)),
+                                          rules.hit_soft_17, rules.dealer_peek))
+    dealer_bytes = struct.pack(f'<{len(dealer)}d', *dealer)
+
+    table = solve_strategy(rules, chart_path, deviation_files)
+    deviations = []
+    for path in deviation_files:
+        for row in csv_rows(path):
+            kind = row['kind'].strip().lower()
+            if kind == 'insurance':
+                continue
+            deviations.append(DEVIATION.pack(KINDS[kind], int(row['total']), parse_upcard(row['upcard']),
+                                             int(row['index']), 0 if row['direction'].strip() == '>=' else 1,
+                                             row['action'].strip().upper().encode()))
+    deviation_bytes = b''.join(deviations)
+
+    # Sections follow the header, the dealer doubles 8-byte aligned
+    key_offset = HEADER.size
+    dealer_offset = -(-(key_offset + len(key_bytes)) // 8) * 8
+    table_offset = dealer_offset + len(dealer_bytes)
+    deviation_offset = table_offset + len(table.table)
+    insurance = NO_INSURANCE if table.insurance_index is None else table.insurance_index
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, key_digest(key), insurance,
+                         key_offset, len(key_bytes), dealer_offset, table_offset, len(table.table),
+                         deviation_offset, len(deviations))
+    padding = b'\0' * (dealer_offset - key_offset - len(key_bytes))
+    return header + key_bytes + padding + dealer_bytes + bytes(table.table) + deviation_bytes
+
+def write_cache(rules: Rules, cache_dir: str = CACHE_DIR, chart_path: str = DEFAULT_CHART,
+                deviation_files: Optional[Sequence[str]] = None) -> str:
+    """Build the cache for `rules` and write it atomically; returns its path."""
+    path = cache_path(cache_key(rules, chart_path, deviation_files), cache_dir)
+    data = build(rules, chart_path, deviation_files)
+    os.makedirs(cache_dir, exist_ok=True)
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, 'wb') as f:
+        f.write(data)
+    os.replace(partial, path)
+    return path
+
+class StrategyCache:
+    """A memory-mapped cache file; keep it open for as long as its strategy() is in use."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            self._map.close()
+            raise ValueError(f"{path}: not a strategy cache")
+        (magic, version, _, self.digest, insurance, key_offset, key_size, self._dealer_offset,
+         self._table_offset, self._table_size, self._deviation_offset, self._deviation_count
+         ) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{path}: not a version {FORMAT_VERSION} strategy cache")
+        self.insurance_index = None if insurance == NO_INSURANCE else insurance
+        self.key = json.loads(self._map[key_offset:key_offset + key_size])
+
+    def dealer_distribution(self, up: int) -> Tuple[float, ...]:
+        """Full-shoe probabilities of the dealer finishing on 17-21 or busting with upcard `up`."""
+        return struct.unpack_from(f'<{DEALER_SLOTS}d', self._map,
+                                  self._dealer_offset + (up - 2) * DEALER_SLOTS * 8)
+
+    def strategy(self) -> StrategyTable:
+        """A read-only StrategyTable backed by the mapping."""
+        view = memoryview(self._map)[self._table_offset:self._table_offset + self._table_size]
+        return StrategyTable.from_buffer(view, self.insurance_index)
+
+    def deviations(self) -> List[dict]:
+        rows = []
+        for k in range(self._deviation_count):
+            kind, total, up, index, direction, code = DEVIATION.unpack_from(
+                self._map, self._deviation_offset + k * DEVIATION.size)
+            rows.append({'kind': ('hard', 'soft', 'pair')[kind], 'total': total, 'upcard': up, 'index': index,
+                         'direction': ('>=', '<')[direction], 'action': code.rstrip(b'\0').decode()})
+        return rows
+
+    def close(self) -> None:
+        self._map.close()
+
+def load_cache(rules: Rules = DEFAULT_RULES, cache_dir: str = CACHE_DIR, chart_path: str = DEFAULT_CHART,
+               deviation_files: Optional[Sequence[str]] = None) -> Optional[StrategyCache]:
+    """The cache for these rules and strategy files, or None if it has not been built."""
+    key = cache_key(rules, chart_path, deviation_files)
+    path = cache_path(key, cache_dir)
+    try:
+        cache = StrategyCache(path)
+    except (OSError, ValueError):
+        return None
+    if cache.digest != key_digest(key):
+        cache.close()
+        return None
+    return cache
+
+def load_or_build(rules: Rules = DEFAULT_RULES, cache_dir: str = CACHE_DIR, chart_path: str = DEFAULT_CHART,
+                  deviation_files: Optional[Sequence[str]] = None) -> StrategyCache:
+    cache = load_cache(rules, cache_dir, chart_path, deviation_files)
+    if cache is None:
+        cache = StrategyCache(write_cache(rules, cache_dir, chart_path, deviation_files))
+    return cache
+
+def _build_one(args) -> Tuple[str, float]:
+    rules, cache_dir, chart_path, deviation_files = args
+    start = time.perf_counter()
+    path = write_cache(rules, cache_dir, chart_path, deviation_files)
+    return path, time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and inspect cached strategy tables")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser('build', help="Solve and cache every combination of the given rules")
+    build_parser.add_argument('--decks', type=int, nargs='+', default=[1, 2, 6, 8])
+    build_parser.add_argument('--dealer', nargs='+', choices=('s17', 'h17'), default=['s17', 'h17'])
+    build_parser.add_argument('--classic', action='store_true',
+                              help="The hit/stand, no-peek game of the console and the GUIs (pyqt_blackjack.py)")
+    build_parser.add_argument('--no-surrender', action='store_true')
+    build_parser.add_argument('--no-das', action='store_true', help="No doubling after splits")
+    build_parser.add_argument('--chart', default=DEFAULT_CHART)
+    build_parser.add_argument('--deviations', nargs='*', help="Deviation CSVs (default: Illustrious 18)")
+    build_parser.add_argument('--dir', default=CACHE_DIR)
+    build_parser.add_argument('--workers', type=int)
+    info_parser = commands.add_parser('info', help="Show what cache files contain")
+    info_parser.add_argument('paths', nargs='+')
+    args = parser.parse_args(argv)
+
+    if args.command == 'info':
+        for path in args.paths:
+            cache = StrategyCache(path)
+            print(json.dumps({'path': path, 'key': cache.key, 'insurance_index': cache.insurance_index,
+                              'deviations': len(cache.deviations()),
+                              'dealer': {up: cache.dealer_distribution(up) for up in UPCARDS}}, indent=2))
+            cache.close()
+        return
+
+    if args.classic:
+        base = CLASSIC_RULES
+    else:
+        base = replace(DEFAULT_RULES, surrender=not args.no_surrender, double_after_split=not args.no_das)
+    jobs = [(replace(base, num_decks=decks, hit_soft_17=dealer == 'h17'), args.dir, args.chart, args.deviations)
+            for decks in args.decks for dealer in args.dealer]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for path, elapsed in pool.map(_build_one, jobs):
+            print(f"{path} ({elapsed:.1f}s)")
+
+if __name__ == "__main__":
+    main()
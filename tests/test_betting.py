@@ -0,0 +1,27 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from betting import BetRamp, custom_ramp, flat_ramp, sample_rounds, simulate_bankroll, spread_ramp
+
+def test_ramps():
+    assert flat_ramp(2).bet(5) == 2
+    ramp = spread_ramp((1, 2, 4), start=1)
+    assert [ramp.bet(tc) for tc in (-3, 0.5, 1, 2.9, 3, 10)] == [1, 1, 2, 4, 4, 4]
+    assert ramp.spread == 4
+    assert list(ramp.bets(np.array([0.0, 1.0, 2.0]))) == [1, 2, 4]
+    assert custom_ramp({2: 3}, base=1).bet(2) == 3
+    with pytest.raises(ValueError):
+        BetRamp('bad', (1, 2), (1,))
+
+def test_seeded_samples_and_bankrolls_repeat():
+    samples = sample_rounds(2000, seed=3)
+    again = sample_rounds(2000, seed=3)
+    assert np.array_equal(samples.nets, again.nets)
+    assert np.array_equal(samples.true_counts, again.true_counts)
+    ramp = spread_ramp()
+    first = simulate_bankroll(samples, ramp, bankroll=200, rounds=200, trajectories=100, seed=1)
+    again = simulate_bankroll(samples, ramp, bankroll=200, rounds=200, trajectories=100, seed=1)
+    assert replace(first, elapsed=0) == replace(again, elapsed=0)
+    assert 0 <= first.risk_of_ruin <= 1
@@ -0,0 +1,30 @@
+from cards import CARD_HILO, CARD_VALUE, CARDS_PER_DECK, Shoe, encode, from_tuple, to_tuple, to_tuples
+from counting import SYSTEMS
+from blackjack import values
+from shuffling_deck import generate_deck
+
+def test_every_card_round_trips():
+    for card in range(CARDS_PER_DECK):
+        assert from_tuple(to_tuple(card)) == card
+    deck = generate_deck()
+    encoded = encode(deck)
+    assert to_tuples(encoded) == [(card.rank, card.suit) for card in deck]
+    assert sorted(encoded) == list(range(CARDS_PER_DECK))
+
+def test_value_and_count_tables_agree_with_the_core():
+    hilo = SYSTEMS['hilo']
+    for card in range(CARDS_PER_DECK):
+        rank = to_tuple(card)[0]
+        assert CARD_VALUE[card] == values[rank]
+        assert CARD_HILO[card] == hilo.tags[values[rank] - 2]
+
+def test_seeded_shoe_deals_every_card_once():
+    shoe, again = Shoe(2, 0.5), Shoe(2, 0.5)
+    shoe.shuffle(7)
+    again.shuffle(7)
+    assert shoe.values() == again.values()
+    dealt = [shoe.deal() for _ in range(len(shoe))]
+    assert sorted(dealt) == sorted(list(range(CARDS_PER_DECK)) * 2)
+    assert shoe.remaining == 0 and shoe.needs_shuffle
+    assert bytes(shoe.dealt()) == bytes(dealt)
+    assert bytes(CARD_VALUE[card] for card in dealt) == shoe.values()
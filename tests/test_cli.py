@@ -0,0 +1,21 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _run(*args):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True, env=env,
+                          cwd=ROOT).stdout
+
+def test_core_import_loads_no_console_or_gui():
+    out = _run('-c', "import sys, blackjack; print(sorted(m for m in ('blackjack.console', 'event_log', 'PyQt5', "
+                     "'tkinter', 'numpy') if m in sys.modules))")
+    assert out.strip() == '[]'
+
+def test_advise():
+    out = json.loads(_run('-m', 'blackjack', 'advise', '--player', '8', '8', '--dealer', '6',
+                          '--running-count', '0', '--decks-remaining', '2'))
+    assert (out['action'], out['player_value'], out['true_count']) == ('Split', 16, 0.0)
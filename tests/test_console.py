@@ -0,0 +1,24 @@
+import builtins
+
+import pytest
+
+import blackjack.console as console
+from counting import ShoeTracker
+from shuffling_deck import ContinuousShoe
+
+def test_hole_card_is_counted_only_once_revealed(monkeypatch):
+    odds, advice = [], []
+    real_exact, real_recommend = console.exact, console.recommend_hilo_action
+    monkeypatch.setattr(console, 'exact', lambda up, comp, **kw: odds.append(sum(comp)) or real_exact(up, comp, **kw))
+    monkeypatch.setattr(console, 'recommend_hilo_action',
+                        lambda *args, **kw: advice.append(args[3]) or real_recommend(*args, **kw))
+    for move in ('stand', 'hit'):
+        monkeypatch.setattr(builtins, 'input', lambda prompt='', move=move: move)
+        shoe = ContinuousShoe(1, 0.5, seed=4)
+        tracker = ShoeTracker(1)
+        console.play_blackjack(1, shoe=shoe, tracker=tracker)
+        # Odds and advice both see only the player's cards and the upcard out of the shoe
+        assert odds[-1] == 52 - 3
+        assert advice[0] * 52 == pytest.approx(52 - 3)
+        assert sum(tracker.remaining) == shoe.remaining
+        advice.clear()
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from cards import Shoe
+from count_engine import MultiCounter, card_slots, compare_systems
+from counting import SYSTEMS, CountingSystem, ShoeTracker, get_system, register_system
+
+def test_registry():
+    assert get_system('hilo').balanced and not get_system('ko').balanced
+    with pytest.raises(ValueError):
+        get_system('no-such-count')
+    with pytest.raises(ValueError):
+        register_system(CountingSystem('short', (1, -1)))
+    try:
+        register_system(CountingSystem('test_sevens', (0, 0, 0, 0, 0, 1, 0, 0, 0, 0), side_count=True))
+        tracker = ShoeTracker(1, systems=('test_sevens',))
+        tracker.observe_all(['7', '7', '8'])
+        assert tracker.running_count == 2
+    finally:
+        SYSTEMS.pop('test_sevens', None)
+
+def test_multi_counter_matches_the_tracker():
+    shoe = Shoe(6)
+    shoe.shuffle(2)
+    dealt = shoe.cards.tobytes()[:200]
+    counter = MultiCounter(num_decks=6)
+    stream = counter.stream(card_slots(dealt))
+    counter.update(card_slots(dealt))
+    tracker = ShoeTracker(6, systems=counter.systems)
+    for card in dealt:
+        tracker.observe_byte(card)
+    assert counter.counts.tolist() == tracker.counts
+    assert stream[-1].tolist() == tracker.counts
+    assert counter.remaining.tolist() == tracker.remaining
+    assert np.allclose(counter.true_counts(), [tracker.true_count(name) for name in counter.systems])
+
+def test_seeded_comparison_repeats():
+    first = compare_systems(['hilo', 'ko'], shoes=20, seed=4)
+    assert first == compare_systems(['hilo', 'ko'], shoes=20, seed=4)
+    assert first['hilo']['edge_correlation'] > 0.5
@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from cards import CARD_TUPLES, Shoe
+from counting import ShoeTracker
+from shuffling_deck import DECK_TUPLES
+
+def test_hand_counted_sequence():
+    tracker = ShoeTracker(2, systems=('hilo', 'ko'))
+    tracker.observe_all([('2', 'Hearts'), ('K', 'Spades'), ('5', 'Clubs'), ('7', 'Clubs'), ('A', 'Hearts'), '6'])
+    # Hi-Lo +1 -1 +1 0 -1 +1; KO also counts the 7 and starts at -4 for a second deck
+    assert tracker.counts == [1, -4 + 2]
+    assert tracker.cards_remaining == 104 - 6
+    assert tracker.decks_remaining == pytest.approx(98 / 52)
+    assert tracker.true_count() == pytest.approx(1 / (98 / 52))
+    assert tracker.true_count('ko') == pytest.approx(-2 / (98 / 52))
+    assert tracker.remaining == [7, 8, 8, 7, 7, 7, 8, 8, 31, 7]
+
+def test_full_shoe_counts_back_to_the_start():
+    tracker = ShoeTracker(6)
+    cards = DECK_TUPLES * 6
+    random.Random(0).shuffle(cards)
+    tracker.observe_all(cards)
+    assert tracker.remaining == [0] * 10
+    assert tracker.cards_remaining == 0
+    # Balanced systems end at zero, Knock-Out at +4 after starting at -4 per extra deck
+    assert dict(zip(tracker.systems, tracker.counts)) == {'hilo': 0, 'ko': 4, 'omega2': 0, 'zen': 0}
+
+def test_bytes_and_restore_give_the_same_state():
+    shoe = Shoe(6)
+    shoe.shuffle(3)
+    by_tuple, by_byte = ShoeTracker(6), ShoeTracker(6)
+    for _ in range(150):
+        card = shoe.deal()
+        by_tuple.observe(CARD_TUPLES[card])
+        by_byte.observe_byte(card)
+    assert by_byte.snapshot() == by_tuple.snapshot()
+    restored = ShoeTracker(6)
+    restored.restore(by_tuple.remaining)
+    assert restored.snapshot() == by_tuple.snapshot()
@@ -0,0 +1,19 @@
+from deviation_optimizer import Cell, cells_from_csv, optimize, run_batch
+from rules import DEFAULT_RULES
+
+CELL = Cell('hard', 16, 10, 'S', '>=')
+
+def test_cells_from_the_default_deviations():
+    cells = cells_from_csv()
+    assert cells
+    assert all(cell.kind in ('hard', 'soft', 'pair') for cell in cells)
+
+def test_batches_are_reproducible():
+    first = run_batch((CELL, 300, 42, DEFAULT_RULES))
+    assert first == run_batch((CELL, 300, 42, DEFAULT_RULES))
+    assert sum(first[0]) == 300
+
+def test_optimize_stops_at_max_trials():
+    result, = optimize([CELL], master_seed=1, workers=1, batch_trials=200, max_trials=400)
+    assert result.trials >= 200
+    assert result.trials <= 400 or result.resolved
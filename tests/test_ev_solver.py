@@ -0,0 +1,46 @@
+from fractions import Fraction
+
+import pytest
+
+from ev_solver import BUST, add_card, dealer_distribution, full_shoe, remove, solve, stand_ev
+
+def _enumerate_dealer(total, soft, counts):
+    """Exact S17 no-peek dealer outcomes by brute force over every draw order."""
+    if total > 21:
+        return {BUST: Fraction(1)}
+    if total >= 17:
+        return {total - 17: Fraction(1)}
+    n = sum(counts)
+    outcomes = {}
+    for i, c in enumerate(counts):
+        if c:
+            counts[i] -= 1
+            for slot, p in _enumerate_dealer(*add_card(total, soft, i + 2), counts).items():
+                outcomes[slot] = outcomes.get(slot, 0) + p * Fraction(c, n)
+            counts[i] += 1
+    return outcomes
+
+def test_dealer_distribution_matches_brute_force():
+    comp = (2, 1, 2, 1, 1, 2, 1, 1, 3, 1)
+    for up in (2, 6, 7, 10, 11):
+        exact = _enumerate_dealer(up, int(up == 11), list(comp))
+        dist = dealer_distribution(up, comp, peek=False)
+        assert dist == pytest.approx([float(exact.get(slot, 0)) for slot in range(6)])
+
+def test_peek_rules_out_a_dealer_blackjack():
+    comp = remove(full_shoe(1), [11])
+    assert sum(dealer_distribution(11, comp)) == pytest.approx(1)
+    # With only tens and aces left, an ace up makes 21 unless the peek rules out the ten
+    tens_and_aces = (0,) * 8 + (4, 3)
+    assert dealer_distribution(11, tens_and_aces, peek=False)[4] > 0.5
+    assert dealer_distribution(11, tens_and_aces, peek=True)[4] == pytest.approx(0)
+
+def test_solver_finds_textbook_plays():
+    comp = full_shoe(6)
+    assert stand_ev(21, 10, remove(comp, [10, 11, 10]), peek=True) > 0.8
+    evs = solve((6, 5), 6, remove(comp, [6, 5, 6]))
+    assert max(evs, key=evs.get) == "Double"
+    evs = solve((8, 8), 10, remove(comp, [8, 8, 10]))
+    assert evs["Split"] > evs["Stand"] and evs["Split"] > evs["Hit"]
+    evs = solve((10, 10), 6, remove(comp, [10, 10, 6]))
+    assert max(evs, key=evs.get) == "Stand"
@@ -0,0 +1,34 @@
+from cards import from_tuple
+from event_log import DEALER, PLAYER, EventLog, replay
+from strategy import HIT, STAND
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'hands.bjlog')
+    with EventLog(path, buffer_records=3) as log:
+        log.shuffle(3)
+        log.begin_hand()
+        log.deal(PLAYER, ('10', 'Hearts'))
+        log.deal(PLAYER, ('6', 'Clubs'))
+        log.deal(DEALER, ('A', 'Spades'))
+        log.deal(DEALER, ('7', 'Spades'))
+        log.decision(HIT, STAND, 1.25)
+        log.deal(PLAYER, ('K', 'Diamonds'))
+        log.outcome(-1)
+        log.shuffle(2)
+        log.hand_record([from_tuple(('A', 'Hearts')), from_tuple(('K', 'Hearts'))],
+                        [from_tuple(('9', 'Clubs')), from_tuple(('7', 'Clubs'))], [STAND], 1.5)
+
+    first, second = replay(path)
+    assert first.player_cards == [from_tuple(c) for c in (('10', 'Hearts'), ('6', 'Clubs'), ('K', 'Diamonds'))]
+    assert first.dealer_cards == [from_tuple(('A', 'Spades')), from_tuple(('7', 'Spades'))]
+    assert first.decisions == [(HIT, STAND, 1.2)]
+    assert (first.net, first.shoe, first.num_decks) == (-1.0, 1, 3)
+    assert (second.net, second.shoe, second.num_decks) == (1.5, 2, 2)
+
+def test_appending_continues_the_numbering(tmp_path):
+    path = str(tmp_path / 'hands.bjlog')
+    for _ in range(2):
+        with EventLog(path) as log:
+            log.shuffle(6)
+            log.hand_record([], [], [], 0)
+    assert [(record.hand, record.shoe) for record in replay(path)] == [(1, 1), (2, 2)]
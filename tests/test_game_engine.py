@@ -0,0 +1,57 @@
+import pytest
+
+from event_log import DEALER, PLAYER
+from game_engine import FINISHED, PLAYER_TURN, GameEngine
+
+def _recorded(engine):
+    events = []
+    engine.subscribe(lambda event, data: events.append((event, data)))
+    return events
+
+def test_hole_card_is_counted_only_on_reveal():
+    engine = GameEngine(1, 0.5, seed=1)
+    events = _recorded(engine)
+    engine.new_hand()
+    assert engine.hole_hidden
+    deals = [data for event, data in events if event == 'deal']
+    assert [data['actor'] for data in deals] == [PLAYER, PLAYER, DEALER, DEALER]
+    # Two player cards and the upcard are out of the count, the hole card is not
+    assert engine.tracker.cards_remaining == 52 - 3
+    assert sum(engine.analysis_inputs()[2]) == 52 - 3
+    engine.stand()
+    assert not engine.hole_hidden
+    assert engine.tracker.cards_remaining == engine.shoe.remaining
+    names = [event for event, _ in events]
+    assert names.index('reveal') < names.index('outcome')
+
+def test_a_bust_still_reveals_the_hole_card():
+    engine = GameEngine(1, 0.5, seed=2)
+    events = _recorded(engine)
+    engine.new_hand()
+    while engine.state == PLAYER_TURN:
+        engine.hit()
+    outcome = [data for event, data in events if event == 'outcome'][-1]
+    assert outcome['bust'] and outcome['net'] == -1
+    assert 'reveal' in [event for event, _ in events]
+    assert engine.tracker.cards_remaining == engine.shoe.remaining
+
+def test_count_stays_in_step_with_the_shoe():
+    engine = GameEngine(1, 0.5, seed=3)
+    shuffles = []
+    engine.subscribe(lambda event, data: event == 'shuffle' and shuffles.append(data))
+    for hand in range(300):
+        engine.new_hand()
+        assert engine.recommendation in ("Hit", "Stand")
+        while engine.state == PLAYER_TURN:
+            engine.hit() if hand % 3 else engine.stand()
+        assert engine.state == FINISHED
+        assert sum(engine.tracker.remaining) == engine.shoe.remaining
+    assert shuffles
+
+def test_moves_are_checked_against_the_state():
+    engine = GameEngine(6, seed=4)
+    with pytest.raises(ValueError):
+        engine.hit()
+    engine.new_hand()
+    with pytest.raises(ValueError):
+        engine.new_hand()
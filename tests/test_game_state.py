@@ -0,0 +1,48 @@
+import pytest
+
+from game_engine import FINISHED, PLAYER_TURN, GameEngine
+from game_state import GameState, what_if
+
+def test_bytes_round_trip():
+    engine = GameEngine(6, seed=11)
+    engine.new_hand()
+    state = engine.snapshot().deal()
+    data = state.to_bytes()
+    assert GameState.from_bytes(data) == state._replace(shoe=state.undealt, pos=0)
+    with pytest.raises(ValueError):
+        GameState.from_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        GameState.from_bytes(b'XXXX' + data[4:])
+
+def test_hidden_hole_card_is_not_counted():
+    engine = GameEngine(1, 0.5, seed=2)
+    engine.new_hand()
+    state = engine.snapshot()
+    assert state.hole_hidden
+    assert sum(state.remaining) == len(state.undealt) + 1
+    revealed = state.reveal()
+    assert sum(revealed.remaining) == len(state.undealt)
+
+def test_restore_replays_the_same_hand():
+    engine = GameEngine(6, seed=5)
+    engine.new_hand()
+    state = engine.snapshot()
+    engine.stand()
+
+    other = GameEngine(6, seed=99)
+    other.restore(GameState.from_bytes(state.to_bytes()))
+    assert other.state == PLAYER_TURN
+    other.stand()
+    assert other.state == FINISHED
+    assert (other.player_hand, other.dealer_hand) == (engine.player_hand, engine.dealer_hand)
+    assert other.tracker.remaining == engine.tracker.remaining
+
+def test_what_if_is_reproducible():
+    engine = GameEngine(6, seed=4)
+    engine.new_hand()
+    state = engine.snapshot()
+    first = what_if(state, samples=500, seed=1)
+    assert first == what_if(state, samples=500, seed=1)
+    assert set(first) == {'hit', 'stand', 'double'}
+    with pytest.raises(ValueError):
+        what_if(state, actions=('split',))
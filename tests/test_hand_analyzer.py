@@ -0,0 +1,34 @@
+import builtins
+
+from blackjack import values
+from blackjack.console import play_blackjack
+from cards import from_tuple
+from event_log import EventLog, replay
+from hand_analyzer import Hand, analyze, grade_hands
+from shuffling_deck import ContinuousShoe
+from strategy import HIT
+
+def test_hit_stand_games_are_not_graded_against_doubles():
+    # 6 5 v 6: the chart doubles, but a hit/stand game can only hit
+    hands = [Hand('1', 6, [6, 5, 9], [6, 10, 10], [HIT])]
+    assert grade_hands(hands).report()['errors'] == 1
+    assert grade_hands(hands, hit_stand=True).report()['errors'] == 0
+
+def test_console_logs_are_graded_against_the_upcard(tmp_path, monkeypatch):
+    path = str(tmp_path / 'console.bjlog')
+    monkeypatch.setattr(builtins, 'input', lambda prompt='': 'stand')
+    with EventLog(path) as log:
+        play_blackjack(1, log, ContinuousShoe(1, 0.5, seed=8))
+
+    # The console deals player, hole card, player, upcard
+    shoe = ContinuousShoe(1, 0.5, seed=8)
+    shoe.start_hand()
+    player1, hole, player2, upcard = [shoe.deal() for _ in range(4)]
+    record, = replay(path)
+    assert record.player_cards == [from_tuple(player1), from_tuple(player2)]
+    assert record.dealer_cards[:2] == [from_tuple(upcard), from_tuple(hole)]
+
+    up = values[upcard[0]]
+    report = analyze(path, workers=1, hit_stand=True).report()
+    assert report['decisions'] == 1
+    assert list(report['situations'])[0].endswith(f"v {'A' if up == 11 else up}")
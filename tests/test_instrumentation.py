@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+import blackjack.hand
+import game_engine
+from instrumentation import LATENCY_BOUNDS, CallStats, Instrumentation
+
+def test_enable_wraps_and_disable_restores():
+    original = blackjack.hand.recommend_hilo_action
+    imported = game_engine.recommend_hilo_action
+    instrumentation = Instrumentation().enable(['recommendation'])
+    try:
+        assert game_engine.recommend_hilo_action is not imported
+        engine = game_engine.GameEngine(6, seed=1)
+        for _ in range(5):
+            engine.new_hand()
+            engine.stand()
+        stats = instrumentation.stats['blackjack.hand.recommend_hilo_action']
+        assert stats.count == 5
+        with pytest.raises(ValueError):
+            instrumentation.enable()
+    finally:
+        instrumentation.disable()
+    assert blackjack.hand.recommend_hilo_action is original
+    assert game_engine.recommend_hilo_action is imported
+
+def test_histogram_and_quantiles():
+    stats = CallStats('f', 'group')
+    for elapsed in (2e-6,) * 98 + (0.3, 2.0):
+        stats.observe(elapsed)
+    assert stats.count == 100 and stats.max == 2.0
+    assert stats.quantile(0.5) == LATENCY_BOUNDS[1]
+    assert stats.quantile(1.0) == 2.0
+    assert sum(stats.buckets) == 100 and stats.buckets[len(LATENCY_BOUNDS)] == 1
+
+def test_snapshots(tmp_path):
+    instrumentation = Instrumentation({'shuffle': ('shuffling_deck:apply_shuffle',)}).enable()
+    try:
+        import shuffling_deck
+        shuffling_deck.shuffle_indices(52, 0)
+        instrumentation.write_snapshot(str(tmp_path / 'metrics.json'))
+        instrumentation.write_snapshot(str(tmp_path / 'metrics.prom'))
+    finally:
+        instrumentation.disable()
+    snapshot = json.loads((tmp_path / 'metrics.json').read_text())
+    assert snapshot['metrics']['shuffling_deck.apply_shuffle']['count'] == 1
+    prom = (tmp_path / 'metrics.prom').read_text()
+    assert 'blackjack_call_seconds_count{group="shuffle",function="shuffling_deck.apply_shuffle"} 1' in prom
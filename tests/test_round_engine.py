@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from rules import CLASSIC_RULES, DEFAULT_RULES, Rules
+from round_engine import RoundEngine
+
+def _shoe(seed, num_decks=6):
+    values = [value for value in range(2, 12) for _ in range(4 * num_decks)] + [10] * (12 * num_decks)
+    random.Random(seed).shuffle(values)
+    return bytes(values)
+
+def _play(seed, spots=1, rounds=200):
+    engine = RoundEngine(DEFAULT_RULES)
+    engine.new_shoe(_shoe(seed))
+    nets = []
+    for _ in range(rounds):
+        if engine.size - engine.pos < DEFAULT_RULES.max_cards_for(spots):
+            engine.new_shoe(_shoe(seed + len(nets)))
+        nets.append((engine.play_round(spots=spots), tuple(engine.spot_nets[:spots])))
+    return nets
+
+def test_rules_validation_and_round_bounds():
+    with pytest.raises(ValueError):
+        Rules(num_decks=0)
+    with pytest.raises(ValueError):
+        Rules(penetration=0)
+    assert CLASSIC_RULES.max_cards_per_round == 22
+    assert DEFAULT_RULES.max_cards_for(3) == 11 * (4 * 3 + 1)
+
+def test_same_shoe_plays_the_same_rounds():
+    assert _play(1) == _play(1)
+
+def test_spot_nets_add_up_to_the_round():
+    for net, spot_nets in _play(2, spots=3):
+        assert net == pytest.approx(sum(spot_nets))
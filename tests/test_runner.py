@@ -0,0 +1,13 @@
+from dataclasses import replace
+
+from runner import derive_seed, run
+
+def test_derived_seeds_are_stable_and_distinct():
+    assert derive_seed(0, 1) == derive_seed(0, 1)
+    assert len({derive_seed(0, k) for k in range(100)}) == 100
+
+def test_result_does_not_depend_on_worker_count():
+    one = run('hilo', hands=3000, master_seed=9, workers=1, shard_hands=1000).result
+    two = run('hilo', hands=3000, master_seed=9, workers=2, shard_hands=1000).result
+    assert one.hands == 3000
+    assert replace(one, elapsed=0) == replace(two, elapsed=0)
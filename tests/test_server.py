@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from game_engine import PLAYER_TURN
+from rules import CLASSIC_RULES
+from server import Session, Table, check_table_options
+
+class FakeWriter:
+    def __init__(self):
+        self.lines = []
+
+    def is_closing(self):
+        return False
+
+    def write(self, line):
+        self.lines.append(line)
+
+def test_table_options_must_fit_a_worst_case_round():
+    check_table_options(1, 0.75, 3)
+    with pytest.raises(ValueError):
+        check_table_options(1, 0.75, 7)
+    with pytest.raises(ValueError):
+        check_table_options(6, 1.5, 7)
+    with pytest.raises(ValueError):
+        Table('t', 1, 0.75, 7)
+
+def test_full_single_deck_table_never_runs_the_shoe_dry():
+    # Every seat hits to 21 or a bust, the most cards a hit/stand round can use
+    seats = 52 // 11 - 1
+    assert CLASSIC_RULES.max_cards_for(seats) <= 52
+    table = Table('t', num_decks=1, penetration=1.0, max_seats=seats)
+    sessions = [Session(FakeWriter()) for _ in range(seats)]
+    for session in sessions:
+        table.sit(session)
+    rng = random.Random(7)
+    for _ in range(500):
+        for session in sessions:
+            table.ready(session)
+        while table.state == PLAYER_TURN:
+            table.act(table.seats[table.turn], 'hit' if rng.random() < 0.9 else 'stand')
+        assert min(table.tracker.remaining) >= 0
+        assert sum(table.tracker.remaining) == table.shoe.remaining
+    assert table.rounds == 500
@@ -0,0 +1,28 @@
+from dataclasses import replace
+
+import numpy as np
+
+from shuffle_analysis import analyze, eulerian_distribution, riffle_batch, rising_sequences, shuffled_batch
+
+def test_riffle_batch_keeps_permutations_with_at_most_two_rising_sequences():
+    shoes = shuffled_batch(200, 104, 1, np.random.default_rng(0))
+    assert (np.sort(shoes, axis=1) == np.arange(104)).all()
+    assert rising_sequences(shoes).max() <= 2
+    again = riffle_batch(shoes, np.random.default_rng(1))
+    assert rising_sequences(again).max() <= 4
+
+def test_eulerian_distribution():
+    assert np.allclose(eulerian_distribution(4), np.array([1, 11, 11, 1]) / 24)
+    assert abs(eulerian_distribution(52).sum() - 1) < 1e-9
+
+def test_more_passes_get_closer_to_uniform():
+    reports = [analyze(1, passes, 2_000, seed=3) for passes in (1, 4, 7)]
+    uniform = analyze(1, 0, 2_000, seed=3)
+    tvds = [report.rising_sequences_tvd for report in reports]
+    assert tvds == sorted(tvds, reverse=True)
+    assert reports[0].adjacent_pairs_kept > 10 * uniform.adjacent_pairs_kept
+    assert abs(uniform.rising_sequences - 26.5) < 0.5
+
+def test_analyze_is_reproducible():
+    first, second = analyze(2, 3, 500, seed=7), analyze(2, 3, 500, seed=7)
+    assert replace(first, elapsed=0) == replace(second, elapsed=0)
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from rules import CLASSIC_RULES
+from shuffling_deck import (FISHER_YATES, RIFFLE, TRUE_RANDOM, ContinuousShoe, _legacy_shuffle, apply_shuffle,
+                            generate_deck, riffle_pass, shoe_cards, shuffle_all_decks, shuffle_indices)
+
+def test_riffle_pass_matches_the_legacy_shuffle():
+    deck = generate_deck() * 6
+    for seed in range(20):
+        assert riffle_pass(deck, random.Random(seed)) == _legacy_shuffle(list(deck), random.Random(seed))
+
+def test_seeded_shuffles_repeat():
+    deck = generate_deck()
+    for mode in (RIFFLE, FISHER_YATES):
+        assert shuffle_all_decks(deck, seed=5, mode=mode) == shuffle_all_decks(deck, seed=5, mode=mode)
+        assert shuffle_indices(52, 5, mode) != shuffle_indices(52, 6, mode)
+    # One stream shared across shuffles gives the same sequence of shoes
+    first, second = random.Random(1), random.Random(1)
+    assert [apply_shuffle(range(52), first) for _ in range(3)] == [apply_shuffle(range(52), second) for _ in range(3)]
+
+def test_every_mode_returns_a_permutation():
+    for mode in (RIFFLE, FISHER_YATES, TRUE_RANDOM):
+        assert sorted(shuffle_indices(312, 0, mode)) == list(range(312))
+    with pytest.raises(ValueError):
+        shuffle_indices(52, 0, 'overhand')
+
+def test_seeded_shoes_repeat():
+    assert list(shoe_cards(2, seed=3)) == list(shoe_cards(2, seed=3))
+    assert list(shoe_cards(2, seed=3, mode=FISHER_YATES)) == list(shoe_cards(2, seed=3, mode=FISHER_YATES))
+    assert list(shoe_cards(2, seed=3)) != list(shoe_cards(2, seed=4))
+
+def test_cut_must_leave_a_hand_behind_it():
+    ContinuousShoe(1, 0.5)
+    with pytest.raises(ValueError):
+        ContinuousShoe(1, 1 - (CLASSIC_RULES.max_cards_per_round - 1) / 52)
+    with pytest.raises(ValueError):
+        ContinuousShoe(6, 0)
+
+def test_running_dry_mid_hand_announces_the_shuffle():
+    shoe = ContinuousShoe(1, 1.0, seed=1, reserve=0)
+    shuffles = []
+    shoe.on_shuffle = lambda: shuffles.append(shoe.shoe_number)
+    assert shoe.start_hand()
+    for _ in range(53):
+        shoe.deal()
+    assert shuffles == [2]
+    assert shoe.dealt == 1
+
+def test_shoe_reshuffles_at_the_cut_card():
+    shoe = ContinuousShoe(2, 0.5, seed=6)
+    again = ContinuousShoe(2, 0.5, seed=6)
+    assert shoe.start_hand() and again.start_hand()
+    dealt = [shoe.deal() for _ in range(52)]
+    assert dealt == [again.deal() for _ in range(52)]
+    assert shoe.needs_shuffle and shoe.shoe_number == 1
+    assert shoe.start_hand() and shoe.shoe_number == 2
+    assert not shoe.start_hand()
+    assert len(shoe.undealt()) == 104
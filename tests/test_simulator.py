@@ -0,0 +1,25 @@
+from dataclasses import replace
+
+from blackjack import hand_state
+from event_log import EventLog, replay
+from simulator import STRATEGIES, hand_for, simulate
+
+def test_hand_for_builds_the_requested_total():
+    for total in range(4, 22):
+        assert hand_state(hand_for(total, False)) == (total, False)
+    for total in range(12, 22):
+        assert hand_state(hand_for(total, True)) == (total, True)
+
+def test_seeded_simulation_repeats():
+    first = simulate(STRATEGIES['hilo'], hands=2000, seed=3)
+    again = simulate(STRATEGIES['hilo'], hands=2000, seed=3)
+    assert replace(first, elapsed=0) == replace(again, elapsed=0)
+    assert first.wins + first.losses + first.pushes == first.hands == 2000
+
+def test_every_hand_is_logged(tmp_path):
+    path = str(tmp_path / 'sim.bjlog')
+    with EventLog(path) as log:
+        result = simulate(STRATEGIES['basic'], hands=300, seed=1, event_log=log)
+    records = list(replay(path))
+    assert len(records) == 300
+    assert sum(record.net for record in records) == result.net
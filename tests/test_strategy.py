@@ -0,0 +1,46 @@
+import csv
+
+from blackjack import recommend_hilo_action
+from strategy import (ACTION_NAMES, CODES, DEFAULT_CHART, HIT, SPLIT, STAND, UPCARD_COLUMNS, default_strategy,
+                      load_strategy)
+
+def _chart_cells():
+    with open(DEFAULT_CHART, newline='') as f:
+        for row in csv.DictReader(line for line in f if not line.startswith('#')):
+            low, _, high = row['total'].partition('-')
+            for total in range(int(low), int(high or low) + 1):
+                for column in UPCARD_COLUMNS:
+                    yield row['kind'], total, 11 if column == 'A' else int(column), row[column]
+
+def test_lookup_matches_the_chart_csv():
+    table = load_strategy(deviation_paths=())
+    for kind, total, up, code in _chart_cells():
+        preferred, fallback = CODES[code]
+        if kind == 'pair':
+            action = table.lookup(2 * total if total < 11 else 12, total == 11, total, up, 0.0)
+            assert (action == SPLIT) == (code == 'P'), (kind, total, up)
+        else:
+            soft = kind == 'soft'
+            assert table.lookup(total, soft, 0, up, 0.0) == preferred, (kind, total, up)
+            assert table.lookup(total, soft, 0, up, 0.0, False, False, False) == fallback, (kind, total, up)
+
+def test_deviations_apply_from_their_index():
+    table = load_strategy()
+    # Hard 12 v 3 hits by the chart and stands from +2
+    assert table.lookup(12, False, 0, 3, 1.9) == HIT
+    assert table.lookup(12, False, 0, 3, 2.0) == STAND
+    # Hard 13 v 2 stands by the chart and hits below -1
+    assert table.lookup(13, False, 0, 2, -1.0) == STAND
+    assert table.lookup(13, False, 0, 2, -1.5) == HIT
+    assert table.take_insurance(3) and not table.take_insurance(2.9)
+
+def test_hit_stand_recommendations_only_hit_or_stand():
+    strategy = default_strategy()
+    for kind, total, up, code in _chart_cells():
+        if kind == 'hard' and 4 <= total <= 20:
+            hand = [('10' if total > 11 else str(total - 2), ''), (str(total - 10) if total > 11 else '2', '')]
+            dealer = [('A' if up == 11 else str(up), '')]
+            action = recommend_hilo_action(hand, dealer, 0, 1, can_double=False, can_split=False,
+                                           can_surrender=False)
+            assert action in ("Hit", "Stand")
+            assert action == ACTION_NAMES[strategy.lookup(total, False, 0, up, 0.0, False, False, False)]
@@ -0,0 +1,23 @@
+from dataclasses import replace
+
+from rules import CLASSIC_RULES, DEFAULT_RULES
+from strategy import DOUBLE, SPLIT, STAND
+from strategy_cache import load_cache, write_cache
+
+def test_classic_cache_has_no_doubles_or_splits(tmp_path):
+    rules = replace(CLASSIC_RULES, num_decks=1)
+    write_cache(rules, str(tmp_path), deviation_files=())
+    # Penetration does not change the chart; other rules select another file
+    cache = load_cache(replace(rules, penetration=0.5), str(tmp_path), deviation_files=())
+    assert cache is not None
+    assert load_cache(replace(DEFAULT_RULES, num_decks=1), str(tmp_path), deviation_files=()) is None
+
+    table = cache.strategy()
+    # 6 5 v 6 and 8 8 v 6 double and split under full rules
+    assert table.lookup(11, False, 0, 6, 0.0, True, True, True) != DOUBLE
+    assert table.lookup(16, False, 8, 6, 0.0, True, True, True) == STAND
+    assert all(table.lookup(2 * v, v == 11, v, up, 0.0, True, True, True) != SPLIT
+               for v in range(2, 12) for up in range(2, 12))
+    del table
+    assert abs(sum(cache.dealer_distribution(6)) - 1) < 1e-9
+    cache.close()
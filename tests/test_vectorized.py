@@ -0,0 +1,40 @@
+import random
+
+import numpy as np
+
+from blackjack import calculate_hand_value
+from vectorized import dealer_playout_from_shoe, hand_values, settle
+
+RANK_FOR_VALUE = {value: str(value) for value in range(2, 11)}
+RANK_FOR_VALUE[11] = 'A'
+
+def _value(hand):
+    return calculate_hand_value([(RANK_FOR_VALUE[value], '') for value in hand])
+
+def _dealer_total(up, hole, shoe, pos):
+    hand = [up, hole]
+    while _value(hand) < 17 and pos < len(shoe):
+        hand.append(shoe[pos])
+        pos += 1
+    return _value(hand), len(hand) - 2
+
+def test_hand_values_match_calculate_hand_value():
+    rng = random.Random(0)
+    hands = [[rng.choice(range(2, 12)) for _ in range(rng.randint(2, 6))] for _ in range(2000)]
+    padded = np.zeros((len(hands), 6), dtype=np.int32)
+    for row, hand in enumerate(hands):
+        padded[row, :len(hand)] = hand
+    totals, _ = hand_values(padded)
+    assert totals.tolist() == [_value(hand) for hand in hands]
+
+def test_dealer_playout_matches_the_scalar_dealer():
+    rng = np.random.default_rng(1)
+    shoe = rng.choice(np.array([2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11]), 5000)
+    up, hole = rng.integers(2, 12, 1000), rng.integers(2, 12, 1000)
+    positions = rng.integers(0, len(shoe) - 20, 1000)
+    totals, used = dealer_playout_from_shoe(up, hole, shoe, positions)
+    expected = [_dealer_total(int(u), int(h), shoe.tolist(), int(p)) for u, h, p in zip(up, hole, positions)]
+    assert list(zip(totals.tolist(), used.tolist())) == expected
+
+def test_settle():
+    assert settle(np.array([20, 22, 18, 17]), np.array([19, 18, 22, 17])).tolist() == [1, -1, 1, 0]
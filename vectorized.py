@@ -0,0 +1,87 @@
+"""
+NumPy batch evaluation of hand values and dealer play-out.
+
+Hands use the simulator's integer card encoding: each card is its blackjack
+value (2-11, 11 for an ace) and 0 pads unused slots, so an (N, M) array holds
+N hands of up to M cards. Totals follow calculate_hand_value: aces count 11
+and are reduced to 1 one at a time while the hand is over 21.
+"""
+from typing import Tuple
+
+import numpy as np
+
+# Draws the dealer can ever need from a two-card start (e.g. A,A + A,A,2,2,2,2,3,...)
+MAX_DEALER_DRAWS = 12
+
+def hand_values(cards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return (totals, soft) for every row of an (N, M) card-value array.
+
+    `soft` is True where an ace is still counted as 11.
+    """
+    cards = np.asarray(cards)
+    raw = cards.sum(axis=1, dtype=np.int32)
+    aces = (cards == 11).sum(axis=1, dtype=np.int32)
+    # Number of aces that must drop to 1: ceil((raw - 21) / 10), limited to the aces held
+    reduce = np.clip((raw - 12) // 10, 0, aces)
+    totals = raw - 10 * reduce
+    return totals, (aces - reduce) > 0
+
+def add_card(totals: np.ndarray, soft: np.ndarray, card: np.ndarray, mask=None) -> None:
+    """Add one card per hand in place, only where `mask` is True."""
+    if mask is not None:
+        card = np.where(mask, card, 0)
+    # Only one ace can ever count as 11, so a second ace joins a soft hand as 1
+    card = np.where(soft & (card == 11), 1, card)
+    totals += card
+    soft |= card == 11
+    bust_soft = (totals > 21) & soft
+    totals[bust_soft] -= 10
+    soft[bust_soft] = False
+
+def dealer_playout(up: np.ndarray, hole: np.ndarray, draws: np.ndarray,
+                   hit_soft_17: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Play out N dealer hands at once.
+
+    `draws` is an (N, K) array with the cards each dealer would draw next, in
+    order. Returns (final totals, cards drawn per hand); totals over 21 are
+    busts.
+    """
+    up = np.asarray(up, dtype=np.int32)
+    hole = np.asarray(hole, dtype=np.int32)
+    draws = np.asarray(draws, dtype=np.int32)
+    totals, soft = hand_values(np.stack([up, hole], axis=1))
+    used = np.zeros(len(totals), dtype=np.int32)
+    for k in range(draws.shape[1]):
+        active = totals < 17
+        if hit_soft_17:
+            active |= (totals == 17) & soft
+        if not active.any():
+            break
+        add_card(totals, soft, draws[:, k], active)
+        used += active
+    return totals, used
+
+def dealer_playout_from_shoe(up: np.ndarray, hole: np.ndarray, shoe: np.ndarray,
+                             positions: np.ndarray, hit_soft_17: bool = False
+                             ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Play out dealer hands drawing from a 1-D shoe array.
+
+    Hand i draws shoe[positions[i]], shoe[positions[i] + 1], ... ; slots past
+    the end of the shoe read as 0 (no card).
+    """
+    shoe = np.asarray(shoe, dtype=np.int32)
+    padded = np.concatenate([shoe, np.zeros(MAX_DEALER_DRAWS, dtype=np.int32)])
+    index = np.asarray(positions)[:, None] + np.arange(MAX_DEALER_DRAWS)
+    return dealer_playout(up, hole, padded[np.minimum(index, len(padded) - 1)], hit_soft_17)
+
+def settle(player_totals: np.ndarray, dealer_totals: np.ndarray) -> np.ndarray:
+    """Return +1 / 0 / -1 per hand; a player bust loses regardless of the dealer."""
+    player_totals = np.asarray(player_totals)
+    dealer_totals = np.asarray(dealer_totals)
+    outcome = np.sign(player_totals - dealer_totals).astype(np.int8)
+    outcome[dealer_totals > 21] = 1
+    outcome[player_totals > 21] = -1
+    return outcome